@@ -0,0 +1,121 @@
+"""Microbenchmark for slot extraction over a large corpus of ASR-style transcripts.
+
+Usage:
+    poetry run python benchmarks/slot_extraction.py --size 200000
+"""
+
+import argparse
+import random
+import re
+import time
+from pathlib import Path
+
+import yaml
+
+from voice_eval.bot_tools import SLOT_EXTRACTOR, extract_slots_batch, extract_slots_tool
+
+
+_SCENARIOS_DIR = Path(__file__).resolve().parent.parent / "scenarios"
+_FILLERS = ["um", "uh", "so", "yeah", "okay", "like", "i mean", "hold on"]
+
+
+def baseline_extract(user_input):
+    """The per-call ``re.search`` chain that SlotExtractor replaced, kept for comparison."""
+    slots = {}
+    user_lower = user_input.lower()
+    if m := re.search(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b", user_input):
+        slots["email"] = m.group(0)
+    if "account" in user_lower:
+        for pattern in [
+            r"\baccount\s+number\s+is\s+([A-Za-z0-9]{5,8})\b",
+            r"\bmy\s+account\s+number\s+is\s+([A-Za-z0-9]{5,8})\b",
+            r"\bmy\s+account\s+is\s+([A-Za-z0-9]{5,8})\b",
+            r"\baccount\s+is\s+([A-Za-z0-9]{5,8})\b",
+            r"\baccount\s+([A-Za-z0-9]{5,8})\b",
+        ]:
+            if m := re.search(pattern, user_input, re.IGNORECASE):
+                slots["account_number"] = m.group(1)
+                break
+    if "order" in user_lower:
+        for pattern in [
+            r"order\s+number\s+is\s+(\d+)\b",
+            r"my\s+order\s+number\s+is\s+(\d+)\b",
+            r"order\s+(\d{1,3}(?:,\d{3})+(?:-\d+)?)\b",
+            r"order\s+#?(\d+)\b",
+        ]:
+            if m := re.search(pattern, user_lower):
+                slots["order_number"] = m.group(1).replace(",", "")
+                break
+    if "card ending" in user_lower:
+        for pattern in [r"card\s+ending\s+(\d{1,3}(?:,\d{3})+)\b", r"card\s+ending\s+(\d{4})\b"]:
+            if m := re.search(pattern, user_lower):
+                slots["card_info"] = m.group(1).replace(",", "")
+                break
+    return slots
+
+
+def build_corpus(size, seed=0):
+    """Build ASR-style (lowercased, filler-laden) transcripts from the scenario suite."""
+    utterances = []
+    for yaml_file in sorted(_SCENARIOS_DIR.glob("*.yaml")):
+        for scenario in yaml.safe_load(yaml_file.read_text(encoding="utf-8")):
+            utterances.extend(step["user"] for step in scenario.get("steps", []) if step.get("user"))
+
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        words = rng.choice(utterances).lower().split()
+        if rng.random() < 0.5:
+            words.insert(rng.randrange(len(words) + 1), rng.choice(_FILLERS))
+        text = " ".join(words)
+        corpus.append(re.sub(r"\d{4,}", lambda m: str(rng.randrange(10000, 99999)), text))
+    return corpus
+
+
+def time_per_call(candidates, corpus, repeat):
+    """Best per-call time in microseconds, interleaving rounds to even out noise."""
+    best = {name: float("inf") for name in candidates}
+    for _ in range(repeat):
+        for name, fn in candidates.items():
+            start = time.perf_counter()
+            for text in corpus:
+                fn(text)
+            best[name] = min(best[name], time.perf_counter() - start)
+    return {name: elapsed / len(corpus) * 1e6 for name, elapsed in best.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=100_000, help="Number of transcripts")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing rounds (best is kept)")
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.size)
+    mismatches = sum(1 for text in corpus if baseline_extract(text) != SLOT_EXTRACTOR.extract(text))
+
+    results = time_per_call(
+        {
+            "baseline re.search chain": baseline_extract,
+            "SlotExtractor.extract": SLOT_EXTRACTOR.extract,
+            "extract_slots_tool": lambda text: extract_slots_tool(text, {}),
+        },
+        corpus,
+        args.repeat,
+    )
+
+    batch_seconds = float("inf")
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        batch = extract_slots_batch(iter(corpus))
+        batch_seconds = min(batch_seconds, time.perf_counter() - start)
+    results["extract_slots_batch"] = batch_seconds / len(corpus) * 1e6
+    mismatches += sum(1 for i, text in enumerate(corpus) if batch.row(i) != baseline_extract(text))
+
+    print(f"{len(corpus)} transcripts, {mismatches} mismatches against baseline")
+    baseline = results["baseline re.search chain"]
+    for name, per_call in results.items():
+        print(f"{name:<28} {per_call:7.2f} us/call  ({baseline / per_call:4.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
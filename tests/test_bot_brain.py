@@ -1,8 +1,12 @@
 from types import SimpleNamespace
 
 import pytest
+from anthropic import APITimeoutError
 
-from voice_eval.bot_brain import generate_bot_response
+from voice_eval import bot_brain
+from voice_eval.bot_brain import Conversation, _UtteranceStreamParser, generate_bot_response
+from voice_eval.deadline import TurnDeadline
+from voice_eval.timing import TurnTimings
 
 
 def _make_response(response_text):
@@ -47,6 +51,54 @@ def test_generate_bot_response_returns_structured_dict_and_makes_two_calls(mocke
     assert client.messages.create.call_args_list[1].kwargs["model"] == "claude-haiku-4-5"
 
 
+def test_generate_bot_response_times_both_stages_into_the_active_turn(mocker):
+    client = _make_client(
+        mocker,
+        [
+            '{"detected_intent": "Check order status"}',
+            '{"action": "ASK_ORDER_NUMBER", "utterance": "Could you share your order number?"}',
+        ],
+    )
+    timings = TurnTimings()
+
+    with timings.active():
+        generate_bot_response(client=client, user_input="Where is my package?", slots={}, conversation_history=[])
+    # Outside a turn nothing is recorded.
+    client.messages.create.side_effect = [
+        _make_response('{"detected_intent": "Check order status"}'),
+        _make_response('{"action": "ASK_ORDER_NUMBER", "utterance": "Order number?"}'),
+    ]
+    generate_bot_response(client=client, user_input="Where is my package?", slots={}, conversation_history=[])
+
+    assert set(timings.stages) == {"stage_1", "stage_2"}
+    assert all(seconds >= 0 for seconds in timings.stages.values())
+
+
+def test_generate_bot_response_records_token_usage_of_both_stages(mocker):
+    from voice_eval.usage import TurnUsage
+
+    client = mocker.Mock()
+    client.messages.create.side_effect = [
+        SimpleNamespace(
+            content=[SimpleNamespace(text='{"detected_intent": "Check order status"}')],
+            usage=SimpleNamespace(input_tokens=400, output_tokens=12, cache_read_input_tokens=300),
+        ),
+        SimpleNamespace(
+            content=[SimpleNamespace(text='{"action": "ASK_ORDER_NUMBER", "utterance": "Order number?"}')],
+            usage=SimpleNamespace(input_tokens=500, output_tokens=20),
+        ),
+    ]
+    turn_usage = TurnUsage()
+
+    with turn_usage.active():
+        generate_bot_response(client=client, user_input="Where is my package?", slots={}, conversation_history=[])
+
+    assert turn_usage.stages["stage_1"]["input_tokens"] == 400
+    assert turn_usage.stages["stage_1"]["cache_read_input_tokens"] == 300
+    assert turn_usage.stages["stage_2"]["output_tokens"] == 20
+    assert turn_usage.stages["stage_2"]["model"] == "claude-haiku-4-5"
+
+
 def test_generate_bot_response_passes_conversation_history_to_both_api_calls(mocker):
     client = _make_client(
         mocker,
@@ -264,5 +316,368 @@ def test_generate_bot_response_preserves_detected_intent_when_action_call_fails(
     assert client.messages.create.call_count == 2
 
 
+class _FakeStream:
+    def __init__(self, chunks, final_text):
+        self.text_stream = iter(chunks)
+        self._final = _make_response(final_text)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def get_final_message(self):
+        return self._final
+
+
+def test_generate_bot_response_streams_sentences_when_callback_given(mocker):
+    client = _make_client(mocker, ['{"detected_intent": "Cancel an order"}'])
+    final_text = (
+        '{"action": "CONFIRM_CANCELLATION", '
+        '"utterance": "Order 12345 has been cancelled. You will get an email."}'
+    )
+    chunks = [final_text[i:i + 7] for i in range(0, len(final_text), 7)]
+    client.messages.stream.return_value = _FakeStream(chunks, final_text)
+    sentences = []
+
+    result = generate_bot_response(
+        client=client,
+        user_input="Please cancel order 12345.",
+        slots={"order_number": "12345"},
+        conversation_history=[],
+        on_sentence=sentences.append,
+    )
+
+    assert sentences == ["Order 12345 has been cancelled.", "You will get an email."]
+    assert result == {
+        "action": "CONFIRM_CANCELLATION",
+        "utterance": "Order 12345 has been cancelled. You will get an email.",
+        "detected_intent": "Cancel an order",
+    }
+    assert client.messages.create.call_count == 1
+    stream_call = client.messages.stream.call_args.kwargs
+    assert stream_call["output_config"]["format"]["schema"]["properties"]["action"]["enum"] == [
+        "ASK_ORDER_NUMBER",
+        "CONFIRM_CANCELLATION",
+    ]
+
+
+def test_utterance_stream_parser_decodes_escapes_split_across_chunks():
+    parser = _UtteranceStreamParser()
+    document = '{"action": "ASK_EMAIL", "utterance": "Say \\"hi\\"\\n caf\\u00e9"}'
+
+    decoded = "".join(parser.feed(char) for char in document)
+
+    assert decoded == 'Say "hi"\n café'
+    assert parser.done is True
+
+
+def test_conversation_appends_messages_incrementally_across_turns():
+    conversation = Conversation()
+
+    first = conversation.messages_for("I need help with my order.")
+    conversation.append({"user": "I need help with my order.", "bot": "What is the order number?"})
+    second = conversation.messages_for("It is 12345.")
+
+    # Each request gets its own list; earlier ones are not changed by later turns.
+    assert first == [{"role": "user", "content": "I need help with my order."}]
+    assert second == [
+        {"role": "user", "content": "I need help with my order."},
+        {"role": "assistant", "content": "What is the order number?"},
+        {"role": "user", "content": "It is 12345."},
+    ]
+    assert list(conversation) == [
+        {"user": "I need help with my order.", "bot": "What is the order number?"},
+    ]
+
+
+def test_conversation_records_asr_text_when_turn_differs_from_pending_input():
+    conversation = Conversation()
+
+    conversation.messages_for("draft input")
+    conversation.append({"user": "final input"})
+
+    assert conversation.messages_for("next") == [
+        {"role": "user", "content": "final input"},
+        {"role": "user", "content": "next"},
+    ]
+
+
+def test_conversation_renders_slot_block_once_per_slot_version(mocker):
+    format_slots = mocker.spy(bot_brain, "_format_slots")
+    client = _make_client(
+        mocker,
+        [
+            '{"detected_intent": "Cancel an order"}',
+            '{"action": "ASK_ORDER_NUMBER", "utterance": "Which order?"}',
+            '{"detected_intent": "Cancel an order"}',
+            '{"action": "ASK_ORDER_NUMBER", "utterance": "Which order again?"}',
+            '{"detected_intent": "Cancel an order"}',
+            '{"action": "CONFIRM_CANCELLATION", "utterance": "Order 12345 has been cancelled."}',
+        ],
+    )
+    conversation = Conversation()
+
+    for user_input, slots in [
+        ("Cancel my order.", {}),
+        ("Please hurry.", {}),
+        ("It is order 12345.", {"order_number": "12345"}),
+    ]:
+        result = generate_bot_response(
+            client=client,
+            user_input=user_input,
+            slots=slots,
+            conversation_history=conversation,
+        )
+        conversation.append({"user": user_input, "bot": result["utterance"]})
+
+    assert format_slots.call_count == 2
+    assert conversation.slot_version == 1
+    assert '"order_number": "12345"' in client.messages.create.call_args_list[5].kwargs["system"]
+
+
+class _KeywordIntentClient:
+    """Fake Claude that only knows what is visible in the prompt it is sent."""
+
+    _KEYWORDS = {"cancel": "Cancel an order", "password": "Reset account password"}
+
+    def __init__(self):
+        self.messages = self
+        self.message_counts = []
+
+    def create(self, **kwargs):
+        self.message_counts.append(len(kwargs["messages"]))
+        schema = kwargs["output_config"]["format"]["schema"]
+        if "detected_intent" not in schema["properties"]:
+            return _make_response('{"action": "ASK_ORDER_NUMBER", "utterance": "Go on."}')
+
+        intent = "Check order status"
+        for line in kwargs["system"].splitlines():
+            if line.startswith("- Detected intent: ") and line != "- Detected intent: unknown":
+                intent = line.removeprefix("- Detected intent: ")
+        for message in kwargs["messages"]:
+            for keyword, keyword_intent in self._KEYWORDS.items():
+                if message["role"] == "user" and keyword in message["content"]:
+                    intent = keyword_intent
+        return _make_response(json_for_intent(intent))
+
+
+def _run_long_call(keep_turns):
+    client = _KeywordIntentClient()
+    conversation = Conversation(keep_turns=keep_turns)
+    user_turns = ["I want to cancel something I bought."] + [
+        f"Sorry, give me a second, still looking ({turn})." for turn in range(21)
+    ]
+    intents = []
+    for user_input in user_turns:
+        result = generate_bot_response(
+            client=client,
+            user_input=user_input,
+            slots={},
+            conversation_history=conversation,
+        )
+        intents.append(result["detected_intent"])
+        conversation.append(
+            {"user": user_input, "bot": result["utterance"]},
+            detected_intent=result["detected_intent"],
+            action=result["action"],
+        )
+    return intents, conversation, client
+
+
+def test_compaction_preserves_intent_accuracy_on_long_calls():
+    full_intents, full_conversation, full_client = _run_long_call(keep_turns=None)
+    compact_intents, compact_conversation, compact_client = _run_long_call(keep_turns=3)
+
+    assert full_intents == ["Cancel an order"] * 22
+    assert compact_intents == full_intents
+    assert max(compact_client.message_counts) == 7
+    assert max(full_client.message_counts) == 43
+    assert full_conversation.input_tokens_saved == 0
+    assert compact_conversation.input_tokens_saved > 0
+    assert compact_conversation.compacted_turns == 19
+
+
+def test_compacted_prompts_summarize_older_turns():
+    conversation = Conversation(keep_turns=1)
+    conversation.append(
+        {"user": "I forgot my password.", "bot": "What is your email?"},
+        detected_intent="Reset account password",
+        action="ASK_EMAIL",
+    )
+    conversation.append({"user": "Hold on.", "bot": "Sure."})
+    conversation.set_slots({"email": "user@example.com"})
+
+    assert conversation.messages_for("It is user@example.com.") == [
+        {"role": "user", "content": "Hold on."},
+        {"role": "assistant", "content": "Sure."},
+        {"role": "user", "content": "It is user@example.com."},
+    ]
+    prompt = conversation.intent_action_prompt("Reset account password")
+    assert "Summary of 1 earlier turns omitted from the message history:" in prompt
+    assert "- Detected intent: Reset account password" in prompt
+    assert "- Filled slots: email" in prompt
+    assert "- Actions taken: ASK_EMAIL" in prompt
+
+
+def test_compaction_summary_reaches_prompts_sent_on_later_turns(mocker):
+    turns = [
+        ("Where is my package?", {}, "Check order status", "ASK_ORDER_NUMBER"),
+        ("Actually, cancel it.", {}, "Cancel an order", "ASK_ORDER_NUMBER"),
+        ("It is order 12345.", {"order_number": "12345"}, "Cancel an order", "CONFIRM_CANCELLATION"),
+        ("Yes, go ahead.", {"order_number": "12345"}, "Cancel an order", "CONFIRM_CANCELLATION"),
+    ]
+    responses = []
+    for _, _, intent, action in turns:
+        responses += [json_for_intent(intent), '{"action": "%s", "utterance": "Okay."}' % action]
+    client = _make_client(mocker, responses)
+    conversation = Conversation(keep_turns=1)
+
+    for user_input, slots, _, _ in turns:
+        result = generate_bot_response(
+            client=client,
+            user_input=user_input,
+            slots=slots,
+            conversation_history=conversation,
+        )
+        conversation.append(
+            {"user": user_input, "bot": result["utterance"]},
+            detected_intent=result["detected_intent"],
+            action=result["action"],
+        )
+
+    # The last turn was sent after the first two turns were folded into the summary.
+    for call in client.messages.create.call_args_list[-2:]:
+        system = call.kwargs["system"]
+        assert "Summary of 2 earlier turns omitted from the message history:" in system
+        assert "- Detected intent: Cancel an order" in system
+        assert "- Filled slots: order_number" in system
+        assert '"order_number": "12345"' in system
+        assert [message["content"] for message in call.kwargs["messages"]] == [
+            "It is order 12345.",
+            "Okay.",
+            "Yes, go ahead.",
+        ]
+
+
+def test_messages_for_returns_a_copy_and_counts_savings_per_request():
+    conversation = Conversation(keep_turns=1)
+    long_turn = "I forgot my password and I cannot log in to check on my order. " * 20
+    conversation.append({"user": long_turn, "bot": "What is your email?"})
+    conversation.append({"user": "Hold on.", "bot": "Sure."})
+
+    sent = conversation.messages_for("It is user@example.com.")
+    saved_once = conversation.input_tokens_saved
+    conversation.messages_for("It is user@example.com.")
+    conversation.append({"user": "It is user@example.com.", "bot": "Thanks."})
+
+    assert [message["content"] for message in sent] == ["Hold on.", "Sure.", "It is user@example.com."]
+    assert saved_once > 0
+    assert conversation.input_tokens_saved == 2 * saved_once
+
+
+def test_generate_bot_response_degrades_both_stages_without_budget(mocker):
+    client = _make_client(mocker, [])
+    conversation = Conversation()
+    conversation.append(
+        {"user": "Cancel my order.", "bot": "Which order?"},
+        detected_intent="Cancel an order",
+        action="ASK_ORDER_NUMBER",
+    )
+    deadline = TurnDeadline(0.0)
+
+    result = generate_bot_response(
+        client=client,
+        user_input="It is order 12345.",
+        slots={"order_number": "12345"},
+        conversation_history=conversation,
+        deadline=deadline,
+    )
+
+    assert result == {
+        "action": "CONFIRM_CANCELLATION",
+        "utterance": "Your order 12345 has been cancelled. You will receive a confirmation email shortly.",
+        "detected_intent": "Cancel an order",
+    }
+    assert deadline.degraded == ["stage_1", "stage_2"]
+    client.messages.create.assert_not_called()
+
+
+def test_generate_bot_response_falls_back_to_template_when_stage_2_times_out(mocker):
+    client = _make_client(
+        mocker,
+        [json_for_intent("Cancel an order"), APITimeoutError(request=mocker.Mock())],
+    )
+    client.with_options.return_value = client
+    deadline = TurnDeadline(30.0)
+
+    result = generate_bot_response(
+        client=client,
+        user_input="It is order 12345.",
+        slots={"order_number": "12345"},
+        conversation_history=[],
+        deadline=deadline,
+    )
+
+    assert result["action"] == "CONFIRM_CANCELLATION"
+    assert result["utterance"].startswith("Your order 12345 has been cancelled.")
+    assert result["detected_intent"] == "Cancel an order"
+    assert deadline.degraded == ["stage_2"]
+
+
+def test_generate_bot_response_asks_to_clarify_without_calling_claude_when_nothing_was_heard(mocker):
+    client = _make_client(mocker, [])
+    conversation = Conversation()
+    conversation.append(
+        {"user": "Cancel my order.", "bot": "Which order?"},
+        detected_intent="Cancel an order",
+        action="ASK_ORDER_NUMBER",
+    )
+    deadline = TurnDeadline(0.0)
+
+    result = generate_bot_response(
+        client=client,
+        user_input="",
+        slots={},
+        conversation_history=conversation,
+        deadline=deadline,
+    )
+    conversation.append({"user": "", "bot": result["utterance"]}, detected_intent=result["detected_intent"])
+
+    assert result["action"] == "ASK_CLARIFY"
+    assert result["detected_intent"] == "Cancel an order"
+    assert deadline.degraded == ["stage_1", "stage_2"]
+    client.messages.create.assert_not_called()
+    # Later turns never send empty user content, which the API rejects.
+    assert all(message["content"] for message in conversation.messages_for("It is order 12345."))
+
+
+def test_generate_bot_response_sends_each_request_once_within_remaining_budget(mocker):
+    client = _make_client(
+        mocker,
+        [
+            '{"detected_intent": "Check order status"}',
+            '{"action": "ASK_ORDER_NUMBER", "utterance": "Could you share your order number?"}',
+        ],
+    )
+    client.with_options.return_value = client
+    deadline = TurnDeadline(30.0)
+
+    generate_bot_response(
+        client=client,
+        user_input="Where is my package?",
+        slots={},
+        conversation_history=[],
+        deadline=deadline,
+    )
+
+    assert deadline.degraded == []
+    assert client.messages.create.call_count == 2
+    for call in client.with_options.call_args_list:
+        assert call.kwargs["max_retries"] == 0
+        assert 0 < call.kwargs["timeout"] <= 30.0
+
+
 def json_for_intent(intent):
     return '{"detected_intent": "%s"}' % intent
@@ -1,6 +1,8 @@
 import pytest
 
 from voice_eval.bot_tools import (
+    SLOT_EXTRACTOR,
+    extract_slots_batch,
     extract_slots_tool,
     generate_response_tool,
     policy_decision_tool,
@@ -132,3 +134,69 @@ def test_generate_response_tool_supports_new_actions(action, slots, expected_tex
     assert result.success is True
     assert result.data["action"] == action
     assert expected_text in result.data["utterance"]
+
+
+def test_slot_extractor_candidates_report_value_spans():
+    text = "Order 12,345 on my card ending 4321."
+
+    candidates = SLOT_EXTRACTOR.candidates(text)
+
+    by_slot = {candidate.slot: candidate for candidate in candidates}
+    assert by_slot["order_number"].value == "12345"
+    assert text[by_slot["order_number"].start:by_slot["order_number"].end] == "12,345"
+    assert by_slot["card_info"].value == "4321"
+    assert text[by_slot["card_info"].start:by_slot["card_info"].end] == "4321"
+
+
+def test_slot_extractor_prefers_higher_priority_rule_over_earlier_match():
+    slots = SLOT_EXTRACTOR.extract("Account is ABCDE, actually my account is FGHIJ.")
+
+    assert slots == {"account_number": "FGHIJ"}
+
+
+def test_slot_extractor_handles_text_whose_length_changes_when_lowered():
+    text = "İİ order 4567 please"
+
+    candidates = SLOT_EXTRACTOR.candidates(text)
+
+    assert [(c.slot, c.value) for c in candidates] == [("order_number", "4567")]
+    assert text[candidates[0].start:candidates[0].end] == "4567"
+
+
+def test_slot_extractor_skips_inputs_without_keywords():
+    assert SLOT_EXTRACTOR.extract("hello, I need some help today") == {}
+
+
+def test_extract_slots_batch_returns_columns_aligned_with_input_rows():
+    transcripts = ["order 12,345 please", "nothing useful here", "card ending 4321 and order 777"]
+
+    batch = extract_slots_batch(iter(transcripts))
+
+    assert batch.size == 3
+    orders = batch.columns["order_number"]
+    assert orders.values == ["12345", None, "777"]
+    assert list(orders.starts) == [6, -1, 27]
+    assert list(orders.ends) == [12, -1, 30]
+    assert batch.columns["card_info"].values == [None, None, "4321"]
+    assert batch.columns["email"].values == [None, None, None]
+
+
+def test_extract_slots_batch_rows_match_single_extraction():
+    transcripts = [
+        "Account is ABCDE, actually my account is FGHIJ.",
+        "Send it to a.b@example.com, order #42.",
+        "",
+    ]
+
+    batch = extract_slots_batch(transcripts)
+
+    assert [batch.row(i) for i in range(batch.size)] == [
+        SLOT_EXTRACTOR.extract(text) for text in transcripts
+    ]
+
+
+def test_extract_slots_batch_handles_empty_input():
+    batch = extract_slots_batch([])
+
+    assert batch.size == 0
+    assert all(column.values == [] for column in batch.columns.values())
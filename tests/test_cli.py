@@ -1,10 +1,18 @@
+import json
 from pathlib import Path
 
+import pytest
 from typer.testing import CliRunner
 
 from voice_eval import cli
 
 
+@pytest.fixture(autouse=True)
+def _run_in_tmp_path(monkeypatch, tmp_path):
+    # Default output paths such as out/journal.jsonl stay out of the repo.
+    monkeypatch.chdir(tmp_path)
+
+
 def test_main_loads_dotenv(mocker):
     load_dotenv = mocker.patch("voice_eval.cli.load_dotenv")
 
@@ -22,7 +30,7 @@ def test_scenarios_passes_real_audio_option_to_run_directory(mocker, tmp_path):
     real_audio_dir = tmp_path / "real-audio"
 
     run_directory = mocker.patch(
-        "voice_eval.cli.run_directory",
+        "voice_eval.cli.iter_directory",
         return_value=[
             {
                 "scenario_pass": True,
@@ -30,7 +38,12 @@ def test_scenarios_passes_real_audio_option_to_run_directory(mocker, tmp_path):
             }
         ],
     )
-    write_report = mocker.patch("voice_eval.cli.write_markdown_report")
+    report_writer = mocker.patch("voice_eval.cli.MarkdownReportWriter")
+    prices = mocker.patch("voice_eval.cli.PriceTable")
+    tool_client = mocker.patch("voice_eval.cli.ToolClient").return_value
+    tool_client.summary.return_value = {}
+    journal = mocker.patch("voice_eval.cli.RunJournal")
+    result_cache = mocker.patch("voice_eval.cli.ResultCache")
 
     result = runner.invoke(
         cli.app,
@@ -56,8 +69,472 @@ def test_scenarios_passes_real_audio_option_to_run_directory(mocker, tmp_path):
         judge="rules",
         real_audio_dir=str(real_audio_dir),
         real_audio_only=False,
+        stream=False,
+        client=None,
+        keep_turns=None,
+        turn_budget=None,
+        tool_client=tool_client,
+        claude_judge=None,
+        judge_workers=4,
+        workers=1,
+        shard=None,
+        durations=None,
+        pipeline=None,
+        journal=journal.return_value,
+        result_cache=result_cache.return_value,
+    )
+    result_cache.assert_called_once_with("out/result_cache.jsonl", reuse=True)
+    journal.assert_called_once_with(Path("out/journal.jsonl"))
+    journal.return_value.reset.assert_called_once_with()
+    report_writer.assert_called_once_with(Path(report_path), prices=prices.return_value)
+    report_writer.return_value.__enter__.return_value.add.assert_called_once_with(
+        {"scenario_pass": True, "intent_detected": True}
+    )
+
+
+def test_scenarios_prints_hedging_summary_when_enabled(mocker, tmp_path):
+    runner = CliRunner()
+    mocker.patch("voice_eval.cli.Anthropic", return_value=mocker.sentinel.anthropic)
+    hedged_client = mocker.Mock()
+    hedged_client.summary.return_value = {
+        "calls": 40,
+        "hedged": 2,
+        "hedge_wins": 1,
+        "hedge_rate": 0.05,
+        "before": {"p50": 0.8, "p95": 1.9, "p99": 4.0},
+        "after": {"p50": 0.8, "p95": 1.5, "p99": 2.0},
+        "overhead": {
+            "hedge_overhead": {
+                "model": "claude-haiku-4-5",
+                "calls": 2,
+                "input_tokens": 1000,
+                "output_tokens": 100,
+                "cache_creation_input_tokens": 0,
+                "cache_read_input_tokens": 0,
+            },
+        },
+    }
+    hedged_cls = mocker.patch("voice_eval.cli.HedgedClient", return_value=hedged_client)
+    run_directory = mocker.patch("voice_eval.cli.iter_directory", return_value=[])
+    mocker.patch("voice_eval.cli.MarkdownReportWriter")
+
+    result = runner.invoke(
+        cli.app,
+        [
+            "scenarios",
+            str(tmp_path / "scenarios"),
+            "--report",
+            str(tmp_path / "report.md"),
+            "--audio-dir",
+            str(tmp_path / "audio"),
+            "--hedge-percentile",
+            "95",
+        ],
+    )
+
+    assert result.exit_code == 0
+    hedged_cls.assert_called_once_with(
+        mocker.sentinel.anthropic,
+        percentile=95.0,
+        max_extra_ratio=0.1,
+    )
+    assert run_directory.call_args.kwargs["client"] is hedged_client
+    hedged_client.close.assert_called_once_with()
+    assert "Hedging: 2/40 LLM calls hedged (5.0%), hedge won 1" in result.stdout
+    assert "LLM latency before hedging: p50 0.80s, p95 1.90s, p99 4.00s" in result.stdout
+    assert "LLM latency after hedging: p50 0.80s, p95 1.50s, p99 2.00s" in result.stdout
+    assert (
+        "Hedge overhead (discarded responses, not in the token totals above): "
+        "2 responses, 1000 input, 100 output; estimated cost $0.0015"
+    ) in result.stdout
+
+
+def test_scenarios_loads_policy_file_before_running(mocker, tmp_path):
+    runner = CliRunner()
+    policy_file = tmp_path / "policies.yaml"
+    load_yaml = mocker.patch("voice_eval.cli.POLICIES.load_yaml")
+    mocker.patch("voice_eval.cli.iter_directory", return_value=[])
+    mocker.patch("voice_eval.cli.MarkdownReportWriter")
+
+    result = runner.invoke(
+        cli.app,
+        [
+            "scenarios",
+            str(tmp_path),
+            "--report",
+            str(tmp_path / "report.md"),
+            "--audio-dir",
+            str(tmp_path / "audio"),
+            "--policies",
+            str(policy_file),
+        ],
+    )
+
+    assert result.exit_code == 0
+    load_yaml.assert_called_once_with(policy_file)
+
+
+def test_scenarios_prints_tool_call_summary(mocker, tmp_path):
+    runner = CliRunner()
+    tool_client = mocker.patch("voice_eval.cli.ToolClient").return_value
+    tool_client.summary.return_value = {
+        "extract_slots": {
+            "calls": 10,
+            "cache_hits": 4,
+            "errors": 1,
+            "timeouts": 0,
+            "latency": {"p50": 0.00002, "p95": 0.0001, "p99": 0.0002},
+            "histogram": {"<=100us": 5, ">100us": 1},
+        },
+    }
+    run_directory = mocker.patch("voice_eval.cli.iter_directory", return_value=[])
+    mocker.patch("voice_eval.cli.MarkdownReportWriter")
+
+    result = runner.invoke(
+        cli.app,
+        [
+            "scenarios",
+            str(tmp_path / "scenarios"),
+            "--report",
+            str(tmp_path / "report.md"),
+            "--audio-dir",
+            str(tmp_path / "audio"),
+        ],
     )
-    write_report.assert_called_once_with(
-        [{"scenario_pass": True, "intent_detected": True}],
-        Path(report_path),
+
+    assert result.exit_code == 0
+    assert run_directory.call_args.kwargs["tool_client"] is tool_client
+    tool_client.close.assert_called_once_with()
+    assert (
+        "Tool extract_slots: 10 calls, 4 cached, 1 failed (0 timed out); "
+        "p50 0.020ms, p95 0.100ms, p99 0.200ms"
+    ) in result.stdout
+    assert "latency histogram: <=100us 5, >100us 1" in result.stdout
+
+
+def test_scenarios_pipeline_builds_stages_and_prints_their_stats(mocker, tmp_path):
+    runner = CliRunner()
+    pipeline_cls = mocker.patch("voice_eval.cli.Pipeline")
+    pipeline_cls.return_value.stats.return_value = {
+        "asr": {
+            "workers": 3,
+            "completed": 12,
+            "queue_depth": 0,
+            "max_queue_depth": 5,
+            "busy_seconds": 9.0,
+            "utilization": 0.75,
+        },
+    }
+    run_directory = mocker.patch("voice_eval.cli.iter_directory", return_value=[])
+    mocker.patch("voice_eval.cli.MarkdownReportWriter")
+
+    result = runner.invoke(
+        cli.app,
+        [
+            "scenarios",
+            str(tmp_path / "scenarios"),
+            "--report",
+            str(tmp_path / "report.md"),
+            "--audio-dir",
+            str(tmp_path / "audio"),
+            "--pipeline",
+            "--workers",
+            "2",
+            "--asr-workers",
+            "3",
+        ],
+    )
+
+    assert result.exit_code == 0
+    pipeline_cls.assert_called_once_with(
+        conversation_workers=2,
+        asr_workers=3,
+        tts_workers=4,
+        buffer_turns=32,
+        asr_processes=True,
+    )
+    assert run_directory.call_args.kwargs["pipeline"] is pipeline_cls.return_value
+    assert "Stage asr: 12 done on 3 workers, 75% utilized, max queue depth 5" in result.stdout
+
+
+def test_shard_results_merge_to_single_run_totals(mocker, tmp_path):
+    runner = CliRunner()
+    results = [
+        {"scenario_id": f"s{i}", "scenario_pass": i % 2 == 0, "intent_detected": True}
+        for i in range(5)
+    ]
+
+    def fake_run_directory(*args, shard, **kwargs):
+        from voice_eval.sharding import partition
+
+        positions = partition([r["scenario_id"] for r in results], shard[1], {})[shard[0] - 1]
+        return [dict(results[p], scenario_index=p, duration_seconds=1.0) for p in positions]
+
+    mocker.patch("voice_eval.cli.iter_directory", side_effect=fake_run_directory)
+    mocker.patch("voice_eval.cli.MarkdownReportWriter")
+    mocker.patch("voice_eval.cli.write_markdown_report")
+    (tmp_path / "suite.yaml").write_text(
+        "".join(f"- id: {r['scenario_id']}\n  goal: Check order status\n  steps: []\n" for r in results),
+        encoding="utf-8",
+    )
+    common = [
+        "--report", str(tmp_path / "report.md"),
+        "--audio-dir", str(tmp_path / "audio"),
+        "--shard-dir", str(tmp_path / "shards"),
+        "--durations", str(tmp_path / "durations.json"),
+    ]
+    for shard in ("1/2", "2/2"):
+        result = runner.invoke(cli.app, ["scenarios", str(tmp_path), *common, "--shard", shard])
+        assert result.exit_code == 0, result.stdout
+
+    merged = runner.invoke(
+        cli.app,
+        [
+            "merge",
+            str(tmp_path / "shards" / "shard-1-of-2.json"),
+            str(tmp_path / "shards" / "shard-2-of-2.json"),
+            "--report", str(tmp_path / "merged.md"),
+            "--durations", str(tmp_path / "durations.json"),
+        ],
+    )
+
+    assert merged.exit_code == 0, merged.stdout
+    assert "3/5 scenarios passed" in merged.stdout
+    assert "Intent detection: 5/5 correct" in merged.stdout
+    assert set(json.loads((tmp_path / "durations.json").read_text(encoding="utf-8"))) == {f"s{i}" for i in range(5)}
+
+
+def test_scenarios_resume_keeps_the_journal(mocker, tmp_path):
+    runner = CliRunner()
+    journal_path = tmp_path / "journal.jsonl"
+    journal_path.write_text('{"scenario_id": "done_001"}\n', encoding="utf-8")
+    run_directory = mocker.patch("voice_eval.cli.iter_directory", return_value=[])
+    mocker.patch("voice_eval.cli.MarkdownReportWriter")
+
+    result = runner.invoke(
+        cli.app,
+        [
+            "scenarios",
+            str(tmp_path / "scenarios"),
+            "--report",
+            str(tmp_path / "report.md"),
+            "--journal",
+            str(journal_path),
+            "--resume",
+        ],
     )
+
+    assert result.exit_code == 0
+    assert f"Resuming: 1 scenarios already in {journal_path}" in result.stdout
+    assert run_directory.call_args.kwargs["journal"].completed() == {
+        "done_001": {"scenario_id": "done_001"}
+    }
+
+
+def test_scenarios_rerun_bypasses_cached_results_and_reports_reuse(mocker, tmp_path):
+    runner = CliRunner()
+    result_cache = mocker.patch("voice_eval.cli.ResultCache")
+    mocker.patch(
+        "voice_eval.cli.iter_directory",
+        return_value=[
+            {"scenario_pass": True, "intent_detected": True, "from_cache": True},
+            {"scenario_pass": True, "intent_detected": True},
+        ],
+    )
+    mocker.patch("voice_eval.cli.MarkdownReportWriter")
+
+    result = runner.invoke(
+        cli.app,
+        ["scenarios", str(tmp_path / "scenarios"), "--report", str(tmp_path / "report.md"), "--rerun"],
+    )
+
+    assert result.exit_code == 0
+    result_cache.assert_called_once_with("out/result_cache.jsonl", reuse=False)
+    assert "Result cache: 1/2 scenarios reused unchanged results" in result.stdout
+
+
+def test_scenarios_trace_writes_chrome_and_otlp_files(mocker, tmp_path):
+    import json
+
+    from voice_eval.tracing import span
+
+    runner = CliRunner()
+
+    def traced_results(*args, **kwargs):
+        with span("scenario", scenario_id="traced_001"):
+            with span("turn", turn=1):
+                pass
+        yield {"scenario_pass": True, "intent_detected": True}
+
+    mocker.patch("voice_eval.cli.iter_directory", side_effect=traced_results)
+    mocker.patch("voice_eval.cli.MarkdownReportWriter")
+
+    result = runner.invoke(
+        cli.app,
+        ["scenarios", str(tmp_path / "scenarios"), "--report", str(tmp_path / "report.md"), "--trace", "out/trace"],
+    )
+
+    assert result.exit_code == 0
+    assert "Trace: 2 spans written to out/trace/trace.json" in result.stdout
+    events = json.loads((tmp_path / "out/trace/trace.json").read_text())["traceEvents"]
+    assert [event["name"] for event in events if event["ph"] == "X"] == ["scenario", "turn"]
+    otlp = json.loads((tmp_path / "out/trace/trace.otlp.json").read_text())
+    assert len(otlp["resourceSpans"][0]["scopeSpans"][0]["spans"]) == 2
+
+
+def test_scenarios_profile_writes_outputs_and_prints_hot_functions(mocker, tmp_path):
+    from voice_eval.profiling import profiled
+
+    runner = CliRunner()
+
+    def profiled_results(*args, **kwargs):
+        with profiled("stage_1"):
+            sum(range(10_000))
+        yield {"scenario_pass": True, "intent_detected": True}
+
+    mocker.patch("voice_eval.cli.iter_directory", side_effect=profiled_results)
+    mocker.patch("voice_eval.cli.MarkdownReportWriter")
+
+    result = runner.invoke(
+        cli.app,
+        ["scenarios", str(tmp_path / "scenarios"), "--report", str(tmp_path / "report.md"), "--profile", "llm",
+         "--profile-top", "3"],
+    )
+
+    assert result.exit_code == 0
+    assert "Profile (deterministic, llm) written to: out/profile/profile.pstats" in result.stdout
+    assert "Top 3 functions by self time:" in result.stdout
+    assert (tmp_path / "out/profile/profile.collapsed").read_text()
+
+
+def test_scenarios_rejects_unknown_profile_stage(mocker, tmp_path):
+    mocker.patch("voice_eval.cli.iter_directory", return_value=[])
+
+    result = CliRunner().invoke(cli.app, ["scenarios", str(tmp_path / "scenarios"), "--profile", "tts"])
+
+    assert result.exit_code == 2
+
+
+def test_scenarios_memory_prints_peak_rss_and_allocation_sites(mocker, tmp_path):
+    from voice_eval.memory import memory_scenario, memory_stage
+
+    runner = CliRunner()
+    kept = []
+
+    def tracked_results(*args, **kwargs):
+        with memory_scenario() as usage, memory_stage("asr"):
+            kept.append([bytearray(1024) for _ in range(1000)])
+        yield {"scenario_pass": True, "intent_detected": True, "memory": usage}
+
+    mocker.patch("voice_eval.cli.iter_directory", side_effect=tracked_results)
+    mocker.patch("voice_eval.cli.MarkdownReportWriter")
+
+    result = runner.invoke(
+        cli.app,
+        ["scenarios", str(tmp_path / "scenarios"), "--report", str(tmp_path / "report.md"), "--memory"],
+    )
+
+    assert result.exit_code == 0
+    assert "Memory: peak RSS " in result.stdout
+    assert "  stage asr: peak RSS " in result.stdout
+    assert "Top allocation sites (growth over the run):" in result.stdout
+
+
+def test_scenarios_prints_token_usage_priced_from_price_file(mocker, tmp_path):
+    runner = CliRunner()
+    price_file = tmp_path / "prices.yaml"
+    price_file.write_text("claude-haiku-4-5:\n  input: 2.0\n  output: 10.0\n", encoding="utf-8")
+    stage = {"calls": 2, "cache_creation_input_tokens": 0, "cache_read_input_tokens": 0}
+    mocker.patch(
+        "voice_eval.cli.iter_directory",
+        return_value=[
+            {
+                "scenario_pass": True,
+                "intent_detected": True,
+                "usage": {
+                    "stage_1": {**stage, "model": "claude-haiku-4-5", "input_tokens": 1000, "output_tokens": 100},
+                    "judge": {**stage, "model": "unpriced-model", "input_tokens": 500, "output_tokens": 50},
+                },
+            },
+            {"scenario_pass": True, "intent_detected": True},
+            {
+                "scenario_pass": True,
+                "intent_detected": True,
+                "from_cache": True,
+                "usage": {"stage_1": {**stage, "model": "claude-haiku-4-5", "input_tokens": 9000, "output_tokens": 900}},
+            },
+        ],
+    )
+    report_writer = mocker.patch("voice_eval.cli.MarkdownReportWriter")
+
+    result = runner.invoke(
+        cli.app,
+        ["scenarios", str(tmp_path / "scenarios"), "--report", str(tmp_path / "report.md"), "--prices", str(price_file)],
+    )
+
+    assert result.exit_code == 0, result.stdout
+    assert (
+        "Tokens: 1500 input (0 cache write, 0 cache read), 150 output over 4 calls; estimated cost $0.0030"
+        in result.stdout
+    )
+    assert "  stage_1 (claude-haiku-4-5): 2 calls, 1000 input, 100 output, $0.0030" in result.stdout
+    assert "Tokens of 1 reused results are not counted (spent by the run that produced them)" in result.stdout
+    assert "  judge (unpriced-model): 2 calls, 500 input, 50 output, n/a" in result.stdout
+    assert report_writer.call_args.kwargs["prices"].prices["claude-haiku-4-5"].output == 10.0
+
+
+def test_scenarios_fake_backend_runs_offline_end_to_end(tmp_path):
+    scenario_dir = tmp_path / "scenarios"
+    scenario_dir.mkdir()
+    (scenario_dir / "refund.yaml").write_text(
+        """- id: refund_001
+  goal: "Request refund for duplicate charge"
+  steps:
+    - user: "I was charged twice, I want a refund for the duplicate charge."
+      bot_expect:
+        contains_any: ["last four digits", "card"]
+    - user: "The card ends in 4829."
+      bot_expect:
+        contains_any: ["refund"]
+""",
+        encoding="utf-8",
+    )
+    real_journal = tmp_path / "out/journal.jsonl"
+    real_journal.parent.mkdir()
+    real_journal.write_text('{"scenario_id": "real_001"}\n', encoding="utf-8")
+
+    result = CliRunner().invoke(
+        cli.app,
+        ["scenarios", str(scenario_dir), "--backend", "fake", "--judge", "claude", "--stream",
+         "--fake-llm-latency", "uniform:0:0.005", "--fake-seed", "7"],
+    )
+
+    assert result.exit_code == 0, result.stdout
+    assert "1/1 scenarios passed" in result.stdout
+    assert "Fake backend: 6 Claude requests, 0 rejected with 429 (seed 7)" in result.stdout
+    assert not (tmp_path / "out/result_cache.jsonl").exists()
+    assert not (tmp_path / "out/judge_cache.jsonl").exists()
+    assert real_journal.read_text(encoding="utf-8") == '{"scenario_id": "real_001"}\n'
+    assert "refund_001" in (tmp_path / "out/journal.fake.jsonl").read_text(encoding="utf-8")
+
+
+def test_scenarios_rejects_hedge_percentile_out_of_range(mocker, tmp_path):
+    mocker.patch("voice_eval.cli.iter_directory", return_value=[])
+
+    for value in ("0", "150"):
+        result = CliRunner().invoke(
+            cli.app, ["scenarios", str(tmp_path / "scenarios"), "--hedge-percentile", value]
+        )
+
+        assert result.exit_code == 2
+
+
+def test_scenarios_rejects_invalid_fake_latency(mocker, tmp_path):
+    mocker.patch("voice_eval.cli.iter_directory", return_value=[])
+
+    result = CliRunner().invoke(
+        cli.app,
+        ["scenarios", str(tmp_path / "scenarios"), "--backend", "fake", "--fake-llm-latency", "gamma:1:2"],
+    )
+
+    assert result.exit_code == 2
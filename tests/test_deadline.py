@@ -0,0 +1,41 @@
+from voice_eval.deadline import TurnDeadline
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_turn_deadline_allows_stage_only_when_its_cost_fits():
+    clock = _FakeClock()
+    deadline = TurnDeadline(2.0, clock=clock)
+
+    assert deadline.allows("stage_2") is True
+    clock.now += 1.0
+    assert deadline.allows("stage_1") is True
+    assert deadline.allows("stage_2") is False
+
+
+def test_turn_deadline_stage_without_cost_degrades_only_when_budget_is_spent():
+    clock = _FakeClock()
+    deadline = TurnDeadline(0.5, clock=clock)
+
+    assert deadline.allows("tool_call") is True
+    clock.now += 0.5
+    assert deadline.allows("tool_call") is False
+    assert deadline.remaining() == 0.0
+
+
+def test_turn_deadline_records_degraded_stages_and_floors_request_timeout():
+    clock = _FakeClock()
+    deadline = TurnDeadline(1.0, stage_costs={"judge": 0.1}, clock=clock)
+
+    deadline.degrade("asr")
+    clock.now += 0.9
+
+    assert deadline.degraded == ["asr"]
+    assert deadline.allows("judge") is False
+    assert deadline.request_timeout() == 0.5
@@ -1,6 +1,7 @@
 from types import SimpleNamespace
 
-from voice_eval.evaluator_claude import check_bot_expect_claude
+from voice_eval.deadline import TurnDeadline
+from voice_eval.evaluator_claude import ClaudeJudge, check_bot_expect_claude
 
 
 def test_check_bot_expect_claude_returns_true_when_model_passes(mocker):
@@ -44,3 +45,86 @@ def test_check_bot_expect_claude_skips_api_call_for_empty_expect(mocker):
 
     assert result is True
     anthropic_cls.assert_not_called()
+
+
+def _verdict_response(text):
+    return SimpleNamespace(content=[SimpleNamespace(text=text)])
+
+
+def test_claude_judge_bounds_request_by_turn_deadline(mocker):
+    client = mocker.Mock()
+    client.with_options.return_value.messages.create.return_value = _verdict_response(
+        '{"pass": true, "reason": "ok"}'
+    )
+    deadline = TurnDeadline(10.0, clock=lambda: 0.0)
+
+    assert ClaudeJudge(client=client).judge("Your refund is processed.", {"contains": "refund"}, deadline=deadline)
+
+    client.with_options.assert_called_once_with(max_retries=0, timeout=10.0)
+    client.with_options.return_value.messages.create.assert_called_once()
+
+
+def test_claude_judge_reuses_cached_verdicts_across_instances(mocker, tmp_path):
+    client = mocker.Mock()
+    client.messages.create.return_value = _verdict_response('{"pass": true, "reason": "ok"}')
+    cache_path = tmp_path / "judge_cache.jsonl"
+
+    first = ClaudeJudge(client=client, cache_path=cache_path)
+    assert first.judge("Your refund is processed.", {"contains": "refund"}) is True
+    assert first.judge("Your refund is processed.", {"contains": "refund"}) is True
+
+    second = ClaudeJudge(client=client, cache_path=cache_path)
+    assert second.judge("Your refund is processed.", {"contains": "refund"}) is True
+
+    client.messages.create.assert_called_once()
+    assert first.summary() == {"requests": 1, "graded": 1, "cache_hits": 1}
+    assert second.summary()["cache_hits"] == 1
+
+
+def test_claude_judge_cache_key_includes_prompt_version(mocker, tmp_path):
+    client = mocker.Mock()
+    client.messages.create.return_value = _verdict_response('{"pass": false, "reason": "no"}')
+    cache_path = tmp_path / "judge_cache.jsonl"
+    ClaudeJudge(client=client, cache_path=cache_path).judge("Hi", {"contains": "refund"})
+
+    mocker.patch("voice_eval.evaluator_claude.JUDGE_PROMPT_VERSION", "2")
+    ClaudeJudge(client=client, cache_path=cache_path).judge("Hi", {"contains": "refund"})
+
+    assert client.messages.create.call_count == 2
+
+
+def test_claude_judge_batch_grades_uncached_turns_in_one_request(mocker):
+    client = mocker.Mock()
+    client.messages.create.return_value = _verdict_response(
+        '{"verdicts": [{"id": 0, "pass": true, "reason": "a"}, {"id": 1, "pass": false, "reason": "b"}]}'
+    )
+    judge = ClaudeJudge(client=client)
+
+    verdicts = judge.judge_batch([
+        ("Refund processed.", {"contains": "refund"}),
+        ("Hello.", {"contains": "order number"}),
+        ("Refund processed.", {"contains": "refund"}),
+        ("Anything", {}),
+    ])
+
+    assert verdicts == [True, False, True, True]
+    client.messages.create.assert_called_once()
+    prompt = client.messages.create.call_args.kwargs["messages"][0]["content"]
+    assert "Case 0:" in prompt and "Case 1:" in prompt and "Case 2:" not in prompt
+
+
+def test_claude_judge_batch_regrades_turns_missing_from_reply(mocker):
+    client = mocker.Mock()
+    client.messages.create.side_effect = [
+        _verdict_response('{"verdicts": [{"id": 0, "pass": true, "reason": "a"}]}'),
+        _verdict_response('{"pass": true, "reason": "single"}'),
+    ]
+    judge = ClaudeJudge(client=client)
+
+    verdicts = judge.judge_batch([
+        ("Refund processed.", {"contains": "refund"}),
+        ("Order 5 cancelled.", {"contains": "cancelled"}),
+    ])
+
+    assert verdicts == [True, True]
+    assert client.messages.create.call_count == 2
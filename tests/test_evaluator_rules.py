@@ -1,4 +1,7 @@
-from voice_eval.evaluator_rules import check_bot_expect_enhanced
+import pytest
+
+from voice_eval.evaluator_rules import check_bot_expect_enhanced, compile_expectation, judge_batch
+from voice_eval.scenario import Step
 
 
 def test_contains_match_passes():
@@ -49,3 +52,42 @@ def test_empty_expect_returns_true():
 
 def test_unknown_key_returns_false():
     assert check_bot_expect_enhanced("Anything", {"equals": "Anything"}) is False
+
+
+def test_compile_expectation_shares_matchers_and_prunes_redundant_phrases():
+    matcher = compile_expectation({"contains_any": ["Return Label", "return", "refund"]})
+
+    assert matcher is compile_expectation({"contains_any": ["Return Label", "return", "refund"]})
+    assert matcher.phrases == ("return", "refund")
+    assert matcher.matches("Your RETURN label is on its way.") is True
+    assert matcher.matches("Your package shipped.") is False
+
+
+def test_compile_expectation_rejects_non_string_phrases():
+    with pytest.raises(ValueError):
+        compile_expectation({"contains_any": ["ok", 3]})
+
+
+def test_step_carries_compiled_matcher():
+    step = Step(user="hi", bot_expect={"contains": "Order Number"})
+
+    assert step.matcher.phrases == ("order number",)
+    assert check_bot_expect_enhanced("your order number?", step.bot_expect, matcher=step.matcher) is True
+    assert Step().matcher.matches("anything") is True
+
+
+def test_judge_batch_matches_single_checks():
+    expects = [
+        {"contains": "refund"},
+        {"contains_any": ["order number", "last four digits"]},
+        {},
+        {"equals": "x"},
+        {"contains_any": "not a list"},
+    ]
+    texts = ["Refund processed.", "Share the last four digits.", "Anything", "x", "order number"]
+    pairs = [(text, compile_expectation(expect)) for text in texts for expect in expects]
+
+    verdicts = judge_batch(pairs * 2)
+
+    expected = [check_bot_expect_enhanced(text, expect) for text in texts for expect in expects]
+    assert verdicts == expected * 2
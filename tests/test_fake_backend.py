@@ -0,0 +1,186 @@
+import random
+
+import anthropic
+import pytest
+
+from voice_eval.audio import asr
+from voice_eval.audio.asr import cached_transcript, remember_transcript, transcribe
+from voice_eval.audio.tts import StreamingSynthesizer, synthesize
+from voice_eval.bot_brain import Conversation, detect_intent, generate_bot_response
+from voice_eval.deadline import TurnDeadline
+from voice_eval.evaluator_claude import ClaudeJudge
+from voice_eval.fake_backend import FakeAudio, FakeClaudeServer, Latency
+from voice_eval.scenario import Scenario, Step
+from voice_eval.simulator import run_scenario
+from voice_eval.usage import TurnUsage
+
+
+def test_latency_parses_constant_and_distribution_specs():
+    rng = random.Random(0)
+
+    assert Latency.parse("0.25").sample(rng) == 0.25
+    assert 0.1 <= Latency.parse("uniform:0.1:0.2").sample(rng) <= 0.2
+    assert Latency.parse("normal:0:5").sample(rng) >= 0.0
+    assert Latency.parse("lognormal:0.05:0.5").sample(rng) > 0.0
+    assert Latency.parse("exp:0").sample(rng) == 0.0
+    for spec in ("gamma:1:2", "uniform:0.1", "fast", "-1"):
+        with pytest.raises(ValueError):
+            Latency.parse(spec)
+
+
+def test_fake_audio_round_trips_scripted_text_through_tiny_wav(tmp_path):
+    wav = tmp_path / "user_1.wav"
+    recording = tmp_path / "real.mp3"
+    recording.write_bytes(b"ID3\x03not a wav")
+
+    with FakeAudio().install():
+        synthesize("My order is 12345, please CANCEL it.", str(wav))
+        transcript = transcribe(str(wav), model_size="tiny")
+        assert transcribe(str(recording)) == ""
+
+    assert transcript == "my order is 12345, please cancel it."
+    assert cached_transcript(str(wav), "tiny") == transcript
+    assert wav.read_bytes()[:4] == b"RIFF"
+    assert wav.stat().st_size < 4096
+
+
+def test_transcript_cache_keeps_only_most_recent_transcripts(monkeypatch):
+    monkeypatch.setattr(asr, "TRANSCRIPT_CACHE_SIZE", 2)
+    monkeypatch.setattr(asr, "_TRANSCRIPT_CACHE", type(asr._TRANSCRIPT_CACHE)())
+
+    remember_transcript("a.wav", "tiny", "a")
+    remember_transcript("b.wav", "tiny", "b")
+    assert cached_transcript("a.wav", "tiny") == "a"
+    remember_transcript("c.wav", "tiny", "c")
+
+    assert cached_transcript("b.wav", "tiny") is None
+    assert cached_transcript("a.wav", "tiny") == "a"
+    assert cached_transcript("c.wav", "tiny") == "c"
+
+
+def test_fake_asr_noise_is_seeded(tmp_path):
+    wav = str(tmp_path / "user_1.wav")
+    text = "I would like to return the damaged blender from order 55555 please"
+    with FakeAudio().install():
+        synthesize(text, wav)
+
+    noisy = [FakeAudio(noise=0.5, seed=seed).transcribe(wav) for seed in (1, 1, 2)]
+
+    assert noisy[0] == noisy[1]
+    assert noisy[0] != text.lower()
+    assert noisy[0] != noisy[2]
+
+
+def test_streaming_synthesizer_writes_fake_audio_with_all_sentences(tmp_path):
+    wav = str(tmp_path / "bot_1.wav")
+    with FakeAudio().install():
+        synthesizer = StreamingSynthesizer(wav)
+        synthesizer.feed("Your order was cancelled.")
+        synthesizer.feed("You will get an email.")
+        assert synthesizer.close() is not None
+
+        assert transcribe(wav) == "your order was cancelled. you will get an email."
+
+
+def test_fake_claude_server_applies_policies_and_reports_usage():
+    conversation = Conversation()
+    turn_usage = TurnUsage()
+    with FakeClaudeServer() as server, turn_usage.active():
+        client = server.client()
+        first = generate_bot_response(client, "i want to cancel my order", {}, conversation)
+        conversation.append({"user": "i want to cancel my order", "bot": first["utterance"]}, first["detected_intent"])
+        sentences = []
+        second = generate_bot_response(
+            client, "it is order 12345", {"order_number": "12345"}, conversation, on_sentence=sentences.append
+        )
+
+    assert first["detected_intent"] == "Cancel an order"
+    assert first["action"] == "ASK_ORDER_NUMBER"
+    assert second["action"] == "CONFIRM_CANCELLATION"
+    assert second["utterance"] == " ".join(sentences)
+    assert "12345" in second["utterance"]
+    assert turn_usage.stages["stage_2"]["calls"] == 2
+    assert turn_usage.stages["stage_2"]["output_tokens"] > 0
+    assert server.summary() == {"requests": 4, "rate_limited": 0}
+
+
+def test_fake_claude_server_grades_judge_batches_with_rules():
+    with FakeClaudeServer() as server:
+        judge = ClaudeJudge(client=server.client())
+        verdicts = judge.judge_batch([
+            ("Your refund has been processed.", {"contains_any": ["refund"]}),
+            ("Please hold.", {"contains": "return label"}),
+        ])
+
+    assert verdicts == [True, False]
+
+
+def test_deadline_bound_client_sends_a_timed_out_request_once():
+    with FakeClaudeServer(latency=Latency("const", 1.0)) as server:
+        client = TurnDeadline(0.1).bind(server.client())
+        with pytest.raises(anthropic.APITimeoutError):
+            detect_intent(client, "reset my password", {}, [])
+        requests = server.summary()["requests"]
+
+    assert requests == 1
+
+
+def test_turn_degrades_instead_of_failing_when_the_llm_outlives_the_budget(tmp_path):
+    scenario = Scenario(
+        id="slow_001",
+        goal="Cancel an order",
+        steps=[Step(user="I want to cancel my order.", bot_expect={"contains": "clarify"})],
+        acceptance={},
+    )
+
+    # ASR fits in the budget; the stage-1 request does not and is cut off at 1.2s.
+    with FakeAudio().install(), FakeClaudeServer(latency=Latency("const", 2.0)) as server:
+        result = run_scenario(scenario, tmp_path, client=server.client(), turn_budget=1.2)
+        requests = server.summary()["requests"]
+
+    turn = result["transcript"][0]
+    assert turn["error"] is None
+    assert turn["degraded"] == ["stage_1", "stage_2"]
+    assert turn["action"] == "ASK_CLARIFY"
+    assert turn["judge_source"] == "rules"
+    assert turn["pass"] is True
+    assert requests == 1
+
+
+def test_turn_without_budget_for_asr_asks_to_clarify_without_calling_claude(tmp_path):
+    scenario = Scenario(
+        id="no_asr_001",
+        goal="Cancel an order",
+        steps=[Step(user="I want to cancel my order."), Step(user="It is order 12345.")],
+        acceptance={},
+    )
+
+    with FakeAudio().install(), FakeClaudeServer() as server:
+        result = run_scenario(scenario, tmp_path / "fresh", client=server.client(), turn_budget=0.5)
+        requests = server.summary()["requests"]
+
+    assert requests == 0
+    for turn in result["transcript"]:
+        assert turn["error"] is None
+        assert turn["action"] == "ASK_CLARIFY"
+        assert turn["degraded"][:3] == ["asr", "stage_1", "stage_2"]
+
+
+def test_fake_claude_server_rate_limits_deterministically():
+    with FakeClaudeServer(rate_limit=1.0) as server:
+        client = server.client(max_retries=1)
+        with pytest.raises(anthropic.RateLimitError):
+            detect_intent(client, "reset my password", {}, [])
+    assert server.summary() == {"requests": 2, "rate_limited": 2}
+
+    outcomes = []
+    for _ in range(2):
+        with FakeClaudeServer(rate_limit=0.5, seed=3) as server:
+            client = server.client(max_retries=0)
+            for text in ("cancel my order", "where is my package", "reset my password", "upgrade my plan"):
+                try:
+                    outcomes.append(detect_intent(client, text, {}, []))
+                except anthropic.RateLimitError:
+                    outcomes.append(None)
+    assert outcomes[:4] == outcomes[4:]
+    assert None in outcomes
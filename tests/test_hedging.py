@@ -0,0 +1,208 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from voice_eval.hedging import HedgedClient
+
+
+class _ScriptedMessages:
+    """Fake ``messages`` API whose calls sleep for scripted durations."""
+
+    def __init__(self, delays):
+        self._delays = list(delays)
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def create(self, **kwargs):
+        with self._lock:
+            index = self.calls
+            self.calls += 1
+        time.sleep(self._delays[index])
+        return SimpleNamespace(index=index, usage=SimpleNamespace(input_tokens=10, output_tokens=2))
+
+
+def _warm_up(hedger, count):
+    for _ in range(count):
+        hedger.messages.create(max_tokens=128)
+
+
+def test_hedged_client_does_not_hedge_before_min_samples():
+    messages = _ScriptedMessages([0.0, 0.0, 0.05])
+    hedger = HedgedClient(SimpleNamespace(messages=messages), min_samples=5, max_extra_ratio=1.0)
+
+    responses = [hedger.messages.create(max_tokens=128) for _ in range(3)]
+
+    assert [response.index for response in responses] == [0, 1, 2]
+    assert messages.calls == 3
+    assert hedger.summary()["hedged"] == 0
+
+
+def test_hedged_client_sends_duplicate_for_slow_call_and_first_response_wins():
+    messages = _ScriptedMessages([0.0] * 4 + [1.0, 0.0])
+    hedger = HedgedClient(
+        SimpleNamespace(messages=messages),
+        percentile=50,
+        min_samples=4,
+        max_extra_ratio=1.0,
+    )
+    _warm_up(hedger, 4)
+
+    response = hedger.messages.create(max_tokens=128)
+    hedger.close()
+
+    assert response.index == 5
+    summary = hedger.summary()
+    assert summary["calls"] == 5
+    assert summary["hedged"] == 1
+    assert summary["hedge_wins"] == 1
+    assert summary["hedge_rate"] == pytest.approx(0.2)
+    assert summary["before"]["p99"] > summary["after"]["p99"]
+    # The losing primary's tokens were spent too and count as hedge overhead.
+    assert summary["overhead"]["hedge_overhead"]["calls"] == 1
+    assert summary["overhead"]["hedge_overhead"]["input_tokens"] == 10
+
+
+def test_hedged_client_respects_extra_request_budget():
+    messages = _ScriptedMessages([0.0] * 4 + [0.2, 0.2])
+    hedger = HedgedClient(
+        SimpleNamespace(messages=messages),
+        percentile=50,
+        min_samples=4,
+        max_extra_ratio=0.1,
+    )
+    _warm_up(hedger, 4)
+
+    response = hedger.messages.create(max_tokens=128)
+    hedger.close()
+
+    assert response.index == 4
+    assert messages.calls == 5
+    assert hedger.summary()["hedged"] == 0
+
+
+def test_hedged_client_keeps_separate_histories_per_max_tokens():
+    messages = _ScriptedMessages([0.0] * 4 + [0.05])
+    hedger = HedgedClient(
+        SimpleNamespace(messages=messages),
+        percentile=50,
+        min_samples=4,
+        max_extra_ratio=1.0,
+    )
+    _warm_up(hedger, 4)
+
+    hedger.messages.create(max_tokens=256)
+
+    assert messages.calls == 5
+    assert hedger.summary()["hedged"] == 0
+
+
+class _ScriptedStreams(_ScriptedMessages):
+    """Fake ``messages`` API whose streams take scripted durations to open."""
+
+    def __init__(self, delays):
+        super().__init__(delays)
+        self.closed = []
+
+    def stream(self, **kwargs):
+        messages = self
+
+        class _Stream:
+            def __init__(self, response):
+                self.index = response.index
+                self._start = SimpleNamespace(type="message_start", message=response)
+
+            def __iter__(self):
+                yield self._start
+
+            def close(self):
+                messages.closed.append(self.index)
+
+        class _Manager:
+            def __enter__(self):
+                return _Stream(messages.create(**kwargs))
+
+        return _Manager()
+
+
+def test_hedged_client_hedges_stream_opening_and_closes_losing_stream():
+    messages = _ScriptedStreams([0.0] * 4 + [1.0, 0.0])
+    hedger = HedgedClient(
+        SimpleNamespace(messages=messages),
+        percentile=50,
+        min_samples=4,
+        max_extra_ratio=1.0,
+    )
+    for _ in range(4):
+        with hedger.messages.stream(max_tokens=128):
+            pass
+
+    with hedger.messages.stream(max_tokens=128) as stream:
+        assert stream.index == 5
+    hedger.close()
+
+    assert sorted(messages.closed) == [0, 1, 2, 3, 4, 5]
+    summary = hedger.summary()
+    assert summary["calls"] == 5
+    assert summary["hedged"] == 1
+    assert summary["hedge_wins"] == 1
+    assert summary["overhead"]["hedge_overhead"]["input_tokens"] == 10
+
+
+def test_hedged_client_with_options_keeps_hedging_on_the_copy():
+    messages = _ScriptedMessages([0.0] * 4 + [1.0, 0.0])
+    options = []
+
+    def with_options(**kwargs):
+        options.append(kwargs)
+        return SimpleNamespace(messages=messages)
+
+    hedger = HedgedClient(
+        SimpleNamespace(messages=messages, with_options=with_options),
+        percentile=50,
+        min_samples=4,
+        max_extra_ratio=1.0,
+    )
+    _warm_up(hedger, 4)
+
+    response = hedger.with_options(max_retries=0).messages.create(max_tokens=128)
+    hedger.close()
+
+    assert options == [{"max_retries": 0}]
+    assert response.index == 5
+    assert hedger.summary()["hedged"] == 1
+
+
+def test_hedged_client_primary_does_not_queue_behind_busy_pool():
+    messages = _ScriptedMessages([0.0] * 5)
+    hedger = HedgedClient(
+        SimpleNamespace(messages=messages),
+        percentile=50,
+        min_samples=4,
+        max_extra_ratio=1.0,
+        max_workers=1,
+    )
+    _warm_up(hedger, 4)
+    release = threading.Event()
+    hedger._executor.submit(release.wait)
+
+    started = time.monotonic()
+    response = hedger.messages.create(max_tokens=128)
+    elapsed = time.monotonic() - started
+    release.set()
+    hedger.close()
+
+    assert response.index == 4
+    assert elapsed < 0.5
+
+
+def test_hedged_client_summary_keeps_only_recent_latencies():
+    messages = _ScriptedMessages([0.0] * 5)
+    hedger = HedgedClient(SimpleNamespace(messages=messages), min_samples=100, summary_size=3)
+
+    _warm_up(hedger, 5)
+
+    assert hedger.summary()["calls"] == 5
+    assert len(hedger._unhedged_latencies) == 3
+    assert len(hedger._effective_latencies) == 3
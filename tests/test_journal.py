@@ -0,0 +1,51 @@
+import json
+
+from voice_eval.journal import RunJournal
+
+
+def test_journal_appends_results_and_reads_them_back_by_scenario_id(tmp_path):
+    journal = RunJournal(tmp_path / "out" / "journal.jsonl")
+
+    journal.append({"scenario_id": "a", "scenario_pass": True})
+    journal.append({"scenario_id": "b", "scenario_pass": False})
+    journal.append({"scenario_id": "a", "scenario_pass": False})
+
+    assert journal.completed() == {
+        "a": {"scenario_id": "a", "scenario_pass": False},
+        "b": {"scenario_id": "b", "scenario_pass": False},
+    }
+
+
+def test_journal_skips_truncated_line_and_keeps_appending_after_it(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    path.write_text(json.dumps({"scenario_id": "a"}) + "\n" + '{"scenario_id": "b", "tra', encoding="utf-8")
+    journal = RunJournal(path)
+
+    journal.append({"scenario_id": "c"})
+
+    assert set(journal.completed()) == {"a", "c"}
+
+
+def test_journal_reset_discards_earlier_runs(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    path.write_text(json.dumps({"scenario_id": "a"}) + "\n", encoding="utf-8")
+    journal = RunJournal(path)
+
+    journal.reset()
+
+    assert journal.completed() == {}
+    journal.append({"scenario_id": "b"})
+    assert set(journal.completed()) == {"b"}
+
+
+def test_journal_index_leaves_out_results_with_other_fingerprints(tmp_path):
+    journal = RunJournal(tmp_path / "journal.jsonl")
+    journal.append({"scenario_id": "a"}, fingerprint="one")
+    journal.append({"scenario_id": "b"}, fingerprint="two")
+    journal.append({"scenario_id": "c"})
+
+    offsets = journal.index({"a": "one", "b": "changed", "c": "three"})
+
+    assert set(offsets) == {"a"}
+    assert journal.read(offsets["a"]) == {"scenario_id": "a"}
+    assert set(journal.index()) == {"a", "b", "c"}
@@ -0,0 +1,72 @@
+import threading
+
+from voice_eval.judging import JudgePool
+
+
+class _FakeJudge:
+    batch_size = 20
+
+    def __init__(self, fail=False):
+        self.batches = []
+        self.fail = fail
+        self.release = threading.Event()
+
+    def judge_batch(self, items):
+        self.release.wait(timeout=5)
+        self.batches.append(list(items))
+        if self.fail:
+            raise RuntimeError("judge unavailable")
+        return ["refund" in bot_text.lower() for bot_text, _ in items]
+
+
+def test_judge_pool_fills_pass_fields_in_batches():
+    judge = _FakeJudge()
+    pool = JudgePool(judge, workers=1)
+    entries = [{"turn": i} for i in range(3)]
+
+    for entry, text in zip(entries, ["Refund done.", "Hello.", "Your refund is on its way."]):
+        pool.submit(entry, text, {"contains": "refund"})
+    assert [entry["pass"] for entry in entries] == [None, None, None]
+    judge.release.set()
+    pool.close()
+
+    assert [entry["pass"] for entry in entries] == [True, False, True]
+    assert sum(len(batch) for batch in judge.batches) == 3
+    assert len(judge.batches) <= 2
+
+
+def test_judge_pool_marks_turns_failed_when_judge_errors():
+    judge = _FakeJudge(fail=True)
+    judge.release.set()
+    pool = JudgePool(judge, workers=2)
+    entry = {"turn": 1}
+
+    pool.submit(entry, "Refund done.", {"contains": "refund"})
+    pool.close()
+
+    assert entry["pass"] is False
+    assert entry["judge_error"] == "judge unavailable"
+
+
+def test_judge_pool_splits_batch_token_usage_over_its_turns():
+    from types import SimpleNamespace
+
+    from voice_eval.usage import record_usage
+
+    class _MeteredJudge(_FakeJudge):
+        def judge_batch(self, items):
+            usage = SimpleNamespace(input_tokens=301, output_tokens=30)
+            record_usage("judge", "claude-haiku-4-5", SimpleNamespace(usage=usage))
+            return super().judge_batch(items)
+
+    judge = _MeteredJudge()
+    pool = JudgePool(judge, workers=1, batch_size=3)
+    entries = [{"turn": i} for i in range(3)]
+    for entry in entries:
+        pool.submit(entry, "Refund done.", {"contains": "refund"})
+    judge.release.set()
+    pool.close()
+
+    assert len(judge.batches) == 1
+    assert [entry["usage"]["judge"]["input_tokens"] for entry in entries] == [101, 100, 100]
+    assert sum(entry["usage"]["judge"]["calls"] for entry in entries) == 1
@@ -1,3 +1,5 @@
+import pytest
+
 from voice_eval.reporters.markdown import write_markdown_report
 
 
@@ -107,3 +109,237 @@ def test_write_markdown_report_shows_detected_intent_per_turn(tmp_path):
         "(expected: Report a missing package)"
     ) in content
     assert "**Detected Intent:** Report a missing package ✅" in content
+
+
+def test_write_markdown_report_shows_input_tokens_saved_by_compaction(tmp_path):
+    out_path = tmp_path / "report.md"
+
+    write_markdown_report(
+        [
+            {
+                "scenario_id": "cancel_order_stress_001",
+                "goal": "Cancel an order",
+                "scenario_pass": True,
+                "intent_detected": True,
+                "first_correct_turn": 1,
+                "steps_expected": 0,
+                "steps_passed": 0,
+                "input_tokens_saved": 1200,
+                "transcript": [],
+            }
+        ],
+        out_path,
+    )
+
+    content = out_path.read_text(encoding="utf-8")
+
+    assert "**Input Tokens Saved by History Compaction:** ~1200" in content
+
+
+def test_write_markdown_report_shows_verdict_source_and_escalation_rate(tmp_path):
+    out_path = tmp_path / "report.md"
+
+    write_markdown_report(
+        [
+            {
+                "scenario_id": "check_order_status_001",
+                "goal": "Check order status",
+                "scenario_pass": True,
+                "intent_detected": True,
+                "first_correct_turn": 1,
+                "steps_expected": 2,
+                "steps_passed": 2,
+                "judge": "tiered",
+                "judged_turns": 4,
+                "judge_escalations": 1,
+                "transcript": [
+                    {
+                        "turn": 1,
+                        "user_text": "Where is my order?",
+                        "user_asr": "where is my order",
+                        "bot_text": "It is being processed.",
+                        "detected_intent": "Check order status",
+                        "expected_intent": "Check order status",
+                        "intent_correct": True,
+                        "pass": True,
+                        "judge_source": "claude",
+                        "expectation": {"contains": "status"},
+                        "user_wav": "user_1.wav",
+                        "bot_wav": "bot_1.wav",
+                    }
+                ],
+            }
+        ],
+        out_path,
+    )
+
+    content = out_path.read_text(encoding="utf-8")
+
+    assert "**Judge Escalation Rate:** 1/4 turns escalated to Claude (25%)" in content
+    assert "**Verdict Source:** claude" in content
+
+
+def _result(scenario_id, index):
+    return {
+        "scenario_id": scenario_id,
+        "scenario_index": index,
+        "goal": "Check order status",
+        "scenario_pass": True,
+        "intent_detected": True,
+        "first_correct_turn": 1,
+        "steps_expected": 0,
+        "steps_passed": 0,
+        "transcript": [],
+    }
+
+
+def test_report_writer_shows_sections_during_the_run_and_orders_them_at_close(tmp_path):
+    from voice_eval.reporters.markdown import MarkdownReportWriter
+
+    out_path = tmp_path / "report.md"
+    writer = MarkdownReportWriter(out_path)
+
+    writer.add(_result("second", 1))
+    partial = out_path.read_text(encoding="utf-8")
+    writer.add(_result("first", 0))
+    writer.close()
+    final = out_path.read_text(encoding="utf-8")
+
+    assert "Run in progress" in partial
+    assert "## second: Check order status" in partial
+    assert "Run in progress" not in final
+    assert final.index("| first |") < final.index("| second |")
+    assert final.index("## first:") < final.index("## second:")
+    assert [row["scenario_id"] for row in writer.rows] == ["first", "second"]
+    assert "transcript" not in writer.rows[0]
+
+
+def test_report_writer_marks_report_incomplete_when_the_run_fails(tmp_path):
+    from voice_eval.reporters.markdown import MarkdownReportWriter
+
+    out_path = tmp_path / "report.md"
+    with pytest.raises(RuntimeError):
+        with MarkdownReportWriter(out_path) as writer:
+            writer.add(_result("first", 0))
+            raise RuntimeError("run failed")
+
+    report = out_path.read_text(encoding="utf-8")
+    assert "Run in progress" in report
+    assert "## first: Check order status" in report
+    assert report.rstrip().endswith("_Run ended early: the summary was not written; "
+                                    "the sections above are the scenarios that finished._")
+    assert "## Summary" not in report
+
+
+def _timed_turn(turn, intent, **timings):
+    return {
+        "turn": turn,
+        "user_text": "hi",
+        "user_asr": "hi",
+        "bot_text": "hello",
+        "detected_intent": intent,
+        "expected_intent": intent,
+        "intent_correct": True,
+        "pass": True,
+        "expectation": {},
+        "user_wav": "u.wav",
+        "bot_wav": "b.wav",
+        "timings": timings,
+    }
+
+
+def test_write_markdown_report_adds_latency_section_from_stage_timings(tmp_path):
+    out_path = tmp_path / "report.md"
+    status = _result("status", 0)
+    status["transcript"] = [
+        _timed_turn(1, "Check order status", asr=0.2, stage_1=0.5, total=1.0),
+        _timed_turn(2, "Check order status", asr=0.4, stage_1=2.5, total=3.0),
+    ]
+    refund = _result("refund", 1)
+    refund["transcript"] = [_timed_turn(1, "Request refund", asr=0.3, stage_1=0.6, total=2.0)]
+    resumed = _result("resumed", 2)
+    resumed["from_journal"] = True
+    resumed["transcript"] = [_timed_turn(1, "Request refund", asr=9.0, stage_1=9.0, total=20.0)]
+
+    write_markdown_report([status, refund, resumed], out_path)
+    content = out_path.read_text(encoding="utf-8")
+
+    latency = content[content.index("## Latency"):content.index("## status:")]
+    assert latency.index("| asr |") < latency.index("| stage_1 |")
+    assert "| asr | 3 | 0.30s | 0.39s | 0.40s |" in latency
+    assert "| Check order status | 2 | 2.00s | 2.90s | 2.98s |" in latency
+    assert "| **overall** | 3 | 2.00s |" in latency
+    assert latency.index("| status | 2 | 3.00s | stage_1 (2.50s) |") < latency.index("| refund | 1 | 2.00s |")
+    assert "| resumed |" not in latency
+    assert "**Stage Timings:** asr 0.20s, stage_1 0.50s, total 1.00s" in content
+
+
+def test_write_markdown_report_omits_latency_section_without_timings(tmp_path):
+    out_path = tmp_path / "report.md"
+
+    write_markdown_report([_result("untimed", 0)], out_path)
+
+    assert "## Latency" not in out_path.read_text(encoding="utf-8")
+
+
+def test_write_markdown_report_adds_memory_section_for_tracked_results(tmp_path):
+    out_path = tmp_path / "report.md"
+    results = []
+    for index, (scenario_id, rss) in enumerate((("first", 100 * 1_048_576), ("second", 150 * 1_048_576))):
+        result = _result(scenario_id, index)
+        result["memory"] = {
+            "traced_bytes": 1_048_576,
+            "traced_peak_bytes": 3 * 1_048_576,
+            "rss_bytes": rss,
+            "rss_peak_bytes": rss,
+            "stage_rss_peak_bytes": {"judge": rss, "asr": rss - 1_048_576},
+            "top_allocations": [{"site": "asr.py:10", "size_bytes": 1_048_576, "count": 4}],
+        }
+        results.append(result)
+    cached = _result("cached", 2)
+    cached["from_cache"] = True
+    cached["memory"] = dict(results[0]["memory"], rss_peak_bytes=900 * 1_048_576)
+    results.append(cached)
+
+    write_markdown_report(results, out_path)
+    content = out_path.read_text(encoding="utf-8")
+
+    memory = content[content.index("## Memory"):content.index("## first:")]
+    assert "**Peak RSS:** 150.0 MB (during second)" in memory
+    assert "**RSS Over the Run:** 100.0 MB after first, 150.0 MB after second (+50.0 MB)" in memory
+    assert memory.index("| asr | 149.0 MB |") < memory.index("| judge | 150.0 MB |")
+    assert "| asr.py:10 | 2.0 MB | 8 |" in memory
+    assert "**Memory:** peak traced 3.0 MB, RSS 100.0 MB (peak 100.0 MB)" in content
+
+
+def test_write_markdown_report_adds_token_usage_section_with_costs(tmp_path):
+    from voice_eval.usage import ModelPrice, PriceTable
+
+    def stage(input_tokens, output_tokens):
+        return {"model": "haiku", "calls": 1, "input_tokens": input_tokens, "output_tokens": output_tokens,
+                "cache_creation_input_tokens": 0, "cache_read_input_tokens": 0}
+
+    out_path = tmp_path / "report.md"
+    result = _result("refund", 0)
+    turn = _timed_turn(1, "Request refund", total=1.0)
+    turn["usage"] = {"stage_1": stage(1000, 10), "stage_2": stage(2000, 60), "judge": stage(500, 5)}
+    result["transcript"] = [turn]
+
+    reused = []
+    for index, flag in enumerate(("from_cache", "from_journal"), start=1):
+        earlier = _result(flag, index)
+        earlier[flag] = True
+        earlier["transcript"] = [dict(turn)]
+        reused.append(earlier)
+
+    write_markdown_report(
+        [result, *reused], out_path, prices=PriceTable({"haiku": ModelPrice(1.0, 5.0, 1.25, 0.1)})
+    )
+    content = out_path.read_text(encoding="utf-8")
+
+    section = content[content.index("## Token Usage"):content.index("## refund:")]
+    assert "**Total:** 3500 input, 75 output, 0 cache write, 0 cache read tokens over 3 calls; estimated cost $0.0039" in section
+    assert "| stage_2 | haiku | 1 | 2000 | 60 | 0 | 0 | $0.0023 |" in section
+    assert section.index("| stage_1 |") < section.index("| stage_2 |") < section.index("| judge |")
+    assert "| Request refund | 1 | 3 | 3500 | 75 | $0.0039 | $0.0039 |" in section
+    assert "**Tokens:** stage_1 1000 in / 10 out, stage_2 2000 in / 60 out, judge 500 in / 5 out ($0.0039)" in content
@@ -0,0 +1,86 @@
+import tracemalloc
+
+from voice_eval.memory import MemoryCollector, MemoryTracker, current_rss, memory_scenario, memory_stage
+
+
+def _allocate_blocks():
+    return [bytearray(1024) for _ in range(2000)]
+
+
+def test_hooks_are_shared_no_ops_without_a_tracker():
+    assert memory_stage("asr") is memory_stage("stage_1")
+    with memory_scenario() as usage:
+        assert usage is None
+
+
+def test_current_rss_reports_bytes():
+    assert current_rss() > 1_048_576
+
+
+def test_tracker_measures_scenarios_stages_and_allocation_sites():
+    tracker = MemoryTracker(top=5, interval=0.01)
+    kept = []
+    with tracker.install():
+        with memory_scenario() as usage:
+            with memory_stage("asr"):
+                kept.append(_allocate_blocks())
+    assert not tracemalloc.is_tracing()
+
+    assert usage["traced_peak_bytes"] >= usage["traced_bytes"] >= 2000 * 1024
+    assert usage["rss_peak_bytes"] >= usage["stage_rss_peak_bytes"]["asr"] > 0
+    assert usage["top_allocations"][0]["site"].endswith("test_memory.py:7")
+    assert usage["top_allocations"][0]["count"] >= 2000
+
+    summary = tracker.summary()
+    assert summary["peak_rss_bytes"] >= summary["stage_rss_peak_bytes"]["asr"]
+    assert summary["top_allocations"][0]["site"].endswith("test_memory.py:7")
+
+
+def test_collector_tracks_peaks_growth_and_summed_sites():
+    collector = MemoryCollector()
+    site = {"site": "asr.py:10", "size_bytes": 1000, "count": 2}
+    for scenario_id, rss in (("first", 100), ("second", 300)):
+        collector.add({
+            "scenario_id": scenario_id,
+            "memory": {
+                "traced_bytes": rss,
+                "traced_peak_bytes": rss * 2,
+                "rss_bytes": rss,
+                "rss_peak_bytes": rss + 1,
+                "stage_rss_peak_bytes": {"asr": rss},
+                "top_allocations": [site],
+            },
+        })
+    collector.add({"scenario_id": "untracked"})
+
+    assert collector.rss == [("first", 100), ("second", 300)]
+    assert collector.peak_rss == (301, "second")
+    assert collector.peak_traced == (600, "second")
+    assert collector.stages == {"asr": 300}
+    assert collector.top_sites() == [("asr.py:10", {"size_bytes": 2000, "count": 4})]
+
+
+def test_run_directory_attaches_memory_usage_while_tracking(mocker, tmp_path):
+    from voice_eval.bot_tools import ToolResult
+    from voice_eval.scenario import Scenario, Step
+    from voice_eval.simulator import run_directory
+
+    scenario = Scenario(id="tracked_001", goal="Check order status", steps=[Step(user="hi", bot_expect={})], acceptance={})
+    mocker.patch("voice_eval.simulator.load_scenarios", return_value=[scenario])
+    mocker.patch("voice_eval.simulator.Anthropic", return_value=mocker.sentinel.client)
+    mocker.patch("voice_eval.simulator.synthesize")
+    mocker.patch("voice_eval.simulator.transcribe", return_value="hi")
+    tool_client = mocker.Mock()
+    tool_client.call_tool.return_value = ToolResult(success=True, data={})
+    mocker.patch("voice_eval.simulator.ToolClient", return_value=tool_client)
+    mocker.patch(
+        "voice_eval.simulator.generate_bot_response",
+        return_value={"action": "ASK_CLARIFY", "utterance": "ok", "detected_intent": "Check order status"},
+    )
+
+    assert "memory" not in run_directory(tmp_path, tmp_path / "audio")[0]
+    with MemoryTracker().install():
+        (result,) = run_directory(tmp_path, tmp_path / "audio")
+
+    assert set(result["memory"]["stage_rss_peak_bytes"]) >= {"user_tts", "asr", "slots", "bot_tts", "judge"}
+    assert result["memory"]["traced_peak_bytes"] > 0
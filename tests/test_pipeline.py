@@ -0,0 +1,107 @@
+import threading
+from pathlib import Path
+
+import pytest
+
+from voice_eval.bot_tools import ToolResult
+from voice_eval.pipeline import Pipeline
+from voice_eval.scenario import Scenario, Step
+from voice_eval.simulator import run_directory
+
+
+def _scenario(scenario_id, turns):
+    return Scenario(
+        id=scenario_id,
+        goal="Check order status",
+        steps=[Step(user=f"{scenario_id} turn {i}", bot_expect={}) for i in range(1, turns + 1)],
+        acceptance={},
+    )
+
+
+def _patch_stages(mocker):
+    mocker.patch("voice_eval.pipeline.synthesize")
+    mocker.patch("voice_eval.simulator.synthesize")
+    mocker.patch(
+        "voice_eval.pipeline.transcribe",
+        side_effect=lambda wav, model_size: Path(wav).stem,
+    )
+    mocker.patch("voice_eval.simulator.transcribe", side_effect=AssertionError("ASR ran inline"))
+    tool_client = mocker.Mock()
+    tool_client.call_tool.return_value = ToolResult(success=True, data={})
+    mocker.patch("voice_eval.simulator.ToolClient", return_value=tool_client)
+    mocker.patch("voice_eval.simulator.Anthropic", return_value=mocker.sentinel.client)
+
+
+def test_pipeline_run_keeps_turn_order_and_fills_bot_audio(mocker, tmp_path):
+    scenarios = [_scenario(f"scenario_{i}", 3) for i in range(3)]
+    mocker.patch("voice_eval.simulator.load_scenarios", return_value=scenarios)
+    _patch_stages(mocker)
+    seen = []
+    lock = threading.Lock()
+
+    def fake_generate_bot_response(client, user_input, slots, conversation_history):
+        with lock:
+            seen.append((threading.current_thread().name, user_input, len(conversation_history)))
+        return {"action": "ASK_CLARIFY", "utterance": "ok", "detected_intent": "Check order status"}
+
+    mocker.patch("voice_eval.simulator.generate_bot_response", side_effect=fake_generate_bot_response)
+
+    pipeline = Pipeline(conversation_workers=2, asr_workers=2, tts_workers=2, buffer_turns=2, asr_processes=False)
+    results = run_directory(tmp_path, tmp_path / "audio", pipeline=pipeline)
+
+    assert [r["scenario_id"] for r in results] == [s.id for s in scenarios]
+    for result in results:
+        assert [entry["user_asr"] for entry in result["transcript"]] == ["user_1", "user_2", "user_3"]
+        assert all(entry["time_to_first_audio"] is not None for entry in result["transcript"])
+        assert all(
+            {"user_tts", "asr", "bot_tts", "total"} <= set(entry["timings"]) for entry in result["transcript"]
+        )
+    # Each conversation sees its turns in order, with the history of the earlier ones.
+    assert sorted(history for _, _, history in seen) == [0, 0, 0, 1, 1, 1, 2, 2, 2]
+
+    stats = pipeline.stats()
+    assert set(stats) == {"user_audio", "asr", "conversation", "bot_audio"}
+    assert stats["asr"]["completed"] == 9
+    assert stats["bot_audio"]["completed"] == 9
+    assert stats["conversation"]["completed"] == 3
+    assert stats["asr"]["queue_depth"] == 0
+    assert 0.0 <= stats["asr"]["utilization"]
+
+
+def test_pipeline_bounds_prefetched_turns(mocker, tmp_path):
+    scenario = _scenario("bounded", 6)
+    mocker.patch("voice_eval.simulator.load_scenarios", return_value=[scenario])
+    _patch_stages(mocker)
+    gate = threading.Event()
+    prefetched = []
+
+    def fake_generate_bot_response(client, user_input, slots, conversation_history):
+        gate.wait(timeout=5)
+        return {"action": "ASK_CLARIFY", "utterance": "ok", "detected_intent": "Check order status"}
+
+    mocker.patch("voice_eval.simulator.generate_bot_response", side_effect=fake_generate_bot_response)
+    mocker.patch(
+        "voice_eval.pipeline.transcribe",
+        side_effect=lambda wav, model_size: prefetched.append(wav) or Path(wav).stem,
+    )
+    pipeline = Pipeline(buffer_turns=2, asr_processes=False)
+    runner = threading.Thread(target=run_directory, args=(tmp_path, tmp_path / "audio"), kwargs={"pipeline": pipeline})
+    runner.start()
+    try:
+        threading.Event().wait(0.3)
+        # One turn handed to the blocked conversation plus two buffered.
+        assert len(prefetched) == 3
+    finally:
+        gate.set()
+        runner.join(timeout=5)
+    assert len(prefetched) == 6
+
+
+def test_pipeline_propagates_stage_errors_to_the_turn(mocker, tmp_path):
+    scenario = _scenario("broken", 2)
+    mocker.patch("voice_eval.simulator.load_scenarios", return_value=[scenario])
+    _patch_stages(mocker)
+    mocker.patch("voice_eval.pipeline.transcribe", side_effect=RuntimeError("asr crashed"))
+
+    with pytest.raises(RuntimeError, match="asr crashed"):
+        run_directory(tmp_path, tmp_path / "audio", pipeline=Pipeline(asr_processes=False))
@@ -0,0 +1,97 @@
+import pytest
+
+from voice_eval.bot_brain import _create_intent_action_prompt, _create_intent_detection_prompt
+from voice_eval.bot_tools import generate_response_tool, policy_decision_tool
+from voice_eval.policies import POLICIES, IntentPolicy, PolicyRegistry
+
+
+_BILLING_YAML = """
+intents:
+  - intent: Update billing address
+    required_slot: account_number
+    ask_action: ASK_ACCOUNT_NUMBER
+    final_action: CONFIRM_BILLING_UPDATE
+    final_response_guidance: Include "billing address".
+    final_response: Billing address for account {account_number} updated.
+"""
+
+
+@pytest.fixture
+def registry():
+    return PolicyRegistry(POLICIES)
+
+
+def test_registry_decides_ask_then_final_action(registry):
+    assert registry.decide("Cancel an order", {}) == "ASK_ORDER_NUMBER"
+    assert registry.decide("Cancel an order", {"order_number": "1"}) == "CONFIRM_CANCELLATION"
+    assert registry.decide("Unknown intent", {"order_number": "1"}) == "ASK_CLARIFY"
+
+
+def test_decide_batch_matches_single_decisions(registry):
+    intents = ["Reset account password", "Reset account password", "Nope", "Check order status"]
+    slots = [{}, {"email": "a@b.co"}, {}, {"order_number": "7"}]
+
+    actions = registry.decide_batch(intents, slots)
+
+    assert actions == [registry.decide(i, s) for i, s in zip(intents, slots)]
+    assert actions == ["ASK_EMAIL", "SEND_RESET_LINK", "ASK_CLARIFY", "PROVIDE_STATUS"]
+
+
+def test_decide_batch_rejects_mismatched_lengths(registry):
+    with pytest.raises(ValueError):
+        registry.decide_batch(["Cancel an order"], [])
+
+
+def test_register_refreshes_intent_detection_schema(registry):
+    assert "Update billing address" not in registry.intent_detection_schema["properties"]["detected_intent"]["enum"]
+
+    registry.register(IntentPolicy(
+        "Update billing address",
+        "account_number",
+        "ASK_ACCOUNT_NUMBER",
+        "CONFIRM_BILLING_UPDATE",
+        'Include "billing address".',
+    ))
+
+    assert registry.intents[-1] == "Update billing address"
+    assert "Update billing address" in registry.intent_detection_schema["properties"]["detected_intent"]["enum"]
+    assert '- "Update billing address"' in registry.intent_list
+
+
+def test_response_schema_is_built_once_per_policy():
+    policy = POLICIES["Cancel an order"]
+
+    assert policy.response_schema is policy.response_schema
+    assert policy.response_schema["properties"]["action"]["enum"] == [
+        "ASK_ORDER_NUMBER",
+        "CONFIRM_CANCELLATION",
+    ]
+
+
+def test_load_yaml_makes_intent_available_to_tools_and_bot_brain(tmp_path, monkeypatch):
+    registry = PolicyRegistry(POLICIES)
+    monkeypatch.setattr("voice_eval.policies.POLICIES", registry)
+    monkeypatch.setattr("voice_eval.bot_tools.POLICIES", registry)
+    monkeypatch.setattr("voice_eval.bot_brain.POLICIES", registry)
+    policy_file = tmp_path / "policies.yaml"
+    policy_file.write_text(_BILLING_YAML, encoding="utf-8")
+
+    loaded = registry.load_yaml(policy_file)
+
+    assert [policy.intent for policy in loaded] == ["Update billing address"]
+    decision = policy_decision_tool("Update billing address", "help", {"account_number": "AB123"})
+    assert decision.data["action"] == "CONFIRM_BILLING_UPDATE"
+    response = generate_response_tool("CONFIRM_BILLING_UPDATE", {"account_number": "AB123"})
+    assert response.data["utterance"] == "Billing address for account AB123 updated."
+    assert '- "Update billing address"' in _create_intent_detection_prompt({})
+    prompt = _create_intent_action_prompt("Update billing address", {})
+    assert 'Required slot: "account_number" (account number)' in prompt
+    assert 'choose "ASK_ACCOUNT_NUMBER" and ask only for the account number' in prompt
+
+
+def test_load_yaml_rejects_incomplete_intents(tmp_path, registry):
+    policy_file = tmp_path / "policies.yaml"
+    policy_file.write_text("- intent: Half done\n  required_slot: email\n", encoding="utf-8")
+
+    with pytest.raises(ValueError, match="ask_action"):
+        registry.load_yaml(policy_file)
@@ -0,0 +1,72 @@
+import pstats
+import threading
+import time
+
+import pytest
+
+from voice_eval.profiling import Profiler, parse_profile_targets, profiled
+
+
+def _busy_in_stage_one():
+    deadline = time.perf_counter() + 0.05
+    total = 0
+    while time.perf_counter() < deadline:
+        total += sum(range(100))
+    return total
+
+
+def _busy_elsewhere():
+    return sum(range(100_000))
+
+
+def test_parse_profile_targets_accepts_run_or_known_stages():
+    assert parse_profile_targets("run") is None
+    assert parse_profile_targets("asr, llm") == ("asr", "llm")
+    with pytest.raises(ValueError, match="Unknown profile stage"):
+        parse_profile_targets("llm,tts")
+
+
+def test_profiled_is_a_no_op_without_a_profiler():
+    assert profiled("stage_1") is profiled("asr")
+
+
+def test_deterministic_profiler_counts_only_selected_stages(tmp_path):
+    profiler = Profiler(["llm"])
+    with profiler.install():
+        with profiled("stage_1"):
+            _busy_in_stage_one()
+        with profiled("asr"):
+            _busy_elsewhere()
+
+    names = {func[2] for func in profiler.stats()}
+    assert "_busy_in_stage_one" in names
+    assert "_busy_elsewhere" not in names
+
+    stats_path, collapsed_path = profiler.write(tmp_path)
+    loaded = pstats.Stats(str(stats_path))
+    assert any(func[2] == "_busy_in_stage_one" for func in loaded.stats)
+    lines = collapsed_path.read_text().splitlines()
+    assert any("_busy_in_stage_one (test_profiling.py" in line for line in lines)
+    assert all(int(line.rsplit(" ", 1)[1]) > 0 for line in lines)
+
+
+def test_whole_run_profile_covers_threads_started_while_installed():
+    profiler = Profiler()
+    with profiler.install():
+        worker = threading.Thread(target=_busy_elsewhere)
+        worker.start()
+        worker.join()
+
+    assert "_busy_elsewhere" in [label.split(" ")[0] for label, _, _, _ in profiler.top(50)]
+
+
+def test_sampling_profiler_samples_threads_inside_selected_stages():
+    profiler = Profiler(["llm"], mode="sampling", interval=0.001)
+    with profiler.install():
+        with profiled("stage_1"):
+            _busy_in_stage_one()
+
+    collapsed = profiler.collapsed()
+    assert any(stack.rsplit(";", 1)[-1].startswith("_busy_in_stage_one") for stack in collapsed)
+    label, calls, own, cumulative = next(entry for entry in profiler.top(100) if entry[0].startswith("_busy_in_stage_one"))
+    assert calls > 0 and cumulative >= own
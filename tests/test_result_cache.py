@@ -0,0 +1,85 @@
+from pathlib import Path
+
+from voice_eval import policies
+from voice_eval.policies import POLICIES, IntentPolicy, PolicyRegistry
+from voice_eval.result_cache import ResultCache, is_cacheable, run_fingerprint, scenario_fingerprint
+from voice_eval.scenario import Scenario, Step
+
+
+def _scenario(user="Where is my order?"):
+    return Scenario(
+        id="check_order_status_001",
+        goal="Check order status",
+        steps=[Step(user=user, bot_expect={"contains": "order number"})],
+        acceptance={},
+    )
+
+
+def test_scenario_fingerprint_is_stable_and_tracks_every_input(tmp_path):
+    base = run_fingerprint("tiny", "rules")
+    fingerprint = scenario_fingerprint(_scenario(), base)
+
+    assert scenario_fingerprint(_scenario(), run_fingerprint("tiny", "rules")) == fingerprint
+    assert scenario_fingerprint(_scenario(user="Where is it?"), base) != fingerprint
+    assert scenario_fingerprint(_scenario(), run_fingerprint("base", "rules")) != fingerprint
+    assert scenario_fingerprint(_scenario(), run_fingerprint("tiny", "tiered")) != fingerprint
+    assert run_fingerprint("tiny", "claude", judge_model="other-model") != run_fingerprint("tiny", "claude")
+    assert run_fingerprint("tiny", "rules", keep_turns=4) != base
+
+    recording = tmp_path / "user_1.wav"
+    recording.write_bytes(b"RIFF")
+    with_audio = scenario_fingerprint(_scenario(), base, {1: str(recording)})
+    assert with_audio != fingerprint
+    recording.write_bytes(b"RIFF....")
+    assert scenario_fingerprint(_scenario(), base, {1: str(recording)}) != with_audio
+
+
+def test_run_fingerprint_changes_when_policies_change(monkeypatch):
+    registry = PolicyRegistry(POLICIES)
+    monkeypatch.setattr("voice_eval.result_cache.POLICIES", registry)
+    before = run_fingerprint("tiny", "rules")
+
+    registry.register(IntentPolicy(
+        intent="Book a table",
+        required_slot="party_size",
+        ask_action="ASK_PARTY_SIZE",
+        final_action="BOOK_TABLE",
+        final_response_guidance="Confirm the booking.",
+    ))
+
+    assert run_fingerprint("tiny", "rules") != before
+
+
+def test_run_fingerprint_changes_when_stage_2_template_changes(monkeypatch, tmp_path):
+    before = run_fingerprint("tiny", "rules")
+    source = Path(policies.__file__).read_text(encoding="utf-8")
+    assert "Workflow for this intent:" in source
+    edited = tmp_path / "policies.py"
+    edited.write_text(source.replace("Workflow for this intent:", "Steps for this intent:"), encoding="utf-8")
+
+    monkeypatch.setattr(policies, "__file__", str(edited))
+
+    assert run_fingerprint("tiny", "rules") != before
+
+
+def test_result_cache_persists_results_and_can_be_bypassed(tmp_path):
+    path = tmp_path / "result_cache.jsonl"
+    ResultCache(path).put("abc", {"scenario_id": "a", "transcript": []})
+
+    cache = ResultCache(path)
+    hit = cache.get("abc")
+    hit["scenario_id"] = "mutated"
+
+    assert cache.get("abc") == {"scenario_id": "a", "transcript": []}
+    assert cache.get("missing") is None
+    assert cache.hits == 2
+    assert ResultCache(path, reuse=False).get("abc") is None
+
+
+def test_results_with_errors_or_degraded_turns_are_not_cacheable():
+    clean = {"transcript": [{"error": None, "degraded": []}]}
+
+    assert is_cacheable(clean)
+    assert not is_cacheable({"transcript": [{"error": "overloaded", "degraded": []}]})
+    assert not is_cacheable({"transcript": [{"error": None, "degraded": ["judge"]}]})
+    assert not is_cacheable({"transcript": [{"error": None, "degraded": [], "judge_error": "boom"}]})
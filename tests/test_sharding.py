@@ -0,0 +1,105 @@
+import pytest
+
+from voice_eval.sharding import (
+    ShardResultWriter,
+    load_durations,
+    merge_shard_results,
+    parse_shard,
+    partition,
+    partition_key,
+    save_durations,
+    write_shard_results,
+)
+
+
+def test_parse_shard_accepts_one_based_index():
+    assert parse_shard("2/4") == (2, 4)
+    for spec in ("0/4", "5/4", "2", "a/b"):
+        with pytest.raises(ValueError):
+            parse_shard(spec)
+
+
+def test_partition_covers_every_scenario_once_and_balances_durations():
+    ids = [f"s{i}" for i in range(10)]
+    durations = {scenario_id: float(i + 1) for i, scenario_id in enumerate(ids)}
+
+    shards = partition(ids, 3, durations)
+
+    assert sorted(p for shard in shards for p in shard) == list(range(10))
+    loads = [sum(durations[ids[p]] for p in shard) for shard in shards]
+    assert max(loads) - min(loads) <= 1.0
+    assert partition(ids, 3, durations) == shards
+
+
+def test_partition_uses_median_duration_for_unknown_scenarios():
+    # "new" is assumed to take 6s, the median of 10s and 2s.
+    shards = partition(["long", "short", "new"], 2, {"long": 10.0, "short": 2.0})
+
+    assert shards == [[0], [1, 2]]
+
+
+def test_durations_round_trip_and_keep_older_entries(tmp_path):
+    path = tmp_path / "durations.json"
+    save_durations(path, [{"scenario_id": "a", "duration_seconds": 1.23456}])
+    save_durations(path, [{"scenario_id": "b", "duration_seconds": 2.0}, {"scenario_id": "c"}])
+
+    assert load_durations(path) == {"a": 1.235, "b": 2.0}
+
+
+def test_merge_shard_results_restores_suite_order(tmp_path):
+    write_shard_results(tmp_path / "1.json", 1, 2, [{"scenario_index": 2}, {"scenario_index": 0}])
+    write_shard_results(tmp_path / "2.json", 2, 2, [{"scenario_index": 1}])
+
+    merged = merge_shard_results([tmp_path / "2.json", tmp_path / "1.json"])
+
+    assert [r["scenario_index"] for r in merged] == [0, 1, 2]
+
+
+def test_merge_shard_results_requires_every_shard(tmp_path):
+    write_shard_results(tmp_path / "1.json", 1, 3, [])
+    write_shard_results(tmp_path / "3.json", 3, 3, [])
+
+    with pytest.raises(ValueError, match="2/3"):
+        merge_shard_results([tmp_path / "1.json", tmp_path / "3.json"])
+
+
+def test_shard_writer_publishes_results_only_when_the_shard_finishes(tmp_path):
+    path = tmp_path / "shard-1-of-1.json"
+
+    with pytest.raises(RuntimeError):
+        with ShardResultWriter(path, 1, 1) as writer:
+            writer.add({"scenario_id": "a", "scenario_index": 0})
+            raise RuntimeError("run died")
+    assert not path.exists()
+
+    with ShardResultWriter(path, 1, 1) as writer:
+        writer.add({"scenario_id": "a", "scenario_index": 0})
+    assert merge_shard_results([path]) == [{"scenario_id": "a", "scenario_index": 0}]
+
+
+def test_partition_key_tracks_ids_count_and_relevant_durations():
+    key = partition_key(["a", "b"], 2, {"a": 1.0})
+
+    assert partition_key(["a", "b"], 2, {"a": 1.0, "other": 5.0}) == key
+    assert partition_key(["a", "b"], 2, {"a": 2.0}) != key
+    assert partition_key(["a", "b", "c"], 2, {"a": 1.0}) != key
+    assert partition_key(["a", "b"], 3, {"a": 1.0}) != key
+
+
+def test_merge_shard_results_rejects_shards_from_different_partitions(tmp_path):
+    write_shard_results(tmp_path / "1.json", 1, 2, [{"scenario_index": 0}], partition="old", scenarios=2)
+    write_shard_results(tmp_path / "2.json", 2, 2, [{"scenario_index": 1}], partition="new", scenarios=2)
+
+    with pytest.raises(ValueError, match="same snapshot"):
+        merge_shard_results([tmp_path / "1.json", tmp_path / "2.json"])
+
+
+def test_merge_shard_results_rejects_duplicate_and_missing_scenarios(tmp_path):
+    write_shard_results(tmp_path / "1.json", 1, 2, [{"scenario_index": 0}, {"scenario_index": 1}], "k", 3)
+    write_shard_results(tmp_path / "2.json", 2, 2, [{"scenario_index": 1}], "k", 3)
+    with pytest.raises(ValueError, match="more than one shard: index 1"):
+        merge_shard_results([tmp_path / "1.json", tmp_path / "2.json"])
+
+    write_shard_results(tmp_path / "2.json", 2, 2, [], "k", 3)
+    with pytest.raises(ValueError, match="no shard: index 2"):
+        merge_shard_results([tmp_path / "1.json", tmp_path / "2.json"])
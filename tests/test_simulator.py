@@ -1,8 +1,23 @@
+import threading
+import time
 from pathlib import Path
 
+import pytest
+from anthropic import APITimeoutError
+
 from voice_eval.bot_tools import ToolResult
+from voice_eval.deadline import TurnDeadline
+from voice_eval.evaluator_claude import ClaudeJudge
+from voice_eval.journal import RunJournal
+from voice_eval.result_cache import ResultCache, run_fingerprint, scenario_fingerprint
 from voice_eval.scenario import Scenario, Step
-from voice_eval.simulator import _find_real_audio, _scenario_has_recordings, run_directory, run_scenario
+from voice_eval.simulator import (
+    _find_real_audio,
+    _scenario_has_recordings,
+    iter_directory,
+    run_directory,
+    run_scenario,
+)
 
 
 def test_run_scenario_uses_extract_slots_and_tracks_conversation_history(mocker, tmp_path):
@@ -83,6 +98,33 @@ def test_run_scenario_uses_extract_slots_and_tracks_conversation_history(mocker,
     assert result["first_correct_turn"] == 1
 
 
+def test_run_scenario_records_stage_timings_per_turn(mocker, tmp_path):
+    scenario = Scenario(
+        id="timed_001",
+        goal="Check order status",
+        steps=[Step(user="Where is my order?", bot_expect={"contains": "order number"})],
+        acceptance={},
+    )
+    mocker.patch("voice_eval.simulator.Anthropic", return_value=mocker.sentinel.client)
+    mocker.patch("voice_eval.simulator.synthesize", side_effect=lambda text, path: time.sleep(0.01))
+    mocker.patch("voice_eval.simulator.transcribe", return_value="Where is my order?")
+    tool_client = mocker.Mock()
+    tool_client.call_tool.return_value = ToolResult(success=True, data={})
+    mocker.patch("voice_eval.simulator.ToolClient", return_value=tool_client)
+    mocker.patch(
+        "voice_eval.simulator.generate_bot_response",
+        return_value={"action": "ASK_ORDER_NUMBER", "utterance": "Your order number?", "detected_intent": "Check order status"},
+    )
+
+    result = run_scenario(scenario, Path(tmp_path), model_size="tiny", judge="rules")
+
+    timings = result["transcript"][0]["timings"]
+    assert set(timings) == {"user_tts", "asr", "slots", "bot_tts", "judge", "total"}
+    assert timings["user_tts"] >= 0.01
+    assert timings["bot_tts"] >= 0.01
+    assert timings["total"] >= sum(seconds for stage, seconds in timings.items() if stage != "total")
+
+
 def test_run_scenario_marks_turn_failed_when_generate_bot_response_raises(mocker, tmp_path):
     scenario = Scenario(
         id="bot_error_001",
@@ -224,10 +266,56 @@ def test_run_scenario_uses_claude_judge_when_requested(mocker, tmp_path):
     claude_evaluator.assert_called_once_with(
         "Your order status is pending.",
         {"contains": "status"},
+        judge=mocker.ANY,
+        deadline=None,
     )
+    assert isinstance(claude_evaluator.call_args.kwargs["judge"], ClaudeJudge)
     rules_evaluator.assert_not_called()
 
 
+def test_run_scenario_tiered_judge_escalates_only_rule_failures(mocker, tmp_path):
+    scenario = Scenario(
+        id="tiered_judge_001",
+        goal="Check order status",
+        steps=[
+            Step(user="Where is my order?", bot_expect={"contains": "order number"}),
+            Step(user="It's order 12345.", bot_expect={"contains": "status"}),
+            Step(user="Thanks.", bot_expect=None),
+        ],
+        acceptance={},
+    )
+
+    mocker.patch("voice_eval.simulator.Anthropic", return_value=mocker.sentinel.client)
+    mocker.patch("voice_eval.simulator.synthesize")
+    mocker.patch("voice_eval.simulator.transcribe", return_value="text")
+    tool_client = mocker.Mock()
+    tool_client.call_tool.return_value = ToolResult(success=True, data={})
+    mocker.patch("voice_eval.simulator.ToolClient", return_value=tool_client)
+    mocker.patch(
+        "voice_eval.simulator.generate_bot_response",
+        side_effect=[
+            {"action": "ASK_ORDER_NUMBER", "utterance": "What is your order number?", "detected_intent": "Check order status"},
+            {"action": "PROVIDE_STATUS", "utterance": "It is being processed.", "detected_intent": "Check order status"},
+            {"action": "PROVIDE_STATUS", "utterance": "You're welcome.", "detected_intent": "Check order status"},
+        ],
+    )
+    claude_evaluator = mocker.patch("voice_eval.simulator.check_bot_expect_claude", return_value=True)
+
+    result = run_scenario(scenario, Path(tmp_path), model_size="tiny", judge="tiered")
+
+    claude_evaluator.assert_called_once_with(
+        "It is being processed.",
+        {"contains": "status"},
+        judge=mocker.ANY,
+        deadline=None,
+    )
+    assert [entry["judge_source"] for entry in result["transcript"]] == ["rules", "claude", "rules"]
+    assert [entry["pass"] for entry in result["transcript"]] == [True, True, True]
+    assert result["judge"] == "tiered"
+    assert result["judged_turns"] == 2
+    assert result["judge_escalations"] == 1
+
+
 def test_run_scenario_counts_only_steps_with_expectations(mocker, tmp_path):
     scenario = Scenario(
         id="expectation_count_001",
@@ -471,13 +559,23 @@ def test_run_directory_passes_real_audio_dir_through(mocker, tmp_path):
         real_audio_dir=real_audio_dir,
     )
 
-    assert result == [{"scenario_id": scenario.id}]
+    assert [r["scenario_id"] for r in result] == [scenario.id]
+    assert result[0]["scenario_index"] == 0
+    assert result[0]["duration_seconds"] >= 0
     run_scenario_mock.assert_called_once_with(
         scenario,
         tmp_path / "audio",
         "base",
         "claude",
         real_audio_dir=real_audio_dir,
+        stream=False,
+        client=None,
+        keep_turns=None,
+        turn_budget=None,
+        tool_client=None,
+        claude_judge=None,
+        judge_pool=None,
+        pipeline=None,
     )
 
 
@@ -510,6 +608,14 @@ def test_run_directory_real_audio_only_skips_scenarios_without_recordings(mocker
         "tiny",
         "rules",
         real_audio_dir=real_audio_dir,
+        stream=False,
+        client=None,
+        keep_turns=None,
+        turn_budget=None,
+        tool_client=None,
+        claude_judge=None,
+        judge_pool=None,
+        pipeline=None,
     )
 
 
@@ -537,3 +643,352 @@ def test_run_directory_real_audio_only_false_runs_all_scenarios(mocker, tmp_path
 
     assert len(result) == 2
     assert run_scenario_mock.call_count == 2
+
+
+def test_run_scenario_streams_bot_sentences_into_synthesizer(mocker, tmp_path):
+    scenario = Scenario(
+        id="stream_001",
+        goal="Cancel an order",
+        steps=[Step(user="Cancel order 12345.", bot_expect={"contains": "cancelled"})],
+        acceptance={},
+    )
+
+    mocker.patch("voice_eval.simulator.Anthropic", return_value=mocker.sentinel.client)
+    synthesize = mocker.patch("voice_eval.simulator.synthesize")
+    mocker.patch("voice_eval.simulator.transcribe", return_value="cancel order 12345.")
+    tool_client = mocker.Mock()
+    tool_client.call_tool.return_value = ToolResult(success=True, data={"order_number": "12345"})
+    mocker.patch("voice_eval.simulator.ToolClient", return_value=tool_client)
+
+    synthesizer = mocker.Mock()
+    synthesizer.close.return_value = 0.25
+    synthesizer_cls = mocker.patch(
+        "voice_eval.simulator.StreamingSynthesizer",
+        return_value=synthesizer,
+    )
+
+    def fake_generate_bot_response(client, user_input, slots, conversation_history, on_sentence):
+        on_sentence("Order 12345 has been cancelled.")
+        synthesizer.text = "Order 12345 has been cancelled."
+        return {
+            "action": "CONFIRM_CANCELLATION",
+            "utterance": "Order 12345 has been cancelled.",
+            "detected_intent": "Cancel an order",
+        }
+
+    mocker.patch(
+        "voice_eval.simulator.generate_bot_response",
+        side_effect=fake_generate_bot_response,
+    )
+
+    result = run_scenario(scenario, Path(tmp_path), stream=True)
+
+    synthesizer_cls.assert_called_once_with(f"{tmp_path}/{scenario.id}/bot_1.wav")
+    synthesizer.feed.assert_called_once_with("Order 12345 has been cancelled.")
+    # Only the user turn goes through whole-utterance synthesis.
+    synthesize.assert_called_once_with(
+        "Cancel order 12345.",
+        f"{tmp_path}/{scenario.id}/user_1.wav",
+    )
+    assert result["transcript"][0]["time_to_first_audio"] == 0.25
+    assert result["transcript"][0]["pass"] is True
+
+
+def test_run_scenario_degrades_stages_when_turn_budget_is_exhausted(mocker, tmp_path):
+    scenario = Scenario(
+        id="deadline_001",
+        goal="Check order status",
+        steps=[Step(user="Where is my order?", bot_expect={"contains": "order number"})],
+        acceptance={},
+    )
+
+    mocker.patch("voice_eval.simulator.Anthropic", return_value=mocker.sentinel.client)
+    mocker.patch("voice_eval.simulator.synthesize")
+    transcribe = mocker.patch("voice_eval.simulator.transcribe")
+    tool_client = mocker.Mock()
+    tool_client.call_tool.return_value = ToolResult(success=True, data={})
+    mocker.patch("voice_eval.simulator.ToolClient", return_value=tool_client)
+
+    def fake_generate_bot_response(client, user_input, slots, conversation_history, deadline):
+        deadline.degrade("stage_2")
+        return {
+            "action": "ASK_ORDER_NUMBER",
+            "utterance": "Could you please provide your order number?",
+            "detected_intent": "Check order status",
+        }
+
+    generate = mocker.patch(
+        "voice_eval.simulator.generate_bot_response",
+        side_effect=fake_generate_bot_response,
+    )
+    claude_evaluator = mocker.patch("voice_eval.simulator.check_bot_expect_claude")
+
+    result = run_scenario(scenario, Path(tmp_path), judge="claude", turn_budget=0.0)
+
+    turn = result["transcript"][0]
+    transcribe.assert_not_called()
+    tool_client.call_tool.assert_called_once()
+    claude_evaluator.assert_not_called()
+    # Nothing was transcribed, so the bot must not hear the scripted text.
+    assert generate.call_args.kwargs["user_input"] == ""
+    assert turn["user_asr"] == ""
+    assert turn["degraded"] == ["asr", "stage_2", "judge"]
+    assert turn["pass"] is True
+
+
+def test_run_scenario_falls_back_to_rules_when_claude_judge_times_out(mocker, tmp_path):
+    scenario = Scenario(
+        id="deadline_002",
+        goal="Check order status",
+        steps=[Step(user="Where is my order?", bot_expect={"contains": "order number"})],
+        acceptance={},
+    )
+
+    mocker.patch("voice_eval.simulator.Anthropic", return_value=mocker.sentinel.client)
+    mocker.patch("voice_eval.simulator.synthesize")
+    mocker.patch("voice_eval.simulator.transcribe", return_value="where is my order?")
+    tool_client = mocker.Mock()
+    tool_client.call_tool.return_value = ToolResult(success=True, data={})
+    mocker.patch("voice_eval.simulator.ToolClient", return_value=tool_client)
+    mocker.patch(
+        "voice_eval.simulator.generate_bot_response",
+        return_value={
+            "action": "ASK_ORDER_NUMBER",
+            "utterance": "Could you please provide your order number?",
+            "detected_intent": "Check order status",
+        },
+    )
+    claude_evaluator = mocker.patch(
+        "voice_eval.simulator.check_bot_expect_claude",
+        side_effect=APITimeoutError(request=mocker.Mock()),
+    )
+
+    result = run_scenario(scenario, Path(tmp_path), judge="claude", turn_budget=60.0)
+
+    turn = result["transcript"][0]
+    assert isinstance(claude_evaluator.call_args.kwargs["deadline"], TurnDeadline)
+    assert turn["degraded"] == ["judge"]
+    assert turn["judge_source"] == "rules"
+    assert turn["pass"] is True
+
+
+def test_run_directory_grades_claude_turns_in_background(mocker, tmp_path):
+    scenario = Scenario(
+        id="background_judge_001",
+        goal="Check order status",
+        steps=[
+            Step(user="Where is my order?", bot_expect={"contains": "order number"}),
+            Step(user="It's order 12345.", bot_expect={"contains": "status"}),
+        ],
+        acceptance={},
+    )
+    mocker.patch("voice_eval.simulator.load_scenarios", return_value=[scenario])
+    mocker.patch("voice_eval.simulator.Anthropic", return_value=mocker.sentinel.client)
+    mocker.patch("voice_eval.simulator.synthesize")
+    mocker.patch("voice_eval.simulator.transcribe", return_value="text")
+    tool_client = mocker.Mock()
+    tool_client.call_tool.return_value = ToolResult(success=True, data={})
+    mocker.patch("voice_eval.simulator.ToolClient", return_value=tool_client)
+    mocker.patch(
+        "voice_eval.simulator.generate_bot_response",
+        side_effect=[
+            {"action": "ASK_ORDER_NUMBER", "utterance": "What is your order number?", "detected_intent": "Check order status"},
+            {"action": "PROVIDE_STATUS", "utterance": "It is being processed.", "detected_intent": "Check order status"},
+        ],
+    )
+    inline_judge = mocker.patch("voice_eval.simulator.check_bot_expect_claude")
+    claude_judge = mocker.Mock(batch_size=20)
+    claude_judge.judge_batch.side_effect = lambda items: [True] * len(items)
+
+    results = run_directory(
+        tmp_path,
+        tmp_path / "audio",
+        judge="claude",
+        claude_judge=claude_judge,
+        judge_workers=2,
+    )
+
+    inline_judge.assert_not_called()
+    assert [entry["pass"] for entry in results[0]["transcript"]] == [True, True]
+    assert all("judge" in entry["timings"] for entry in results[0]["transcript"])
+    assert results[0]["steps_passed"] == 2
+    assert results[0]["scenario_pass"] is True
+
+
+def test_run_directory_with_workers_keeps_scenario_order_and_shares_clients(mocker, tmp_path):
+    scenarios = [
+        Scenario(id=f"scenario_{i}", goal="Check order status", steps=[], acceptance={})
+        for i in range(4)
+    ]
+    mocker.patch("voice_eval.simulator.load_scenarios", return_value=scenarios)
+    mocker.patch("voice_eval.simulator.Anthropic", return_value=mocker.sentinel.client)
+    mocker.patch("voice_eval.simulator.ToolClient", return_value=mocker.sentinel.tool_client)
+    started = threading.Barrier(4, timeout=5)
+    seen_clients = []
+
+    def fake_run_scenario(scenario, *args, client, tool_client, **kwargs):
+        # Every scenario must be in flight at once for the barrier to open.
+        started.wait()
+        time.sleep(0.01 * (4 - int(scenario.id[-1])))
+        seen_clients.append((client, tool_client))
+        return {"scenario_id": scenario.id}
+
+    mocker.patch("voice_eval.simulator.run_scenario", side_effect=fake_run_scenario)
+
+    results = run_directory(tmp_path, tmp_path / "audio", workers=4)
+
+    assert [r["scenario_id"] for r in results] == [s.id for s in scenarios]
+    assert set(seen_clients) == {(mocker.sentinel.client, mocker.sentinel.tool_client)}
+
+
+def test_run_directory_with_workers_rejects_duplicate_scenario_ids(mocker, tmp_path):
+    scenario = Scenario(id="dup", goal="Check order status", steps=[], acceptance={})
+    mocker.patch("voice_eval.simulator.load_scenarios", return_value=[scenario, scenario])
+
+    with pytest.raises(ValueError, match="dup"):
+        run_directory(tmp_path, tmp_path / "audio", workers=2)
+
+
+def test_run_directory_runs_only_its_shard_with_suite_positions(mocker, tmp_path):
+    scenarios = [
+        Scenario(id=f"scenario_{i}", goal="Check order status", steps=[], acceptance={})
+        for i in range(4)
+    ]
+    mocker.patch("voice_eval.simulator.load_scenarios", return_value=scenarios)
+    mocker.patch(
+        "voice_eval.simulator.run_scenario",
+        side_effect=lambda scenario, *args, **kwargs: {"scenario_id": scenario.id},
+    )
+    durations = {"scenario_0": 10.0, "scenario_1": 1.0, "scenario_2": 1.0, "scenario_3": 8.0}
+
+    first = run_directory(tmp_path, tmp_path / "audio", shard=(1, 2), durations=durations)
+    second = run_directory(tmp_path, tmp_path / "audio", shard=(2, 2), durations=durations)
+
+    # Longest first onto the lightest shard: 10 vs 8 + 1 + 1.
+    assert [(r["scenario_index"], r["scenario_id"]) for r in first] == [(0, "scenario_0")]
+    assert [(r["scenario_index"], r["scenario_id"]) for r in second] == [
+        (1, "scenario_1"),
+        (2, "scenario_2"),
+        (3, "scenario_3"),
+    ]
+
+
+def test_run_directory_resumes_from_journal_and_keeps_suite_order(mocker, tmp_path):
+    scenarios = [
+        Scenario(id=f"scenario_{i}", goal="Check order status", steps=[], acceptance={})
+        for i in range(3)
+    ]
+    mocker.patch("voice_eval.simulator.load_scenarios", return_value=scenarios)
+    run_scenario_mock = mocker.patch(
+        "voice_eval.simulator.run_scenario",
+        side_effect=lambda scenario, *args, **kwargs: {"scenario_id": scenario.id, "transcript": []},
+    )
+    journal = RunJournal(tmp_path / "journal.jsonl")
+    journal.append(
+        {"scenario_id": "scenario_1", "scenario_index": 7, "transcript": [], "resumed": True},
+        fingerprint=scenario_fingerprint(scenarios[1], run_fingerprint("tiny", "rules")),
+    )
+    journal.append(
+        {"scenario_id": "scenario_2", "transcript": [], "resumed": True},
+        fingerprint=scenario_fingerprint(scenarios[2], run_fingerprint("medium", "rules")),
+    )
+
+    results = run_directory(tmp_path, tmp_path / "audio", journal=journal)
+
+    # scenario_2 was journaled with another ASR model, so it runs again.
+    assert [call.args[0].id for call in run_scenario_mock.call_args_list] == ["scenario_0", "scenario_2"]
+    assert [(r["scenario_index"], r["scenario_id"]) for r in results] == [
+        (0, "scenario_0"),
+        (1, "scenario_1"),
+        (2, "scenario_2"),
+    ]
+    assert results[1]["resumed"] is True
+    assert results[1]["from_journal"] is True
+    assert "input_fingerprint" not in results[1]
+    assert "from_journal" not in results[0]
+    assert "resumed" not in results[2]
+    assert set(journal.completed()) == {"scenario_0", "scenario_1", "scenario_2"}
+
+
+def test_run_directory_journals_background_verdicts_once_graded(mocker, tmp_path):
+    scenario = Scenario(
+        id="journal_judge_001",
+        goal="Check order status",
+        steps=[Step(user="Where is my order?", bot_expect={"contains": "order number"})],
+        acceptance={},
+    )
+    mocker.patch("voice_eval.simulator.load_scenarios", return_value=[scenario])
+    mocker.patch("voice_eval.simulator.Anthropic", return_value=mocker.sentinel.client)
+    mocker.patch("voice_eval.simulator.synthesize")
+    mocker.patch("voice_eval.simulator.transcribe", return_value="text")
+    tool_client = mocker.Mock()
+    tool_client.call_tool.return_value = ToolResult(success=True, data={})
+    mocker.patch("voice_eval.simulator.ToolClient", return_value=tool_client)
+    mocker.patch(
+        "voice_eval.simulator.generate_bot_response",
+        return_value={"action": "ASK_ORDER_NUMBER", "utterance": "Order number?", "detected_intent": "Check order status"},
+    )
+    claude_judge = mocker.Mock(batch_size=20)
+    claude_judge.judge_batch.side_effect = lambda items: time.sleep(0.05) or [True] * len(items)
+    journal = RunJournal(tmp_path / "journal.jsonl")
+
+    run_directory(
+        tmp_path,
+        tmp_path / "audio",
+        judge="claude",
+        claude_judge=claude_judge,
+        judge_workers=1,
+        journal=journal,
+    )
+
+    journaled = journal.completed()["journal_judge_001"]
+    assert journaled["transcript"][0]["pass"] is True
+    assert journaled["scenario_pass"] is True
+
+
+def test_run_directory_reuses_results_with_unchanged_fingerprints(mocker, tmp_path):
+    scenarios = [
+        Scenario(id=f"scenario_{i}", goal="Check order status", steps=[Step(user="hi", bot_expect={})], acceptance={})
+        for i in range(2)
+    ]
+    mocker.patch("voice_eval.simulator.load_scenarios", return_value=scenarios)
+    run_scenario_mock = mocker.patch(
+        "voice_eval.simulator.run_scenario",
+        side_effect=lambda scenario, *args, **kwargs: {"scenario_id": scenario.id, "transcript": []},
+    )
+    cache_path = tmp_path / "result_cache.jsonl"
+
+    run_directory(tmp_path, tmp_path / "audio", result_cache=ResultCache(cache_path))
+    scenarios[1] = Scenario(id="scenario_1", goal="Check order status", steps=[Step(user="hello", bot_expect={})], acceptance={})
+    results = run_directory(tmp_path, tmp_path / "audio", result_cache=ResultCache(cache_path))
+    forced = run_directory(tmp_path, tmp_path / "audio", result_cache=ResultCache(cache_path, reuse=False))
+
+    ran = [call.args[0].id for call in run_scenario_mock.call_args_list]
+    assert ran == ["scenario_0", "scenario_1", "scenario_1", "scenario_0", "scenario_1"]
+    assert [(r["scenario_index"], r["scenario_id"], r.get("from_cache", False)) for r in results] == [
+        (0, "scenario_0", True),
+        (1, "scenario_1", False),
+    ]
+    assert not any(r.get("from_cache") for r in forced)
+
+
+def test_iter_directory_yields_each_result_before_running_the_next_scenario(mocker, tmp_path):
+    scenarios = [
+        Scenario(id=f"scenario_{i}", goal="Check order status", steps=[], acceptance={})
+        for i in range(3)
+    ]
+    mocker.patch("voice_eval.simulator.load_scenarios", return_value=scenarios)
+    ran = []
+
+    def fake_run_scenario(scenario, *args, **kwargs):
+        ran.append(scenario.id)
+        return {"scenario_id": scenario.id, "transcript": []}
+
+    mocker.patch("voice_eval.simulator.run_scenario", side_effect=fake_run_scenario)
+
+    results = iter_directory(tmp_path, tmp_path / "audio")
+    first = next(results)
+
+    assert first["scenario_id"] == "scenario_0"
+    assert ran == ["scenario_0"]
+    assert [r["scenario_index"] for r in results] == [1, 2]
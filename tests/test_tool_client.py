@@ -0,0 +1,90 @@
+import asyncio
+import time
+
+from voice_eval.bot_tools import ToolResult
+from voice_eval.tool_client import ToolClient
+
+
+def test_call_tool_extracts_slots_and_reports_unknown_tools():
+    client = ToolClient()
+
+    result = client.call_tool("extract_slots", {"user_input": "order 12345", "current_slots": {}})
+    missing = client.call_tool("lookup_order", {})
+
+    assert result.data == {"order_number": "12345"}
+    assert missing.success is False
+    assert missing.error == "Tool lookup_order not found"
+
+
+def test_pure_tool_results_are_memoized_on_input_and_slots():
+    calls = []
+
+    def tool(user_input, current_slots):
+        calls.append(user_input)
+        return ToolResult(success=True, data=dict(current_slots, seen=user_input))
+
+    client = ToolClient()
+    client.register("echo", tool, pure=True)
+
+    first = client.call_tool("echo", {"user_input": "a", "current_slots": {"x": "1"}})
+    first.data["mutated"] = True
+    second = client.call_tool("echo", {"user_input": "a", "current_slots": {"x": "1"}})
+    client.call_tool("echo", {"user_input": "a", "current_slots": {"x": "2"}})
+
+    assert calls == ["a", "a"]
+    assert second.data == {"x": "1", "seen": "a"}
+    stats = client.summary()["echo"]
+    assert stats["calls"] == 3
+    assert stats["cache_hits"] == 1
+    assert sum(stats["histogram"].values()) == 2
+
+
+def test_failed_results_are_not_memoized():
+    calls = []
+
+    def tool():
+        calls.append(1)
+        raise RuntimeError("backend down")
+
+    client = ToolClient()
+    client.register("flaky", tool, pure=True)
+
+    client.call_tool("flaky", {})
+    result = client.call_tool("flaky", {})
+
+    assert len(calls) == 2
+    assert result.error == "backend down"
+    assert client.summary()["flaky"]["errors"] == 2
+
+
+def test_sync_tool_timeout_returns_error_result():
+    client = ToolClient()
+    client.register("slow", lambda: time.sleep(0.5), timeout=0.01)
+
+    result = client.call_tool("slow", {})
+
+    assert result.success is False
+    assert result.error == "Tool slow timed out after 0.01s"
+    assert client.summary()["slow"]["timeouts"] == 1
+    client.close()
+
+
+def test_async_tools_run_from_sync_and_async_callers():
+    async def lookup(order_number):
+        await asyncio.sleep(0)
+        return ToolResult(success=True, data={"status": f"{order_number} shipped"})
+
+    async def stuck():
+        await asyncio.sleep(1)
+
+    client = ToolClient()
+    client.register("lookup", lookup)
+    client.register("stuck", stuck, timeout=0.01)
+
+    sync_result = client.call_tool("lookup", {"order_number": "1"})
+    async_result = asyncio.run(client.acall_tool("lookup", {"order_number": "2"}))
+    timed_out = asyncio.run(client.acall_tool("stuck", {}))
+
+    assert sync_result.data == {"status": "1 shipped"}
+    assert async_result.data == {"status": "2 shipped"}
+    assert timed_out.error == "Tool stuck timed out after 0.01s"
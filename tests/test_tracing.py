@@ -0,0 +1,112 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from voice_eval import tracing
+from voice_eval.bot_tools import ToolResult
+from voice_eval.scenario import Scenario, Step
+from voice_eval.simulator import run_scenario
+from voice_eval.tracing import Tracer, span
+
+
+def test_span_is_a_shared_no_op_without_a_tracer():
+    assert span("turn") is span("stage_1")
+    with span("turn"):
+        assert tracing.current_span() is None
+
+
+def test_spans_nest_and_share_the_trace_of_their_root():
+    tracer = Tracer()
+    with tracer.install():
+        with span("scenario", scenario_id="s1") as scenario:
+            with span("turn", turn=1) as turn:
+                with span("asr"):
+                    pass
+        with span("scenario", scenario_id="s2") as other:
+            pass
+
+    by_name = {}
+    for recorded in tracer.spans:
+        by_name.setdefault(recorded.name, []).append(recorded)
+    (asr,) = by_name["asr"]
+    assert asr.parent_id == turn.span_id
+    assert turn.parent_id == scenario.span_id
+    assert scenario.parent_id is None
+    assert asr.trace_id == turn.trace_id == scenario.trace_id != other.trace_id
+    assert scenario.start_ns <= turn.start_ns <= asr.start_ns <= asr.end_ns <= turn.end_ns <= scenario.end_ns
+    assert tracing.active_tracer() is None
+
+
+def test_span_records_errors_and_reraises():
+    tracer = Tracer()
+    with tracer.install():
+        try:
+            with span("stage_2"):
+                raise RuntimeError("api down")
+        except RuntimeError:
+            pass
+
+    assert tracer.spans[0].attributes["error"] == "RuntimeError('api down')"
+
+
+def test_exports_chrome_trace_events_and_otlp_json(tmp_path):
+    tracer = Tracer()
+    with tracer.install():
+        with span("turn", turn=1, scenario_id="s1") as turn:
+            started = time.perf_counter_ns()
+            tracer.record("pipeline.asr", started, started + 2_000_000, parent=turn, worker=(4242, 7))
+
+    tracer.write_chrome_trace(tmp_path / "trace.json")
+    tracer.write_otlp(tmp_path / "trace.otlp.json")
+
+    chrome = json.loads((tmp_path / "trace.json").read_text())
+    complete = {event["name"]: event for event in chrome["traceEvents"] if event["ph"] == "X"}
+    assert complete["turn"]["pid"] == os.getpid()
+    assert complete["turn"]["tid"] == threading.get_ident()
+    assert complete["turn"]["args"]["scenario_id"] == "s1"
+    assert (complete["pipeline.asr"]["pid"], complete["pipeline.asr"]["tid"]) == (4242, 7)
+    assert complete["pipeline.asr"]["dur"] == 2000
+    assert any(event["ph"] == "M" and event["name"] == "thread_name" for event in chrome["traceEvents"])
+
+    otlp = json.loads((tmp_path / "trace.otlp.json").read_text())
+    spans = {s["name"]: s for s in otlp["resourceSpans"][0]["scopeSpans"][0]["spans"]}
+    assert spans["pipeline.asr"]["parentSpanId"] == spans["turn"]["spanId"]
+    assert spans["pipeline.asr"]["traceId"] == spans["turn"]["traceId"]
+    assert len(spans["turn"]["traceId"]) == 32 and len(spans["turn"]["spanId"]) == 16
+    assert {"key": "turn", "value": {"intValue": "1"}} in spans["turn"]["attributes"]
+    assert int(spans["turn"]["endTimeUnixNano"]) >= int(spans["turn"]["startTimeUnixNano"]) > 0
+
+
+def test_run_scenario_traces_scenario_turn_and_stage_spans(mocker, tmp_path):
+    scenario = Scenario(
+        id="traced_001",
+        goal="Check order status",
+        steps=[Step(user="Where is my order?", bot_expect={}), Step(user="12345", bot_expect={})],
+        acceptance={},
+    )
+    mocker.patch("voice_eval.simulator.Anthropic", return_value=mocker.sentinel.client)
+    mocker.patch("voice_eval.simulator.synthesize")
+    mocker.patch("voice_eval.simulator.transcribe", return_value="text")
+    tool_client = mocker.Mock()
+    tool_client.call_tool.return_value = ToolResult(success=True, data={})
+    mocker.patch("voice_eval.simulator.ToolClient", return_value=tool_client)
+    mocker.patch(
+        "voice_eval.simulator.generate_bot_response",
+        return_value={"action": "ASK_CLARIFY", "utterance": "ok", "detected_intent": "Check order status"},
+    )
+
+    tracer = Tracer()
+    with tracer.install():
+        run_scenario(scenario, Path(tmp_path))
+
+    spans = {recorded.span_id: recorded for recorded in tracer.spans}
+    (root,) = [recorded for recorded in tracer.spans if recorded.parent_id is None]
+    turns = [recorded for recorded in tracer.spans if recorded.name == "turn"]
+    assert root.name == "scenario"
+    assert [recorded.attributes["turn"] for recorded in turns] == [1, 2]
+    assert all(recorded.parent_id == root.span_id for recorded in turns)
+    stages = [recorded for recorded in tracer.spans if recorded.name in ("user_tts", "asr", "slots", "bot_tts", "judge")]
+    assert len(stages) == 10
+    assert all(spans[recorded.parent_id].name == "turn" for recorded in stages)
@@ -0,0 +1,101 @@
+from types import SimpleNamespace
+
+import pytest
+
+from voice_eval.usage import (
+    ModelPrice,
+    PriceTable,
+    TurnUsage,
+    UsageCollector,
+    record_usage,
+    response_usage,
+    split_usage,
+)
+
+
+def _response(input_tokens, output_tokens, cache_write=None, cache_read=None):
+    return SimpleNamespace(
+        usage=SimpleNamespace(
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            cache_creation_input_tokens=cache_write,
+            cache_read_input_tokens=cache_read,
+        )
+    )
+
+
+def test_response_usage_reads_counters_and_ignores_responses_without_usage(mocker):
+    assert response_usage(_response(120, 30, cache_read=80)) == {
+        "input_tokens": 120,
+        "output_tokens": 30,
+        "cache_creation_input_tokens": 0,
+        "cache_read_input_tokens": 80,
+    }
+    assert response_usage(SimpleNamespace(content=[])) is None
+    assert response_usage(mocker.Mock()) is None
+
+
+def test_record_usage_accumulates_per_stage_only_inside_an_active_turn():
+    turn_usage = TurnUsage()
+    record_usage("stage_1", "claude-haiku-4-5", _response(10, 1))
+    with turn_usage.active():
+        record_usage("stage_1", "claude-haiku-4-5", _response(100, 5))
+        record_usage("stage_1", "claude-haiku-4-5", _response(50, 5, cache_write=20))
+
+    assert turn_usage.stages == {
+        "stage_1": {
+            "model": "claude-haiku-4-5",
+            "calls": 2,
+            "input_tokens": 150,
+            "output_tokens": 10,
+            "cache_creation_input_tokens": 20,
+            "cache_read_input_tokens": 0,
+        }
+    }
+
+
+def test_split_usage_parts_sum_to_the_whole():
+    turn_usage = TurnUsage()
+    turn_usage.record("judge", "claude-haiku-4-5", {"input_tokens": 10, "output_tokens": 7})
+
+    shares = split_usage(turn_usage.stages["judge"], 3)
+
+    assert [share["input_tokens"] for share in shares] == [4, 3, 3]
+    assert [share["calls"] for share in shares] == [1, 0, 0]
+    assert sum(share["output_tokens"] for share in shares) == 7
+
+
+def test_price_table_costs_usage_and_loads_overrides(tmp_path):
+    usage = {
+        "model": "claude-haiku-4-5",
+        "calls": 1,
+        "input_tokens": 1_000_000,
+        "output_tokens": 100_000,
+        "cache_creation_input_tokens": 0,
+        "cache_read_input_tokens": 1_000_000,
+    }
+    assert PriceTable().cost(usage) == pytest.approx(1.0 + 0.5 + 0.1)
+    assert PriceTable({"other": ModelPrice(1, 1, 1, 1)}).cost(usage) is None
+
+    price_file = tmp_path / "prices.yaml"
+    price_file.write_text("claude-haiku-4-5:\n  input: 2\n  output: 10\n  cache_read: 0.2\n", encoding="utf-8")
+    assert PriceTable.load_yaml(price_file).cost(usage) == pytest.approx(2.0 + 1.0 + 0.2)
+
+    price_file.write_text("claude-haiku-4-5: 3\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="needs input and output prices"):
+        PriceTable.load_yaml(price_file)
+
+
+def test_usage_collector_groups_turns_by_intent():
+    collector = UsageCollector()
+    stage = {"model": "m", "calls": 1, "input_tokens": 10, "output_tokens": 2,
+             "cache_creation_input_tokens": 0, "cache_read_input_tokens": 0}
+    collector.add({"transcript": [
+        {"expected_intent": "Refund", "usage": {"stage_1": stage, "stage_2": stage}},
+        {"expected_intent": "Refund", "usage": {}},
+        {"expected_intent": "Cancel", "usage": {"stage_1": stage}},
+    ]})
+
+    assert collector.turns == {"Refund": 1, "Cancel": 1}
+    assert collector.stages["stage_1"]["input_tokens"] == 20
+    assert collector.intents["Refund"]["stage_2"]["calls"] == 1
@@ -1,18 +1,53 @@
 # Automatic speech recognition module
+import threading
+from collections import OrderedDict
 from pathlib import Path
+from typing import Any, Dict, Tuple
+
+from .override import active_fake_audio
+
+# Most recent transcripts produced in this process, keyed by (audio path, model
+# size). Used as the cheap path when a turn has no latency budget left for ASR.
+TRANSCRIPT_CACHE_SIZE = 4096
+_TRANSCRIPT_CACHE: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+_TRANSCRIPT_LOCK = threading.Lock()
+# Loaded models, keyed by model size. Loading is slow and faster-whisper
+# models can transcribe from several threads at once, so one model per size
+# is shared by every scenario in the process.
+_MODELS: Dict[str, Any] = {}
+_MODELS_LOCK = threading.Lock()
+
+
+def cached_transcript(wav_path: str, model_size: str = "tiny") -> str | None:
+    """Return a previously produced transcript for this audio file, if any."""
+    key = (str(wav_path), model_size)
+    with _TRANSCRIPT_LOCK:
+        if key not in _TRANSCRIPT_CACHE:
+            return None
+        _TRANSCRIPT_CACHE.move_to_end(key)
+        return _TRANSCRIPT_CACHE[key]
+
+
+def remember_transcript(wav_path: str, model_size: str, transcript: str) -> None:
+    """Record a transcript produced elsewhere, e.g. in an ASR worker process."""
+    key = (str(wav_path), model_size)
+    with _TRANSCRIPT_LOCK:
+        _TRANSCRIPT_CACHE[key] = transcript
+        _TRANSCRIPT_CACHE.move_to_end(key)
+        if len(_TRANSCRIPT_CACHE) > TRANSCRIPT_CACHE_SIZE:
+            _TRANSCRIPT_CACHE.popitem(last=False)
 
 
 def transcribe(wav_path: str, model_size: str = "tiny") -> str:
     """Transcribe audio file to text using faster-whisper."""
-    # Lazy import model
-    from faster_whisper import WhisperModel
-    
-    # Try int8 compute type first, fallback to float32
-    try:
-        model = WhisperModel(model_size, compute_type="int8")
-    except Exception:
-        model = WhisperModel(model_size, compute_type="float32")
-    
+    fake = active_fake_audio()
+    if fake is not None:
+        transcript = fake.transcribe(wav_path)
+        remember_transcript(wav_path, model_size, transcript)
+        return transcript
+
+    model = _load_model(model_size)
+
     # Run transcription with VAD filter
     segments, _ = model.transcribe(wav_path, vad_filter=True)
     
@@ -20,4 +55,20 @@ def transcribe(wav_path: str, model_size: str = "tiny") -> str:
     transcript = " ".join(segment.text for segment in segments).strip()
     
     # Return lowercased transcript for robust substring checks
-    return transcript.lower()
\ No newline at end of file
+    transcript = transcript.lower()
+    remember_transcript(wav_path, model_size, transcript)
+    return transcript
+
+
+def _load_model(model_size: str) -> Any:
+    with _MODELS_LOCK:
+        if model_size not in _MODELS:
+            # Lazy import model
+            from faster_whisper import WhisperModel
+
+            # Try int8 compute type first, fallback to float32
+            try:
+                _MODELS[model_size] = WhisperModel(model_size, compute_type="int8")
+            except Exception:
+                _MODELS[model_size] = WhisperModel(model_size, compute_type="float32")
+        return _MODELS[model_size]
@@ -0,0 +1,23 @@
+# Process-wide stand-in for the TTS and ASR engines, e.g. the fake backend
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Iterator
+
+if TYPE_CHECKING:
+    from ..fake_backend import FakeAudio
+
+# Installed by ``install_fake_audio()``; TTS and ASR use the real engines while None.
+_AUDIO: "FakeAudio | None" = None
+
+
+@contextmanager
+def install_fake_audio(audio: "FakeAudio") -> Iterator["FakeAudio"]:
+    global _AUDIO
+    previous, _AUDIO = _AUDIO, audio
+    try:
+        yield audio
+    finally:
+        _AUDIO = previous
+
+
+def active_fake_audio() -> "FakeAudio | None":
+    return _AUDIO
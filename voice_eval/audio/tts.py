@@ -1,13 +1,76 @@
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
 from pathlib import Path
 
 from gtts import gTTS
 
+from .override import active_fake_audio
+from ..tracing import span
+
 
 def synthesize(text: str, out_wav: str) -> None:
     """Synthesize text to speech and save as an audio file."""
+    fake = active_fake_audio()
+    if fake is not None:
+        fake.synthesize(text, out_wav)
+        return
     Path(out_wav).parent.mkdir(parents=True, exist_ok=True)
     tts = gTTS(text=text, lang="en")
     # gTTS outputs MP3 natively. faster-whisper can decode it via ffmpeg even
     # when callers pass a .wav path.
     tts.save(out_wav)
 
+
+class StreamingSynthesizer:
+    """Synthesize sentences as they arrive and append them to one audio file.
+
+    Sentences are rendered in order on a single background worker so the
+    caller can keep reading the LLM stream while audio is produced. MP3 frames
+    concatenate cleanly, so each sentence is appended to ``out_wav`` as soon as
+    it is ready.
+    """
+
+    def __init__(self, out_wav: str) -> None:
+        Path(out_wav).parent.mkdir(parents=True, exist_ok=True)
+        Path(out_wav).write_bytes(b"")
+        self.out_wav = out_wav
+        self.text = ""
+        self.time_to_first_audio: float | None = None
+        self._start = time.monotonic()
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._futures = []
+        self._rendered: list[str] = []
+
+    def feed(self, sentence: str) -> None:
+        """Queue one completed sentence for synthesis."""
+        self.text = f"{self.text} {sentence}".strip()
+        # Run in the caller's context so the sentence's span nests under its turn.
+        context = contextvars.copy_context()
+        self._futures.append(self._executor.submit(context.run, self._render, sentence))
+
+    def close(self) -> float | None:
+        """Wait for queued sentences and return the time to first audio."""
+        try:
+            for future in self._futures:
+                future.result()
+        finally:
+            self._executor.shutdown(wait=True)
+        return self.time_to_first_audio
+
+    def _render(self, sentence: str) -> None:
+        fake = active_fake_audio()
+        if fake is not None:
+            # Fake WAVs carry their text in the header, so rewrite the whole file.
+            self._rendered.append(sentence)
+            with span("tts.sentence", characters=len(sentence)):
+                fake.synthesize(" ".join(self._rendered), self.out_wav)
+        else:
+            buffer = BytesIO()
+            with span("tts.sentence", characters=len(sentence)):
+                gTTS(text=sentence, lang="en").write_to_fp(buffer)
+            with open(self.out_wav, "ab") as f:
+                f.write(buffer.getvalue())
+        if self.time_to_first_audio is None:
+            self.time_to_first_audio = time.monotonic() - self._start
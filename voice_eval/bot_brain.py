@@ -1,9 +1,17 @@
 """LLM-powered bot brain using Claude for intent detection and routed responses."""
 
 import json
-from typing import Any, Dict, List, NotRequired, TypedDict
+import re
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NotRequired, Tuple, TypedDict
 
-from anthropic import Anthropic
+from anthropic import Anthropic, APITimeoutError
+
+from .bot_tools import generate_response_tool, policy_decision_tool
+from .deadline import TurnDeadline
+from .policies import POLICIES
+from .timing import timed_stage
+from .tracing import span
+from .usage import record_usage
 
 
 class HistoryEntry(TypedDict):
@@ -13,121 +21,252 @@ class HistoryEntry(TypedDict):
 
 _MODEL_NAME = "claude-haiku-4-5"
 _FALLBACK_UTTERANCE = "I'm sorry, I encountered an error. Could you please try again?"
-_VALID_INTENTS = (
-    "Return a damaged item",
-    "Request refund for duplicate charge",
-    "Change shipping address",
-    "Cancel an order",
-    "Check order status",
-    "Reset account password",
-    "Report a missing package",
-    "Upgrade subscription plan",
-)
-_SLOT_LABELS = {
-    "order_number": "order number",
-    "card_info": "last four digits of the card",
-    "email": "email address",
-    "account_number": "account number",
-}
-_INTENT_DETECTION_SCHEMA = {
-    "type": "object",
-    "properties": {
-        "detected_intent": {
-            "type": "string",
-            "enum": list(_VALID_INTENTS),
-        },
-    },
-    "required": ["detected_intent"],
-    "additionalProperties": False,
-}
-_INTENT_POLICIES = {
-    "Return a damaged item": {
-        "required_slot": "order_number",
-        "ask_action": "ASK_ORDER_NUMBER",
-        "final_action": "CONFIRM_RETURN",
-        "allowed_actions": ["ASK_ORDER_NUMBER", "CONFIRM_RETURN"],
-        "final_response_guidance": 'Include "return" and "return label".',
-    },
-    "Request refund for duplicate charge": {
-        "required_slot": "card_info",
-        "ask_action": "ASK_CARD_INFO",
-        "final_action": "PROCESS_REFUND",
-        "allowed_actions": ["ASK_CARD_INFO", "PROCESS_REFUND"],
-        "final_response_guidance": 'Include "refund".',
-    },
-    "Change shipping address": {
-        "required_slot": "order_number",
-        "ask_action": "ASK_ORDER_NUMBER",
-        "final_action": "CONFIRM_ADDRESS_CHANGE",
-        "allowed_actions": ["ASK_ORDER_NUMBER", "CONFIRM_ADDRESS_CHANGE"],
-        "final_response_guidance": 'Include "shipping address" and either "updated" or "changed".',
-    },
-    "Cancel an order": {
-        "required_slot": "order_number",
-        "ask_action": "ASK_ORDER_NUMBER",
-        "final_action": "CONFIRM_CANCELLATION",
-        "allowed_actions": ["ASK_ORDER_NUMBER", "CONFIRM_CANCELLATION"],
-        "final_response_guidance": 'Include "cancelled" or "canceled".',
-    },
-    "Check order status": {
-        "required_slot": "order_number",
-        "ask_action": "ASK_ORDER_NUMBER",
-        "final_action": "PROVIDE_STATUS",
-        "allowed_actions": ["ASK_ORDER_NUMBER", "PROVIDE_STATUS"],
-        "final_response_guidance": 'Include one of: "status", "processing", "shipped", "delivered", or "in transit".',
-    },
-    "Reset account password": {
-        "required_slot": "email",
-        "ask_action": "ASK_EMAIL",
-        "final_action": "SEND_RESET_LINK",
-        "allowed_actions": ["ASK_EMAIL", "SEND_RESET_LINK"],
-        "final_response_guidance": 'Include "reset link" or "check your email".',
-    },
-    "Report a missing package": {
-        "required_slot": "order_number",
-        "ask_action": "ASK_ORDER_NUMBER",
-        "final_action": "OPEN_INVESTIGATION",
-        "allowed_actions": ["ASK_ORDER_NUMBER", "OPEN_INVESTIGATION"],
-        "final_response_guidance": 'Include "investigation", "looking into", or "investigate".',
-    },
-    "Upgrade subscription plan": {
-        "required_slot": "account_number",
-        "ask_action": "ASK_ACCOUNT_NUMBER",
-        "final_action": "CONFIRM_UPGRADE",
-        "allowed_actions": ["ASK_ACCOUNT_NUMBER", "CONFIRM_UPGRADE"],
-        "final_response_guidance": 'Include "upgraded", "upgrade confirmed", "subscription has been updated", or "new plan".',
-    },
+# Sent in place of a turn in which nothing was heard; the API rejects empty user content.
+_UNHEARD = "(inaudible)"
+_UTTERANCE_KEY_RE = re.compile(r'"utterance"\s*:\s*"')
+_SENTENCE_END_RE = re.compile(r"[.!?]+\s+")
+_JSON_ESCAPES = {
+    '"': '"',
+    "\\": "\\",
+    "/": "/",
+    "b": "\b",
+    "f": "\f",
+    "n": "\n",
+    "r": "\r",
+    "t": "\t",
 }
 
+class Conversation:
+    """Conversation state shared by both bot-brain stages across turns.
+
+    Messages are appended as turns complete instead of being rebuilt from the
+    whole history for every call, and the slot block and system prompts are
+    rendered once per slot version. It can be used anywhere a list of
+    ``HistoryEntry`` dicts was used: iterating yields the completed turns and
+    ``append`` records a new one.
+
+    With ``keep_turns`` set, only the last ``keep_turns`` completed turns are
+    sent verbatim. Older turns are folded into a short state summary (detected
+    intent, filled slots, actions taken) that is added to the system prompts.
+    ``input_tokens_saved`` estimates the history tokens left out of requests,
+    summed per request: both stages send the history, so a turn that calls
+    both counts the saving twice, as it is billed.
+    """
+
+    def __init__(
+        self,
+        history: Iterable[HistoryEntry] = (),
+        keep_turns: int | None = None,
+    ) -> None:
+        self.keep_turns = keep_turns
+        self.input_tokens_saved = 0
+        self._turns: List[HistoryEntry] = []
+        self._turn_outcomes: List[Tuple[str, str]] = []
+        self._messages: List[Dict[str, str]] = []
+        self._pending_user = False
+        self._slots: Dict[str, Any] = {}
+        self._slot_version = 0
+        self._prompts: Dict[Tuple[str, str | None], str] = {}
+        self._compacted_turns = 0
+        self._compacted_tokens = 0
+        for entry in history:
+            self.append(entry)
+
+    def __iter__(self) -> Iterator[HistoryEntry]:
+        return iter(self._turns)
+
+    def __len__(self) -> int:
+        return len(self._turns)
+
+    @property
+    def slot_version(self) -> int:
+        return self._slot_version
+
+    @property
+    def compacted_turns(self) -> int:
+        return self._compacted_turns
+
+    @property
+    def last_detected_intent(self) -> str:
+        for intent, _ in reversed(self._turn_outcomes):
+            if intent:
+                return intent
+        return ""
+
+    def append(
+        self,
+        entry: HistoryEntry,
+        detected_intent: str = "",
+        action: str = "",
+    ) -> None:
+        """Record a completed turn and the intent and action the bot chose for it."""
+        self._turns.append(entry)
+        self._turn_outcomes.append((detected_intent, action))
+        self._set_pending_user(entry["user"])
+        self._pending_user = False
+        if entry.get("bot"):
+            self._messages.append({"role": "assistant", "content": entry["bot"]})
+
+        verbatim_turns = len(self._turns) - self._compacted_turns
+        if self.keep_turns is not None and verbatim_turns > self.keep_turns:
+            self._compact()
+
+    def messages_for(self, user_input: str) -> List[Dict[str, str]]:
+        """Return the API messages for one request of a turn with ``user_input``.
+
+        The list is a copy, so later turns do not change the arguments of
+        requests still in flight (e.g. a hedged duplicate). Each call counts
+        towards ``input_tokens_saved``.
+        """
+        self._set_pending_user(user_input)
+        if self._compacted_turns:
+            summary_tokens = _estimate_tokens(self._history_summary())
+            self.input_tokens_saved += max(0, self._compacted_tokens - summary_tokens)
+        return list(self._messages)
+
+    def set_slots(self, slots: Dict[str, Any]) -> None:
+        """Update the extracted slots, invalidating rendered prompts on change."""
+        if slots != self._slots:
+            self._slots = dict(slots)
+            self._slot_version += 1
+            self._prompts.clear()
+
+    def intent_detection_prompt(self) -> str:
+        return self._prompt(
+            "detect",
+            None,
+            lambda: _create_intent_detection_prompt(self._slots, self._state_block()),
+        )
+
+    def intent_action_prompt(self, intent: str) -> str:
+        return self._prompt(
+            "action",
+            intent,
+            lambda: _create_intent_action_prompt(intent, self._slots, self._state_block()),
+        )
+
+    def _state_block(self) -> str:
+        return self._prompt("state", None, self._render_state_block)
+
+    def _render_state_block(self) -> str:
+        slot_block = _format_slots(self._slots)
+        if not self._compacted_turns:
+            return slot_block
+        return f"{slot_block}\n\n{self._history_summary()}"
+
+    def _history_summary(self) -> str:
+        return self._prompt("summary", None, self._render_history_summary)
+
+    def _render_history_summary(self) -> str:
+        outcomes = self._turn_outcomes[:self._compacted_turns]
+        intents = [intent for intent, _ in outcomes if intent]
+        actions = list(dict.fromkeys(action for _, action in outcomes if action))
+        filled = ", ".join(sorted(self._slots)) or "none"
+        return (
+            f"Summary of {self._compacted_turns} earlier turns omitted from the message history:\n"
+            f"- Detected intent: {intents[-1] if intents else 'unknown'}\n"
+            f"- Filled slots: {filled}\n"
+            f"- Actions taken: {', '.join(actions) or 'none'}"
+        )
+
+    def _compact(self) -> None:
+        folded = self._turns[self._compacted_turns]
+        self._compacted_turns += 1
+        self._compacted_tokens += (
+            _estimate_tokens(folded["user"]) + _estimate_tokens(folded.get("bot", ""))
+        )
+        self._messages = []
+        for entry in self._turns[self._compacted_turns:]:
+            self._messages.append({"role": "user", "content": _user_content(entry["user"])})
+            if entry.get("bot"):
+                self._messages.append({"role": "assistant", "content": entry["bot"]})
+        self._prompts.clear()
+
+    def _prompt(self, kind: str, intent: str | None, render: Callable[[], str]) -> str:
+        key = (kind, intent)
+        if key not in self._prompts:
+            self._prompts[key] = render()
+        return self._prompts[key]
+
+    def _set_pending_user(self, content: str) -> None:
+        content = _user_content(content)
+        if self._pending_user:
+            self._messages[-1] = {"role": "user", "content": content}
+        else:
+            self._messages.append({"role": "user", "content": content})
+            self._pending_user = True
+
+
+def _user_content(text: str) -> str:
+    return text if text.strip() else _UNHEARD
+
+
+def _as_conversation(conversation_history: List[HistoryEntry] | Conversation) -> Conversation:
+    if isinstance(conversation_history, Conversation):
+        return conversation_history
+    return Conversation(conversation_history)
+
 
 def generate_bot_response(
     client: Anthropic,
     user_input: str,
     slots: Dict[str, Any],
-    conversation_history: List[HistoryEntry],
+    conversation_history: List[HistoryEntry] | Conversation,
+    on_sentence: Callable[[str], None] | None = None,
+    deadline: TurnDeadline | None = None,
 ) -> Dict[str, Any]:
-    """Use Claude to detect intent, then generate a routed action and response."""
-    detected_intent = detect_intent(
-        client=client,
-        user_input=user_input,
-        slots=slots,
-        conversation_history=conversation_history,
-    )
+    """Use Claude to detect intent, then generate a routed action and response.
+
+    When ``on_sentence`` is given, the routed response is streamed and each
+    completed sentence of the utterance is handed to the callback as soon as
+    it arrives. When a ``deadline`` leaves too little budget for a stage, or
+    the stage's request times out, stage 1 reuses the last detected intent
+    and stage 2 falls back to the template response for the policy's action.
+    A stage-1 timeout with no earlier intent goes straight to the template.
+    An empty ``user_input`` (nothing was heard) skips both stages and asks the
+    caller to clarify.
+    """
+    conversation_history = _as_conversation(conversation_history)
+    previous_intent = conversation_history.last_detected_intent
+    if not user_input.strip():
+        if deadline is not None:
+            deadline.degrade("stage_1")
+            deadline.degrade("stage_2")
+        return {**_templated("", user_input, slots, on_sentence), "detected_intent": previous_intent}
+    if deadline is not None and previous_intent and not deadline.allows("stage_1"):
+        deadline.degrade("stage_1")
+        detected_intent = previous_intent
+    else:
+        try:
+            with timed_stage("stage_1"):
+                detected_intent = detect_intent(
+                    client=client,
+                    user_input=user_input,
+                    slots=slots,
+                    conversation_history=conversation_history,
+                    deadline=deadline,
+                )
+        except APITimeoutError:
+            if deadline is None:
+                raise
+            deadline.degrade("stage_1")
+            detected_intent = previous_intent
+            if not detected_intent:
+                deadline.degrade("stage_2")
+                return _templated(detected_intent, user_input, slots, on_sentence)
 
     try:
-        routed_response = generate_intent_response(
-            client=client,
-            intent=detected_intent,
-            user_input=user_input,
-            slots=slots,
-            conversation_history=conversation_history,
-        )
+        with timed_stage("stage_2"):
+            routed_response = _route(
+                client, detected_intent, user_input, slots, conversation_history, on_sentence, deadline
+            )
+    except APITimeoutError:
+        if deadline is None:
+            return _fallback(detected_intent)
+        deadline.degrade("stage_2")
+        return _templated(detected_intent, user_input, slots, on_sentence)
     except Exception:
-        return {
-            "action": "ASK_CLARIFY",
-            "utterance": _FALLBACK_UTTERANCE,
-            "detected_intent": detected_intent,
-        }
+        return _fallback(detected_intent)
 
     return {
         "action": routed_response["action"],
@@ -136,20 +275,79 @@ def generate_bot_response(
     }
 
 
+def _templated(
+    detected_intent: str,
+    user_input: str,
+    slots: Dict[str, Any],
+    on_sentence: Callable[[str], None] | None,
+) -> Dict[str, Any]:
+    response = _template_response(detected_intent, user_input, slots)
+    if on_sentence is not None:
+        on_sentence(response["utterance"])
+    return {**response, "detected_intent": detected_intent}
+
+
+def _fallback(detected_intent: str) -> Dict[str, Any]:
+    return {
+        "action": "ASK_CLARIFY",
+        "utterance": _FALLBACK_UTTERANCE,
+        "detected_intent": detected_intent,
+    }
+
+
+def _route(
+    client: Anthropic,
+    detected_intent: str,
+    user_input: str,
+    slots: Dict[str, Any],
+    conversation_history: Conversation,
+    on_sentence: Callable[[str], None] | None,
+    deadline: TurnDeadline | None,
+) -> Dict[str, str]:
+    """Stage 2: the routed action and utterance for the detected intent."""
+    if deadline is not None and not deadline.allows("stage_2"):
+        deadline.degrade("stage_2")
+        return _templated(detected_intent, user_input, slots, on_sentence)
+    if on_sentence is not None:
+        return stream_intent_response(
+            client=client,
+            intent=detected_intent,
+            user_input=user_input,
+            slots=slots,
+            conversation_history=conversation_history,
+            on_sentence=on_sentence,
+            deadline=deadline,
+        )
+    return generate_intent_response(
+        client=client,
+        intent=detected_intent,
+        user_input=user_input,
+        slots=slots,
+        conversation_history=conversation_history,
+        deadline=deadline,
+    )
+
+
 def detect_intent(
     client: Anthropic,
     user_input: str,
     slots: Dict[str, Any],
-    conversation_history: List[HistoryEntry],
+    conversation_history: List[HistoryEntry] | Conversation,
+    deadline: TurnDeadline | None = None,
 ) -> str:
     """Detect the customer's intent from the conversation."""
-    response = client.messages.create(
-        model=_MODEL_NAME,
-        max_tokens=128,
-        system=_create_intent_detection_prompt(slots),
-        messages=_build_messages(conversation_history, user_input),
-        output_config=_create_output_config(_INTENT_DETECTION_SCHEMA),
-    )
+    conversation = _as_conversation(conversation_history)
+    conversation.set_slots(slots)
+    client = _bound_client(client, deadline)
+    with span("messages.create", model=_MODEL_NAME, purpose="intent_detection"):
+        response = client.messages.create(
+            model=_MODEL_NAME,
+            max_tokens=128,
+            system=conversation.intent_detection_prompt(),
+            messages=conversation.messages_for(user_input),
+            output_config=_create_output_config(POLICIES.intent_detection_schema),
+        )
+    record_usage("stage_1", _MODEL_NAME, response)
     parsed = _parse_structured_output(response)
     return parsed["detected_intent"]
 
@@ -159,22 +357,145 @@ def generate_intent_response(
     intent: str,
     user_input: str,
     slots: Dict[str, Any],
-    conversation_history: List[HistoryEntry],
+    conversation_history: List[HistoryEntry] | Conversation,
+    deadline: TurnDeadline | None = None,
 ) -> Dict[str, str]:
     """Generate an action and utterance for a known intent."""
-    policy = _INTENT_POLICIES[intent]
-    response = client.messages.create(
+    policy = POLICIES[intent]
+    conversation = _as_conversation(conversation_history)
+    conversation.set_slots(slots)
+    client = _bound_client(client, deadline)
+    with span("messages.create", model=_MODEL_NAME, purpose="intent_response", intent=intent):
+        response = client.messages.create(
+            model=_MODEL_NAME,
+            max_tokens=256,
+            system=conversation.intent_action_prompt(intent),
+            messages=conversation.messages_for(user_input),
+            output_config=_create_output_config(policy.response_schema),
+        )
+    record_usage("stage_2", _MODEL_NAME, response)
+    return _parse_structured_output(response)
+
+
+def stream_intent_response(
+    client: Anthropic,
+    intent: str,
+    user_input: str,
+    slots: Dict[str, Any],
+    conversation_history: List[HistoryEntry] | Conversation,
+    on_sentence: Callable[[str], None],
+    deadline: TurnDeadline | None = None,
+) -> Dict[str, str]:
+    """Stream an action and utterance for a known intent, sentence by sentence."""
+    policy = POLICIES[intent]
+    conversation = _as_conversation(conversation_history)
+    conversation.set_slots(slots)
+    parser = _UtteranceStreamParser()
+    sentences = _SentenceBuffer(on_sentence)
+    client = _bound_client(client, deadline)
+
+    with span("messages.stream", model=_MODEL_NAME, purpose="intent_response", intent=intent), client.messages.stream(
         model=_MODEL_NAME,
         max_tokens=256,
-        system=_create_intent_action_prompt(intent, slots),
-        messages=_build_messages(conversation_history, user_input),
-        output_config=_create_output_config(
-            _build_action_response_schema(policy["allowed_actions"])
-        ),
-    )
+        system=conversation.intent_action_prompt(intent),
+        messages=conversation.messages_for(user_input),
+        output_config=_create_output_config(policy.response_schema),
+    ) as stream:
+        for chunk in stream.text_stream:
+            sentences.feed(parser.feed(chunk))
+        response = stream.get_final_message()
+
+    record_usage("stage_2", _MODEL_NAME, response)
+    sentences.flush()
     return _parse_structured_output(response)
 
 
+class _UtteranceStreamParser:
+    """Incrementally decode the ``utterance`` string out of streamed JSON."""
+
+    def __init__(self) -> None:
+        self._buffer = ""
+        self._pos: int | None = None
+        self.done = False
+
+    def feed(self, chunk: str) -> str:
+        """Add raw JSON text and return any newly decoded utterance text."""
+        self._buffer += chunk
+        if self.done:
+            return ""
+        if self._pos is None:
+            match = _UTTERANCE_KEY_RE.search(self._buffer)
+            if match is None:
+                return ""
+            self._pos = match.end()
+
+        buffer = self._buffer
+        i = self._pos
+        decoded = []
+        while i < len(buffer):
+            char = buffer[i]
+            if char == '"':
+                self.done = True
+                i += 1
+                break
+            if char != "\\":
+                decoded.append(char)
+                i += 1
+                continue
+            if i + 1 >= len(buffer):
+                break
+            if buffer[i + 1] != "u":
+                decoded.append(_JSON_ESCAPES.get(buffer[i + 1], buffer[i + 1]))
+                i += 2
+                continue
+            if i + 6 > len(buffer):
+                break
+            # A high surrogate needs its low half before it can be decoded.
+            width = 12 if 0xD800 <= int(buffer[i + 2:i + 6], 16) <= 0xDBFF else 6
+            if i + width > len(buffer):
+                break
+            decoded.append(json.loads(f'"{buffer[i:i + width]}"'))
+            i += width
+
+        self._pos = i
+        return "".join(decoded)
+
+
+class _SentenceBuffer:
+    """Collect streamed text and emit each completed sentence once."""
+
+    def __init__(self, on_sentence: Callable[[str], None]) -> None:
+        self._on_sentence = on_sentence
+        self._pending = ""
+
+    def feed(self, text: str) -> None:
+        if not text:
+            return
+        self._pending += text
+        start = 0
+        for match in _SENTENCE_END_RE.finditer(self._pending):
+            sentence = self._pending[start:match.end()].strip()
+            if sentence:
+                self._on_sentence(sentence)
+            start = match.end()
+        self._pending = self._pending[start:]
+
+    def flush(self) -> None:
+        sentence = self._pending.strip()
+        self._pending = ""
+        if sentence:
+            self._on_sentence(sentence)
+
+
+def _template_response(intent: str, user_input: str, slots: Dict[str, Any]) -> Dict[str, str]:
+    decision = policy_decision_tool(intent, user_input, slots)
+    return generate_response_tool(decision.data["action"], slots).data
+
+
+def _bound_client(client: Anthropic, deadline: TurnDeadline | None) -> Anthropic:
+    return deadline.bind(client) if deadline is not None else client
+
+
 def _create_output_config(schema: Dict[str, Any]) -> Dict[str, Any]:
     return {
         "format": {
@@ -184,39 +505,17 @@ def _create_output_config(schema: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
-def _build_action_response_schema(allowed_actions: List[str]) -> Dict[str, Any]:
-    return {
-        "type": "object",
-        "properties": {
-            "action": {"type": "string", "enum": allowed_actions},
-            "utterance": {"type": "string"},
-        },
-        "required": ["action", "utterance"],
-        "additionalProperties": False,
-    }
-
-
 def _parse_structured_output(response: Any) -> Dict[str, Any]:
     return json.loads(response.content[0].text)
 
 
-def _build_messages(
-    conversation_history: List[HistoryEntry],
-    user_input: str,
-) -> List[Dict[str, str]]:
-    messages: List[Dict[str, str]] = []
-    for entry in conversation_history:
-        messages.append({"role": "user", "content": entry["user"]})
-        if entry.get("bot"):
-            messages.append({"role": "assistant", "content": entry["bot"]})
-
-    messages.append({"role": "user", "content": user_input})
-    return messages
-
-
-def _create_intent_detection_prompt(slots: Dict[str, Any]) -> str:
-    extracted_info = _format_slots(slots)
-    intents = "\n".join(f'- "{intent}"' for intent in _VALID_INTENTS)
+def _create_intent_detection_prompt(
+    slots: Dict[str, Any],
+    extracted_info: str | None = None,
+) -> str:
+    if extracted_info is None:
+        extracted_info = _format_slots(slots)
+    intents = POLICIES.intent_list
 
     return f"""You are routing a customer service conversation for a retail company.
 
@@ -235,39 +534,26 @@ Rules:
 - Do not return any explanation, only the structured output."""
 
 
-def _create_intent_action_prompt(intent: str, slots: Dict[str, Any]) -> str:
-    policy = _INTENT_POLICIES[intent]
-    required_slot = policy["required_slot"]
-    slot_label = _SLOT_LABELS[required_slot]
-    slot_value = slots.get(required_slot)
+def _create_intent_action_prompt(
+    intent: str,
+    slots: Dict[str, Any],
+    extracted_info: str | None = None,
+) -> str:
+    policy = POLICIES[intent]
+    slot_value = slots.get(policy.required_slot)
     slot_status = (
         f'present as "{slot_value}"' if slot_value else "missing"
     )
-    allowed_actions = ", ".join(policy["allowed_actions"])
-    extracted_info = _format_slots(slots)
-
-    return f"""You are a customer service bot for a retail company.
+    if extracted_info is None:
+        extracted_info = _format_slots(slots)
 
-The customer's intent has already been detected as: "{intent}"
+    prefix, workflow, rules = policy.action_prompt_parts
+    return f"{prefix}{extracted_info}{workflow}{slot_status}{rules}"
 
-You have access to the following extracted information from the conversation:
-{extracted_info}
 
-Workflow for this intent:
-- Required slot: "{required_slot}" ({slot_label})
-- Current required slot status: {slot_status}
-- Valid actions for this intent: {allowed_actions}
-- If the required slot is missing, choose "{policy['ask_action']}" and ask only for the {slot_label}.
-- If the required slot is present, choose "{policy['final_action']}" and complete the request immediately.
-- Do not ask unrelated follow-up questions once the required slot is present.
-
-Response rules:
-- Be concise and professional. One to two sentences max.
-- Do NOT make up order numbers, tracking info, or other specific data not in the extracted slots.
-- When using the final action, reference the specific information the customer provided.
-- For benchmark compatibility, successful final responses should follow this wording guidance: {policy['final_response_guidance']}
-
-Return only the structured output."""
+def _estimate_tokens(text: str) -> int:
+    # Roughly four characters per token for English text.
+    return (len(text) + 3) // 4
 
 
 def _format_slots(slots: Dict[str, Any]) -> str:
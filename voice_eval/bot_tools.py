@@ -1,7 +1,10 @@
 # Rule-based bot tools for voice evaluation
 import re
-from typing import Dict, Any, Optional
-from dataclasses import dataclass
+from array import array
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+from dataclasses import dataclass, field
+
+from .policies import POLICIES
 
 
 @dataclass
@@ -11,53 +14,239 @@ class ToolResult:
     error: Optional[str] = None
 
 
+@dataclass(frozen=True)
+class SlotCandidate:
+    slot: str
+    value: str
+    start: int
+    end: int
+    priority: int
+
+
+@dataclass
+class SlotColumn:
+    """Values and value spans of one slot across a batch of transcripts.
+
+    Row ``i`` holds the winning value for transcript ``i``, or ``None`` with a
+    ``-1`` span when the slot was not found.
+    """
+    values: List[Optional[str]] = field(default_factory=list)
+    starts: array = field(default_factory=lambda: array("q"))
+    ends: array = field(default_factory=lambda: array("q"))
+
+
+@dataclass
+class SlotBatch:
+    """Columnar slot extraction results, one column per supported slot."""
+    size: int
+    columns: Dict[str, SlotColumn]
+
+    def row(self, index: int) -> Dict[str, str]:
+        """Return the slots found in one transcript, as ``extract`` would."""
+        return {
+            slot: column.values[index]
+            for slot, column in self.columns.items()
+            if column.values[index] is not None
+        }
+
+
+@dataclass(frozen=True)
+class _SlotRule:
+    slot: str
+    # Keyword whose occurrences anchor the pattern. Unanchored rules are
+    # searched over the whole input once the keyword is seen.
+    trigger: str
+    # Pattern with exactly one capturing group holding the slot value.
+    pattern: str
+    # Literal that must appear somewhere in the lowered input for the rule to apply.
+    gate: Optional[str] = None
+    anchored: bool = True
+    strip_commas: bool = False
+
+
+_ACCOUNT_VALUE = r"([A-Za-z0-9]{5,8})"
+
+# Rules are listed in priority order: for each slot, the first rule that
+# matches anywhere wins, and among its matches the leftmost one.
+_SLOT_RULES = (
+    _SlotRule("email", "@", r"\b([A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,})\b", anchored=False),
+    _SlotRule("account_number", "account", rf"\baccount\s+number\s+is\s+{_ACCOUNT_VALUE}\b"),
+    _SlotRule("account_number", "my", rf"\bmy\s+account\s+is\s+{_ACCOUNT_VALUE}\b", gate="account"),
+    _SlotRule("account_number", "account", rf"\baccount\s+is\s+{_ACCOUNT_VALUE}\b"),
+    _SlotRule("account_number", "account", rf"\baccount\s+{_ACCOUNT_VALUE}\b"),
+    _SlotRule("order_number", "order", r"order\s+number\s+is\s+(\d+)\b", strip_commas=True),
+    _SlotRule("order_number", "order", r"order\s+(\d{1,3}(?:,\d{3})+(?:-\d+)?)\b", strip_commas=True),
+    _SlotRule("order_number", "order", r"order\s+#?(\d+)\b", strip_commas=True),
+    _SlotRule("card_info", "card", r"card\s+ending\s+(\d{1,3}(?:,\d{3})+)\b", gate="card ending", strip_commas=True),
+    _SlotRule("card_info", "card", r"card\s+ending\s+(\d{4})\b", gate="card ending", strip_commas=True),
+)
+
+
+class SlotExtractor:
+    """Precompiled slot extraction engine.
+
+    All rule patterns are compiled once. Each trigger keyword is gated on
+    its literal being present in the lowered input, and its rules are
+    combined into one alternation that is only tried, anchored, at the
+    keyword's occurrences. Inputs without keywords therefore cost a handful
+    of substring checks. Matching the lowered text with case-insensitive
+    patterns is equivalent to the per-slot ``re.search`` chain this replaces.
+    """
+
+    def __init__(self, rules=_SLOT_RULES):
+        self.rules = tuple(rules)
+        self.slots = tuple(dict.fromkeys(rule.slot for rule in self.rules))
+        self._rule_columns = tuple(self.slots.index(rule.slot) for rule in self.rules)
+        self._plans = []
+        for trigger in dict.fromkeys(rule.trigger for rule in self.rules):
+            indexed = [(i, rule) for i, rule in enumerate(self.rules) if rule.trigger == trigger]
+            gates = {rule.gate or rule.trigger for _, rule in indexed}
+            if len(gates) != 1:
+                raise ValueError(f"Slot rules triggered by {trigger!r} must share one gate")
+
+            anchored = [(i, rule) for i, rule in indexed if rule.anchored]
+            combined = None
+            if anchored:
+                combined = re.compile(
+                    "|".join(f"(?P<r{i}>{rule.pattern})" for i, rule in anchored),
+                    re.IGNORECASE,
+                )
+            unanchored = [(i, re.compile(rule.pattern)) for i, rule in indexed if not rule.anchored]
+            self._plans.append((
+                trigger,
+                gates.pop(),
+                combined,
+                unanchored,
+                re.compile(re.escape(trigger), re.IGNORECASE),
+            ))
+
+    def candidates(self, text: str) -> List[SlotCandidate]:
+        """Return the raw slot candidates in the text, with their value spans.
+
+        Each occurrence of a trigger keyword yields at most one candidate, from
+        the highest-priority rule that matches there; unanchored rules yield
+        every match. Unlike ``extract``, no winner is picked per slot.
+        """
+        return [
+            SlotCandidate(self.rules[index].slot, value, start, end, index)
+            for index, value, start, end in self._scan(text)
+        ]
+
+    def extract(self, text: str) -> Dict[str, str]:
+        """Return the winning value for each slot found in the text."""
+        return {
+            self.slots[column]: hit[1]
+            for column, hit in enumerate(self._best(text))
+            if hit is not None
+        }
+
+    def extract_batch(self, transcripts: Iterable[str]) -> SlotBatch:
+        """Extract slots from every transcript into one columnar result.
+
+        ``transcripts`` may be any iterable, including a lazy stream; it is
+        consumed once and only the columns are kept in memory.
+        """
+        columns = [SlotColumn() for _ in self.slots]
+        size = 0
+        for row, text in enumerate(transcripts):
+            size = row + 1
+            for column, hit in enumerate(self._best(text)):
+                if hit is None:
+                    continue
+                _, value, start, end = hit
+                _pad_column(columns[column], row)
+                columns[column].values.append(value)
+                columns[column].starts.append(start)
+                columns[column].ends.append(end)
+
+        for column in columns:
+            _pad_column(column, size)
+        return SlotBatch(size=size, columns=dict(zip(self.slots, columns)))
+
+    def _best(self, text: str) -> List[Optional[Tuple[int, str, int, int]]]:
+        # One entry per slot, in ``self.slots`` order: the match of the
+        # highest-priority rule, leftmost among that rule's matches.
+        best = [None] * len(self.slots)
+        rule_columns = self._rule_columns
+        for hit in self._scan(text):
+            column = rule_columns[hit[0]]
+            current = best[column]
+            if current is None or (hit[0], hit[2]) < (current[0], current[2]):
+                best[column] = hit
+        return best
+
+    def _scan(self, text: str) -> List[Tuple[int, str, int, int]]:
+        lowered = text.lower()
+        # Lowercasing can change the length of some non-ASCII text; spans must
+        # index the original text, so fall back to scanning it directly.
+        exact = len(lowered) == len(text)
+        subject = lowered if exact else text
+        found = []
+
+        for trigger, gate, combined, unanchored, trigger_re in self._plans:
+            if gate not in lowered:
+                continue
+
+            for index, pattern in unanchored:
+                for m in pattern.finditer(text):
+                    found.append(self._match_value(text, m, 1, index))
+
+            if combined is None:
+                continue
+            if exact:
+                positions = self._find_all(subject, trigger)
+            else:
+                positions = (hit.start() for hit in trigger_re.finditer(subject))
+            for position in positions:
+                m = combined.match(subject, position)
+                if m is not None:
+                    index = int(m.lastgroup[1:])
+                    found.append(self._match_value(text, m, combined.groupindex[m.lastgroup] + 1, index))
+
+        return found
+
+    @staticmethod
+    def _find_all(subject: str, trigger: str) -> List[int]:
+        positions = []
+        position = subject.find(trigger)
+        while position != -1:
+            positions.append(position)
+            position = subject.find(trigger, position + 1)
+        return positions
+
+    def _match_value(self, text: str, m: re.Match, group: int, index: int) -> Tuple[int, str, int, int]:
+        start, end = m.span(group)
+        value = text[start:end]
+        if self.rules[index].strip_commas:
+            value = value.replace(",", "")
+        return index, value, start, end
+
+
+_MISSING_SPAN = array("q", [-1])
+
+
+def _pad_column(column: SlotColumn, size: int) -> None:
+    # Columns are filled sparsely; rows without a value are padded on demand.
+    missing = size - len(column.values)
+    if missing > 0:
+        column.values.extend([None] * missing)
+        column.starts.extend(_MISSING_SPAN * missing)
+        column.ends.extend(_MISSING_SPAN * missing)
+
+
+SLOT_EXTRACTOR = SlotExtractor()
+
+
+def extract_slots_batch(transcripts: Iterable[str]) -> SlotBatch:
+    """Extract slots from many transcripts without per-call tool overhead."""
+    return SLOT_EXTRACTOR.extract_batch(transcripts)
+
+
 def extract_slots_tool(user_input: str, current_slots: Dict[str, Any]) -> ToolResult:
     """Extract supported slots from user input."""
     try:
         slots = dict(current_slots)
-        user_lower = user_input.lower()
-
-        if m := re.search(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b", user_input):
-            slots["email"] = m.group(0)
-
-        if "account" in user_lower:
-            account_patterns = [
-                r"\baccount\s+number\s+is\s+([A-Za-z0-9]{5,8})\b",
-                r"\bmy\s+account\s+number\s+is\s+([A-Za-z0-9]{5,8})\b",
-                r"\bmy\s+account\s+is\s+([A-Za-z0-9]{5,8})\b",
-                r"\baccount\s+is\s+([A-Za-z0-9]{5,8})\b",
-                r"\baccount\s+([A-Za-z0-9]{5,8})\b",
-            ]
-
-            for pattern in account_patterns:
-                if m := re.search(pattern, user_input, re.IGNORECASE):
-                    slots["account_number"] = m.group(1)
-                    break
-
-        if "order" in user_lower:
-            order_patterns = [
-                r"order\s+number\s+is\s+(\d+)\b",
-                r"my\s+order\s+number\s+is\s+(\d+)\b",
-                r"order\s+(\d{1,3}(?:,\d{3})+(?:-\d+)?)\b",
-                r"order\s+#?(\d+)\b",
-            ]
-
-            for pattern in order_patterns:
-                if m := re.search(pattern, user_lower):
-                    slots["order_number"] = m.group(1).replace(",", "")
-                    break
-
-        if "card ending" in user_lower:
-            card_patterns = [
-                r"card\s+ending\s+(\d{1,3}(?:,\d{3})+)\b",
-                r"card\s+ending\s+(\d{4})\b",
-            ]
-
-            for pattern in card_patterns:
-                if m := re.search(pattern, user_lower):
-                    slots["card_info"] = m.group(1).replace(",", "")
-                    break
-
+        slots.update(SLOT_EXTRACTOR.extract(user_input))
         return ToolResult(success=True, data=slots)
 
     except Exception as e:
@@ -67,47 +256,7 @@ def extract_slots_tool(user_input: str, current_slots: Dict[str, Any]) -> ToolRe
 def policy_decision_tool(goal: str, user_input: str, available_slots: Dict[str, Any]) -> ToolResult:
     """Determine the appropriate action based on goal and available information."""
     try:
-        if goal == "Change shipping address":
-            if "order_number" in available_slots:
-                return ToolResult(success=True, data={"action": "CONFIRM_ADDRESS_CHANGE"})
-            return ToolResult(success=True, data={"action": "ASK_ORDER_NUMBER"})
-
-        if goal == "Return a damaged item":
-            if "order_number" in available_slots:
-                return ToolResult(success=True, data={"action": "CONFIRM_RETURN"})
-            return ToolResult(success=True, data={"action": "ASK_ORDER_NUMBER"})
-
-        if goal == "Request refund for duplicate charge":
-            if "card_info" in available_slots:
-                return ToolResult(success=True, data={"action": "PROCESS_REFUND"})
-            return ToolResult(success=True, data={"action": "ASK_CARD_INFO"})
-
-        if goal == "Cancel an order":
-            if "order_number" in available_slots:
-                return ToolResult(success=True, data={"action": "CONFIRM_CANCELLATION"})
-            return ToolResult(success=True, data={"action": "ASK_ORDER_NUMBER"})
-
-        if goal == "Check order status":
-            if "order_number" in available_slots:
-                return ToolResult(success=True, data={"action": "PROVIDE_STATUS"})
-            return ToolResult(success=True, data={"action": "ASK_ORDER_NUMBER"})
-
-        if goal == "Reset account password":
-            if "email" in available_slots:
-                return ToolResult(success=True, data={"action": "SEND_RESET_LINK"})
-            return ToolResult(success=True, data={"action": "ASK_EMAIL"})
-
-        if goal == "Report a missing package":
-            if "order_number" in available_slots:
-                return ToolResult(success=True, data={"action": "OPEN_INVESTIGATION"})
-            return ToolResult(success=True, data={"action": "ASK_ORDER_NUMBER"})
-
-        if goal == "Upgrade subscription plan":
-            if "account_number" in available_slots:
-                return ToolResult(success=True, data={"action": "CONFIRM_UPGRADE"})
-            return ToolResult(success=True, data={"action": "ASK_ACCOUNT_NUMBER"})
-
-        return ToolResult(success=True, data={"action": "ASK_CLARIFY"})
+        return ToolResult(success=True, data={"action": POLICIES.decide(goal, available_slots)})
 
     except Exception as e:
         return ToolResult(success=False, data={"action": "ASK_CLARIFY"}, error=str(e))
@@ -132,7 +281,9 @@ def generate_response_tool(action: str, slots: Dict[str, Any]) -> ToolResult:
             "ASK_CLARIFY": "I'm not sure I understand. Could you please clarify what you'd like help with?"
         }
 
-        utterance = responses.get(action, "I'm not sure how to help with that.")
+        utterance = responses.get(action) or POLICIES.final_response(action, slots)
+        if utterance is None:
+            utterance = "I'm not sure how to help with that."
 
         return ToolResult(success=True, data={
             "action": action,
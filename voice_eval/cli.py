@@ -1,11 +1,35 @@
 # Command line interface for voice evaluation system
+from contextlib import ExitStack
 from pathlib import Path
 
+from anthropic import Anthropic
 from dotenv import load_dotenv
 import typer
 
-from .reporters.markdown import write_markdown_report
-from .simulator import run_directory
+from .evaluator_claude import ClaudeJudge
+from .fake_backend import FakeAudio, FakeClaudeServer, Latency
+from .hedging import HedgedClient
+from .journal import RunJournal
+from .memory import MemoryTracker, format_bytes, memory_stage
+from .metrics import format_latency_summary
+from .pipeline import Pipeline
+from .policies import POLICIES
+from .profiling import PROFILE_MODES, Profiler, parse_profile_targets, profiled
+from .reporters.markdown import MarkdownReportWriter, is_reused, summary_row, write_markdown_report
+from .result_cache import ResultCache
+from .sharding import (
+    ShardResultWriter,
+    load_durations,
+    merge_shard_results,
+    parse_shard,
+    partition_key,
+    save_durations,
+    shard_result_path,
+)
+from .simulator import iter_directory, select_scenarios
+from .tool_client import ToolClient
+from .tracing import Tracer
+from .usage import PriceTable, add_usage, total_usage
 
 app = typer.Typer()
 
@@ -30,29 +54,420 @@ def scenarios(
         help="Only run scenarios that have recordings in --real-audio directory",
     ),
     model: str = typer.Option("tiny", help="ASR model size"),
-    judge: str = typer.Option("rules", help="Evaluation judge: rules | claude"),
+    judge: str = typer.Option("rules", help="Evaluation judge: rules | claude | tiered"),
+    judge_cache: str = typer.Option(
+        "out/judge_cache.jsonl",
+        help="Persistent Claude judge verdict cache (JSONL)",
+    ),
+    judge_workers: int = typer.Option(
+        4,
+        help="Background Claude judge workers; 0 judges each turn inline",
+    ),
+    stream: bool = typer.Option(
+        False,
+        help="Stream bot responses and synthesize each sentence as it arrives",
+    ),
+    hedge_percentile: float = typer.Option(
+        None,
+        help="Send a duplicate LLM request when a call outlives this latency percentile",
+    ),
+    hedge_max_extra: float = typer.Option(
+        0.1,
+        help="Maximum extra LLM requests from hedging, as a fraction of all calls",
+    ),
+    keep_turns: int = typer.Option(
+        None,
+        help="Send only the last K turns verbatim and summarize older turns",
+    ),
+    turn_budget: float = typer.Option(
+        None,
+        help="Per-turn latency budget in seconds; slow stages degrade to cheaper paths",
+    ),
+    workers: int = typer.Option(
+        1,
+        help="Number of scenarios to run concurrently",
+    ),
+    pipeline: bool = typer.Option(
+        False,
+        help="Run as a staged pipeline: prefetch caller audio and ASR ahead of the conversations",
+    ),
+    asr_workers: int = typer.Option(2, help="ASR worker processes in --pipeline mode"),
+    tts_workers: int = typer.Option(4, help="Caller and bot TTS worker threads in --pipeline mode"),
+    buffer_turns: int = typer.Option(
+        32,
+        help="Turns each --pipeline stage may run ahead of the conversations",
+    ),
+    shard: str = typer.Option(
+        None,
+        help="Run only shard i of N (e.g. 2/4), balanced by recorded scenario durations",
+    ),
+    shard_dir: str = typer.Option("out/shards", help="Directory for shard result files"),
+    durations: str = typer.Option(
+        "out/scenario_durations.json",
+        help="Per-scenario duration history used to balance shards",
+    ),
+    policies: str = typer.Option(
+        None,
+        help="YAML file with extra intent policies to register before the run",
+    ),
+    journal: str = typer.Option(
+        None,
+        help="Checkpoint journal of finished scenarios (JSONL); "
+        "defaults to out/journal.jsonl, or one per shard next to its results",
+    ),
+    resume: bool = typer.Option(
+        False,
+        help="Skip scenarios already in the journal and report them with the new results",
+    ),
+    result_cache: str = typer.Option(
+        "out/result_cache.jsonl",
+        help="Results keyed by input fingerprint; unchanged scenarios reuse them",
+    ),
+    rerun: bool = typer.Option(
+        False,
+        help="Rerun every scenario even if its inputs are unchanged (still refreshes --result-cache)",
+    ),
+    trace: str = typer.Option(
+        None,
+        help="Write nested spans of the run to this directory: trace.json (Perfetto / chrome://tracing) "
+        "and trace.otlp.json (OTLP JSON)",
+    ),
+    profile: str = typer.Option(
+        None,
+        help="CPU-profile the whole run ('run') or selected stages (comma-separated: asr, llm, judge, report)",
+    ),
+    profiler: str = typer.Option("deterministic", help="Profiler for --profile: deterministic (cProfile) | sampling"),
+    profile_dir: str = typer.Option("out/profile", help="Directory for profile.pstats and profile.collapsed"),
+    profile_top: int = typer.Option(20, help="Hot functions to print after a --profile run"),
+    memory: bool = typer.Option(
+        False,
+        help="Track memory: tracemalloc per scenario, peak RSS per stage, top allocation sites",
+    ),
+    memory_top: int = typer.Option(10, help="Allocation sites to print after a --memory run"),
+    prices: str = typer.Option(
+        None,
+        help="YAML file of per-model token prices (USD per million tokens) used for cost estimates",
+    ),
+    backend: str = typer.Option(
+        "real",
+        help="real | fake: offline deterministic stand-ins for TTS, ASR and Claude (for benchmarking the harness)",
+    ),
+    fake_asr_noise: float = typer.Option(0.0, help="--backend fake: chance each transcribed word is garbled"),
+    fake_asr_latency: str = typer.Option(
+        "0",
+        help="--backend fake: ASR latency in seconds, or uniform:LOW:HIGH, normal:MEAN:SD, lognormal:MEDIAN:SIGMA, exp:MEAN",
+    ),
+    fake_llm_latency: str = typer.Option("0", help="--backend fake: Claude request latency, as --fake-asr-latency"),
+    fake_rate_limit: float = typer.Option(0.0, help="--backend fake: chance a Claude request is rejected with a 429"),
+    fake_seed: int = typer.Option(0, help="--backend fake: seed for noise, latencies and 429s"),
 ):
     """Run voice evaluation scenarios."""
     Path(report).parent.mkdir(parents=True, exist_ok=True)
     Path(audio_dir).mkdir(parents=True, exist_ok=True)
+    try:
+        shard_spec = parse_shard(shard) if shard is not None else None
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc), param_hint="--shard") from None
+    if policies is not None:
+        POLICIES.load_yaml(Path(policies))
+    price_table = _load_prices(prices)
+    run_profiler = None
+    if profile is not None:
+        if profiler not in PROFILE_MODES:
+            raise typer.BadParameter(f"use one of {', '.join(PROFILE_MODES)}", param_hint="--profiler")
+        try:
+            run_profiler = Profiler(parse_profile_targets(profile), mode=profiler)
+        except ValueError as exc:
+            raise typer.BadParameter(str(exc), param_hint="--profile") from None
+    if backend not in ("real", "fake"):
+        raise typer.BadParameter("use real or fake", param_hint="--backend")
+    if hedge_percentile is not None and not 0 < hedge_percentile <= 100:
+        raise typer.BadParameter("must be in (0, 100]", param_hint="--hedge-percentile")
+    fake_audio = fake_server = None
+    if backend == "fake":
+        try:
+            fake_audio = FakeAudio(noise=fake_asr_noise, latency=Latency.parse(fake_asr_latency), seed=fake_seed)
+            fake_server = FakeClaudeServer(
+                latency=Latency.parse(fake_llm_latency),
+                rate_limit=fake_rate_limit,
+                seed=fake_seed,
+            )
+        except ValueError as exc:
+            raise typer.BadParameter(str(exc), param_hint="--fake-*") from None
+
+    if journal is not None:
+        journal_path = Path(journal)
+    elif shard_spec is not None:
+        journal_path = shard_result_path(Path(shard_dir), *shard_spec).with_suffix(".journal.jsonl")
+    else:
+        journal_path = Path("out/journal.jsonl")
+    if fake_server is not None and journal is None:
+        # Keep fake runs away from a real run's resume checkpoint.
+        journal_path = journal_path.with_name(journal_path.name.replace(".jsonl", ".fake.jsonl"))
+    run_journal = RunJournal(journal_path)
+    if resume:
+        print(f"Resuming: {len(run_journal.index())} scenarios already in {journal_path}")
+    else:
+        run_journal.reset()
 
-    results = run_directory(
+    client = fake_server.client() if fake_server is not None else None
+    if hedge_percentile is not None:
+        client = HedgedClient(
+            client if client is not None else Anthropic(),
+            percentile=hedge_percentile,
+            max_extra_ratio=hedge_max_extra,
+        )
+
+    tool_client = ToolClient()
+    claude_judge = None
+    if judge in ("claude", "tiered"):
+        # Fake verdicts must not land in the real judge cache.
+        claude_judge = (
+            ClaudeJudge(client=fake_server.client())
+            if fake_server is not None
+            else ClaudeJudge(cache_path=judge_cache)
+        )
+    stage_pipeline = (
+        Pipeline(
+            conversation_workers=workers,
+            asr_workers=asr_workers,
+            tts_workers=tts_workers,
+            buffer_turns=buffer_turns,
+            # The fake ASR is installed in this process only.
+            asr_processes=fake_audio is None,
+        )
+        if pipeline
+        else None
+    )
+    shard_durations = load_durations(Path(durations)) if shard_spec is not None else None
+    results = iter_directory(
         Path(path),
         Path(audio_dir),
         model_size=model,
         judge=judge,
         real_audio_dir=real_audio,
         real_audio_only=real_audio_only,
+        stream=stream,
+        client=client,
+        keep_turns=keep_turns,
+        turn_budget=turn_budget,
+        tool_client=tool_client,
+        claude_judge=claude_judge,
+        judge_workers=judge_workers,
+        workers=workers,
+        shard=shard_spec,
+        durations=shard_durations,
+        pipeline=stage_pipeline,
+        journal=run_journal,
+        # Fake results are never cached, so they cannot stand in for real ones.
+        result_cache=ResultCache(result_cache, reuse=not rerun) if fake_server is None else None,
     )
-    write_markdown_report(results, Path(report))
+    # Results stream into the report (and shard file) as scenarios finish;
+    # only their summary rows are kept for the totals.
+    rows = []
+    tracer = Tracer() if trace is not None else None
+    memory_tracker = MemoryTracker(top=memory_top) if memory else None
+    print(f"Writing report to {report} as scenarios finish")
+    with MarkdownReportWriter(Path(report), prices=price_table) as report_writer, ExitStack() as stack:
+        if tracer is not None:
+            stack.enter_context(tracer.install())
+        if run_profiler is not None:
+            stack.enter_context(run_profiler.install())
+        if memory_tracker is not None:
+            stack.enter_context(memory_tracker.install())
+        if fake_server is not None:
+            stack.enter_context(fake_server)
+            stack.enter_context(fake_audio.install())
+        shard_writer = None
+        if shard_spec is not None:
+            shard_path = shard_result_path(Path(shard_dir), *shard_spec)
+            suite_ids = [s.id for s in select_scenarios(Path(path), real_audio, real_audio_only)]
+            shard_writer = stack.enter_context(ShardResultWriter(
+                shard_path,
+                *shard_spec,
+                partition=partition_key(suite_ids, shard_spec[1], shard_durations),
+                scenarios=len(suite_ids),
+            ))
+        for result in results:
+            with profiled("report"), memory_stage("report"):
+                report_writer.add(result)
+            if shard_writer is not None:
+                shard_writer.add(result)
+            rows.append(summary_row(result))
+        with profiled("report"), memory_stage("report"):
+            report_writer.close()
+    tool_client.close()
+    # Shards leave the history alone so every shard of a run splits against
+    # the same snapshot; ``merge`` records their durations.
+    if fake_server is None and shard_spec is None:
+        save_durations(Path(durations), rows)
+    if shard_spec is not None:
+        print(f"Shard {shard_spec[0]}/{shard_spec[1]} results written to: {shard_path}")
+
+    _print_totals(rows)
+    _print_usage(rows, price_table)
+    reused = sum(1 for r in rows if r.get("from_cache"))
+    if reused:
+        print(f"Result cache: {reused}/{len(rows)} scenarios reused unchanged results")
+    if hedge_percentile is not None:
+        client.close()
+        hedging = client.summary()
+        print(
+            f"Hedging: {hedging['hedged']}/{hedging['calls']} LLM calls hedged "
+            f"({hedging['hedge_rate']:.1%}), hedge won {hedging['hedge_wins']}"
+        )
+        print(f"LLM latency before hedging: {format_latency_summary(hedging['before'])}")
+        print(f"LLM latency after hedging: {format_latency_summary(hedging['after'])}")
+        if hedging["overhead"]:
+            overhead = total_usage(hedging["overhead"])
+            cost = price_table.total_cost(hedging["overhead"])
+            print(
+                f"Hedge overhead (discarded responses, not in the token totals above): "
+                f"{overhead['calls']} responses, {overhead['input_tokens']} input, "
+                f"{overhead['output_tokens']} output; estimated cost {f'${cost:.4f}' if cost is not None else 'n/a'}"
+            )
+    if fake_server is not None:
+        fake = fake_server.summary()
+        print(
+            f"Fake backend: {fake['requests']} Claude requests, {fake['rate_limited']} rejected with 429 "
+            f"(seed {fake_seed})"
+        )
+    if claude_judge is not None:
+        judged = claude_judge.summary()
+        print(
+            f"Claude judge: {judged['requests']} API requests, "
+            f"{judged['graded']} verdicts graded, {judged['cache_hits']} served from cache"
+        )
+    if stage_pipeline is not None:
+        for name, stats in stage_pipeline.stats().items():
+            print(
+                f"Stage {name}: {stats['completed']} done on {stats['workers']} workers, "
+                f"{stats['utilization']:.0%} utilized, max queue depth {stats['max_queue_depth']}"
+            )
+    if tracer is not None:
+        trace_dir = Path(trace)
+        tracer.write_chrome_trace(trace_dir / "trace.json")
+        tracer.write_otlp(trace_dir / "trace.otlp.json")
+        print(f"Trace: {len(tracer.spans)} spans written to {trace_dir / 'trace.json'} and {trace_dir / 'trace.otlp.json'}")
+    if memory_tracker is not None:
+        _print_memory(memory_tracker.summary())
+    if run_profiler is not None:
+        _print_profile(run_profiler, profile, Path(profile_dir), profile_top)
+    for name, stats in tool_client.summary().items():
+        print(
+            f"Tool {name}: {stats['calls']} calls, {stats['cache_hits']} cached, "
+            f"{stats['errors']} failed ({stats['timeouts']} timed out); "
+            f"{_format_ms_summary(stats['latency'])}"
+        )
+        buckets = ", ".join(f"{label} {count}" for label, count in stats["histogram"].items())
+        print(f"  latency histogram: {buckets}")
+    print(f"Report written to: {report}")
+
+
+@app.command()
+def merge(
+    shard_files: list[str] = typer.Argument(..., help="Shard result files written by --shard"),
+    report: str = typer.Option("out/report.md", help="Output report path"),
+    durations: str = typer.Option(
+        "out/scenario_durations.json",
+        help="Per-scenario duration history to update with the merged run",
+    ),
+    prices: str = typer.Option(
+        None,
+        help="YAML file of per-model token prices (USD per million tokens) used for cost estimates",
+    ),
+):
+    """Merge shard results into one report with the totals of a single run."""
+    try:
+        results = merge_shard_results(Path(shard_file) for shard_file in shard_files)
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc), param_hint="SHARD_FILES") from None
 
+    price_table = _load_prices(prices)
+    write_markdown_report(results, Path(report), prices=price_table)
+    save_durations(Path(durations), results)
+    _print_totals(results)
+    _print_usage(results, price_table)
+    print(f"Report written to: {report}")
+
+
+def _print_totals(results) -> None:
     total_scenarios = len(results)
     passed_scenarios = sum(1 for r in results if r["scenario_pass"])
     intent_correct = sum(1 for r in results if r["intent_detected"])
 
     print(f"{passed_scenarios}/{total_scenarios} scenarios passed")
     print(f"Intent detection: {intent_correct}/{total_scenarios} correct")
-    print(f"Report written to: {report}")
+    if any(r.get("judge") == "tiered" for r in results):
+        judged = sum(r.get("judged_turns", 0) for r in results)
+        escalated = sum(r.get("judge_escalations", 0) for r in results)
+        rate = escalated / judged if judged else 0.0
+        print(f"Judge escalation rate: {escalated}/{judged} turns escalated to Claude ({rate:.1%})")
+    tokens_saved = sum(r.get("input_tokens_saved", 0) for r in results)
+    if tokens_saved:
+        print(f"Input tokens saved by history compaction: ~{tokens_saved}")
+
+
+def _load_prices(path: str | None) -> PriceTable:
+    if path is None:
+        return PriceTable()
+    try:
+        return PriceTable.load_yaml(Path(path))
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc), param_hint="--prices") from None
+
+
+def _print_usage(results, prices: PriceTable) -> None:
+    usage = {}
+    reused = 0
+    for r in results:
+        if is_reused(r):
+            reused += 1
+            continue
+        add_usage(usage, r.get("usage") or {})
+    if reused:
+        print(f"Tokens of {reused} reused results are not counted (spent by the run that produced them)")
+    if not usage:
+        return
+    totals = total_usage(usage)
+    cost = prices.total_cost(usage)
+    print(
+        f"Tokens: {totals['input_tokens']} input ({totals['cache_creation_input_tokens']} cache write, "
+        f"{totals['cache_read_input_tokens']} cache read), {totals['output_tokens']} output "
+        f"over {totals['calls']} calls; estimated cost {f'${cost:.4f}' if cost is not None else 'n/a'}"
+    )
+    for stage, stage_usage in usage.items():
+        stage_cost = prices.cost(stage_usage)
+        print(
+            f"  {stage} ({stage_usage['model']}): {stage_usage['calls']} calls, "
+            f"{stage_usage['input_tokens']} input, {stage_usage['output_tokens']} output, "
+            f"{f'${stage_cost:.4f}' if stage_cost is not None else 'n/a'}"
+        )
+
+
+def _print_memory(summary) -> None:
+    print(f"Memory: peak RSS {format_bytes(summary['peak_rss_bytes'])}")
+    for stage, rss in summary["stage_rss_peak_bytes"].items():
+        print(f"  stage {stage}: peak RSS {format_bytes(rss)}")
+    if summary["top_allocations"]:
+        print("Top allocation sites (growth over the run):")
+        for site in summary["top_allocations"]:
+            print(f"  {format_bytes(site['size_bytes']):>10} in {site['count']:>7} blocks  {site['site']}")
+
+
+def _print_profile(run_profiler: Profiler, targets: str, out_dir: Path, count: int) -> None:
+    stats_path, collapsed_path = run_profiler.write(out_dir)
+    print(f"Profile ({run_profiler.mode}, {targets}) written to: {stats_path} and {collapsed_path}")
+    print(f"Top {count} functions by self time:")
+    for label, calls, own, cumulative in run_profiler.top(count):
+        print(f"  {own:9.3f}s self {cumulative:9.3f}s total {calls:>9} calls  {label}")
+
+
+def _format_ms_summary(summary) -> str:
+    return ", ".join(
+        f"{name} {value * 1000:.3f}ms" if value is not None else f"{name} n/a"
+        for name, value in summary.items()
+    )
 
 
 if __name__ == "__main__":
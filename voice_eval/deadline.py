@@ -0,0 +1,58 @@
+# Per-turn latency budget for simulating real-time phone-line constraints
+import time
+from typing import Any, Callable, Dict, List
+
+
+# Rough cost of each stage's full path in seconds. A stage whose cost exceeds
+# the remaining budget falls back to its cheaper path.
+DEFAULT_STAGE_COSTS = {
+    "asr": 1.0,
+    "stage_1": 0.8,
+    "stage_2": 1.2,
+    "judge": 1.0,
+}
+_MIN_REQUEST_TIMEOUT = 0.5
+
+
+class TurnDeadline:
+    """Latency budget for one turn, shared by every stage of that turn.
+
+    Stages ask ``allows(stage)`` before taking their full path and call
+    ``degrade(stage)`` when they fall back, so the turn record can show which
+    stages were degraded.
+    """
+
+    def __init__(
+        self,
+        budget: float,
+        stage_costs: Dict[str, float] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.budget = budget
+        self.stage_costs = dict(DEFAULT_STAGE_COSTS, **(stage_costs or {}))
+        self.degraded: List[str] = []
+        self._clock = clock
+        self._expires_at = clock() + budget
+
+    def remaining(self) -> float:
+        return max(0.0, self._expires_at - self._clock())
+
+    def allows(self, stage: str) -> bool:
+        """Return True if the stage's full path fits in the remaining budget."""
+        remaining = self.remaining()
+        return remaining > 0 and remaining >= self.stage_costs.get(stage, 0.0)
+
+    def degrade(self, stage: str) -> None:
+        self.degraded.append(stage)
+
+    def request_timeout(self) -> float:
+        """Timeout for a network call made on the full path."""
+        return max(self.remaining(), _MIN_REQUEST_TIMEOUT)
+
+    def bind(self, client: Any) -> Any:
+        """A copy of an Anthropic ``client`` whose requests fit the remaining budget.
+
+        Retries are turned off: a request that times out is not sent again,
+        so the stage can fall back instead of waiting out the SDK's retries.
+        """
+        return client.with_options(max_retries=0, timeout=self.request_timeout())
@@ -1,8 +1,20 @@
+import hashlib
 import json
-from typing import Any, Dict
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 from anthropic import Anthropic
 
+from .deadline import TurnDeadline
+from .tracing import span
+from .usage import record_usage
+
+
+# Bump whenever the grading prompts or schemas change so cached verdicts
+# from older prompts are not reused.
+JUDGE_PROMPT_VERSION = "1"
+_JUDGE_MODEL = "claude-haiku-4-5"
 
 _CLAUDE_EVALUATION_SCHEMA = {
     "type": "object",
@@ -13,33 +25,226 @@ _CLAUDE_EVALUATION_SCHEMA = {
     "required": ["pass", "reason"],
     "additionalProperties": False,
 }
+_CLAUDE_BATCH_EVALUATION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "verdicts": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "id": {"type": "integer"},
+                    "pass": {"type": "boolean"},
+                    "reason": {"type": "string"},
+                },
+                "required": ["id", "pass", "reason"],
+                "additionalProperties": False,
+            },
+        },
+    },
+    "required": ["verdicts"],
+    "additionalProperties": False,
+}
+
+
+class ClaudeJudge:
+    """Claude judge with one shared client and a persistent verdict cache.
+
+    Verdicts are keyed by a hash of the bot text, the expectation, the judge
+    model and ``JUDGE_PROMPT_VERSION``. With a ``cache_path`` they are
+    appended to a JSONL file and reloaded by later runs. ``judge_batch``
+    grades up to ``batch_size`` uncached turns per structured-output call.
+    The client is created on first use and is safe to share across threads.
+    """
+
+    def __init__(
+        self,
+        client: Anthropic | None = None,
+        cache_path: str | Path | None = None,
+        batch_size: int = 20,
+        model: str = _JUDGE_MODEL,
+    ) -> None:
+        self.cache_path = Path(cache_path) if cache_path is not None else None
+        self.batch_size = batch_size
+        self.model = model
+        self.requests = 0
+        self.graded = 0
+        self.cache_hits = 0
+        self._client = client
+        self._lock = threading.Lock()
+        self._verdicts: Dict[str, bool] = {}
+        if self.cache_path is not None and self.cache_path.exists():
+            self._load_cache()
+
+    @property
+    def client(self) -> Anthropic:
+        with self._lock:
+            if self._client is None:
+                self._client = Anthropic()
+            return self._client
+
+    def judge(
+        self,
+        bot_text: str,
+        expect: Dict[str, Any],
+        deadline: TurnDeadline | None = None,
+    ) -> bool:
+        """Grade one bot reply against its expectation.
+
+        With a ``deadline`` the request is sent once and times out when the
+        turn budget runs out.
+        """
+        if not expect:
+            return True
+
+        key = self._key(bot_text, expect)
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+
+        response = self._create(
+            _create_claude_evaluation_prompt(bot_text, expect),
+            _CLAUDE_EVALUATION_SCHEMA,
+            max_tokens=256,
+            deadline=deadline,
+        )
+        verdict = bool(json.loads(response.content[0].text)["pass"])
+        self._store({key: verdict})
+        return verdict
+
+    def judge_batch(self, items: Sequence[Tuple[str, Dict[str, Any]]]) -> List[bool]:
+        """Grade many ``(bot_text, expect)`` pairs, batching the uncached ones."""
+        keys: List[Optional[str]] = [
+            self._key(bot_text, expect) if expect else None
+            for bot_text, expect in items
+        ]
+        pending: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        for key, item in zip(keys, items):
+            if key is not None and key not in pending and self._cached(key) is None:
+                pending[key] = item
+
+        pending_keys = list(pending)
+        for start in range(0, len(pending_keys), self.batch_size):
+            chunk = pending_keys[start:start + self.batch_size]
+            self._grade_chunk(chunk, [pending[key] for key in chunk])
+
+        with self._lock:
+            return [True if key is None else self._verdicts[key] for key in keys]
+
+    def summary(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "graded": self.graded,
+                "cache_hits": self.cache_hits,
+            }
+
+    def _grade_chunk(self, keys: List[str], items: List[Tuple[str, Dict[str, Any]]]) -> None:
+        if len(items) == 1:
+            self.judge(*items[0])
+            return
+
+        response = self._create(
+            _create_claude_batch_evaluation_prompt(items),
+            _CLAUDE_BATCH_EVALUATION_SCHEMA,
+            max_tokens=128 * len(items),
+        )
+        verdicts = {
+            entry["id"]: bool(entry["pass"])
+            for entry in json.loads(response.content[0].text)["verdicts"]
+        }
+        self._store({key: verdicts[i] for i, key in enumerate(keys) if i in verdicts})
+        # Grade anything the batch reply left out one by one.
+        for i, item in enumerate(items):
+            if i not in verdicts:
+                self.judge(*item)
 
+    def _create(
+        self,
+        prompt: str,
+        schema: Dict[str, Any],
+        max_tokens: int,
+        deadline: TurnDeadline | None = None,
+    ) -> Any:
+        client = deadline.bind(self.client) if deadline is not None else self.client
+        with span("messages.create", model=self.model, purpose="judge"):
+            response = client.messages.create(
+                model=self.model,
+                max_tokens=max_tokens,
+                messages=[{"role": "user", "content": prompt}],
+                output_config={
+                    "format": {
+                        "type": "json_schema",
+                        "schema": schema,
+                    }
+                },
+            )
+        record_usage("judge", self.model, response)
+        with self._lock:
+            self.requests += 1
+        return response
 
-def check_bot_expect_claude(bot_text: str, expect: Dict[str, Any]) -> bool:
-    """Use Claude structured outputs to semantically evaluate a bot response."""
+    def _key(self, bot_text: str, expect: Dict[str, Any]) -> str:
+        payload = json.dumps(
+            [JUDGE_PROMPT_VERSION, self.model, bot_text, expect],
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _cached(self, key: str) -> bool | None:
+        with self._lock:
+            verdict = self._verdicts.get(key)
+            if verdict is not None:
+                self.cache_hits += 1
+            return verdict
+
+    def _store(self, verdicts: Dict[str, bool]) -> None:
+        with self._lock:
+            self._verdicts.update(verdicts)
+            self.graded += len(verdicts)
+            if self.cache_path is None or not verdicts:
+                return
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with self.cache_path.open("a", encoding="utf-8") as f:
+                for key, verdict in verdicts.items():
+                    f.write(json.dumps({"key": key, "pass": verdict}) + "\n")
+
+    def _load_cache(self) -> None:
+        with self.cache_path.open(encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    self._verdicts[entry["key"]] = bool(entry["pass"])
+                except (ValueError, KeyError, TypeError):
+                    # A run killed mid-write can leave a truncated last line.
+                    continue
+
+
+def check_bot_expect_claude(
+    bot_text: str,
+    expect: Dict[str, Any],
+    judge: ClaudeJudge | None = None,
+    deadline: TurnDeadline | None = None,
+) -> bool:
+    """Use Claude structured outputs to semantically evaluate a bot response.
+
+    Pass a shared ``judge`` to reuse its client and verdict cache, and a
+    ``deadline`` to bound the request by the turn's remaining budget.
+    """
     if not expect:
         return True
 
-    client = Anthropic()
-    response = client.messages.create(
-        model="claude-haiku-4-5",
-        max_tokens=256,
-        messages=[
-            {
-                "role": "user",
-                "content": _create_claude_evaluation_prompt(bot_text, expect),
-            }
-        ],
-        output_config={
-            "format": {
-                "type": "json_schema",
-                "schema": _CLAUDE_EVALUATION_SCHEMA,
-            }
-        },
-    )
+    if judge is None:
+        judge = ClaudeJudge(client=Anthropic())
+    return judge.judge(bot_text, expect, deadline=deadline)
+
 
-    result = json.loads(response.content[0].text)
-    return bool(result["pass"])
+_GRADING_RULES = """Judge whether the reply satisfies the expectation using semantic understanding, not just exact substring matching.
+- Treat paraphrases, equivalent wording, and clearly implied fulfillment as passing.
+- If the expectation uses "contains", decide whether the bot meaningfully covers that phrase or idea.
+- If the expectation uses "contains_any", pass when the reply meaningfully covers at least one listed phrase or idea.
+- If the reply misses the requested idea, fail."""
 
 
 def _create_claude_evaluation_prompt(bot_text: str, expect: Dict[str, Any]) -> str:
@@ -51,10 +256,23 @@ Bot reply:
 Expectation:
 {json.dumps(expect, indent=2)}
 
-Judge whether the reply satisfies the expectation using semantic understanding, not just exact substring matching.
-- Treat paraphrases, equivalent wording, and clearly implied fulfillment as passing.
-- If the expectation uses "contains", decide whether the bot meaningfully covers that phrase or idea.
-- If the expectation uses "contains_any", pass when the reply meaningfully covers at least one listed phrase or idea.
-- If the reply misses the requested idea, fail.
+{_GRADING_RULES}
+- Return only the JSON object defined by the schema.
+"""
+
+
+def _create_claude_batch_evaluation_prompt(items: List[Tuple[str, Dict[str, Any]]]) -> str:
+    cases = "\n\n".join(
+        f"Case {i}:\nBot reply:\n{bot_text}\n\nExpectation:\n{json.dumps(expect, indent=2)}"
+        for i, (bot_text, expect) in enumerate(items)
+    )
+    return f"""You are grading customer-support bot replies for a voice evaluation.
+Grade each case independently.
+
+{cases}
+
+For each case:
+{_GRADING_RULES}
+- Return one verdict per case, using the case number as its id.
 - Return only the JSON object defined by the schema.
 """
@@ -1,27 +1,96 @@
 # Rule-based evaluator (more reliable than LLM)
-from typing import Dict, Any
+from dataclasses import dataclass
+from typing import Dict, Any, Hashable, Iterable, List, Optional, Tuple
 
-def check_bot_expect_enhanced(bot_text: str, expect: Dict[str, Any]) -> bool:
-    """Enhanced rule-based evaluation with better matching."""
+
+@dataclass(frozen=True)
+class ExpectationMatcher:
+    """A ``bot_expect`` mapping compiled for repeated matching.
+
+    ``phrases`` are lowercased, de-duplicated, and pruned of phrases that
+    contain another phrase (which can never change an any-match). With no
+    phrases the matcher always returns ``default``.
+    """
+    phrases: Tuple[str, ...] = ()
+    default: bool = False
+
+    def matches(self, bot_text: str) -> bool:
+        if not self.phrases:
+            return self.default
+        bot_lower = bot_text.lower()
+        for phrase in self.phrases:
+            if phrase in bot_lower:
+                return True
+        return False
+
+
+_ALWAYS = ExpectationMatcher(default=True)
+_NEVER = ExpectationMatcher(default=False)
+_MATCHERS: Dict[Hashable, ExpectationMatcher] = {}
+
+
+def compile_expectation(expect: Optional[Dict[str, Any]]) -> ExpectationMatcher:
+    """Compile a ``bot_expect`` mapping; equal expectations share one matcher."""
     if not expect:
-        return True
-    
-    bot_lower = bot_text.lower()
-    
-    # Support keys
+        return _ALWAYS
+
     if "contains" in expect:
         # Single substring (case-insensitive)
-        return expect["contains"].lower() in bot_lower
-    
+        phrases = [expect["contains"]]
     elif "contains_any" in expect:
         # List of substrings; pass if any present (case-insensitive)
         if not isinstance(expect["contains_any"], list):
-            return False
-        
-        for substring in expect["contains_any"]:
-            if substring.lower() in bot_lower:
-                return True
-        return False
-    
-    # If unknown key present, return False
-    return False
+            return _NEVER
+        phrases = expect["contains_any"]
+    else:
+        # If unknown key present, never pass
+        return _NEVER
+
+    if not all(isinstance(phrase, str) for phrase in phrases):
+        raise ValueError(f"Expectation phrases must be strings: {expect!r}")
+
+    key = tuple(phrases)
+    matcher = _MATCHERS.get(key)
+    if matcher is None:
+        matcher = ExpectationMatcher(phrases=_prune_phrases(phrases))
+        _MATCHERS[key] = matcher
+    return matcher
+
+
+def _prune_phrases(phrases: Iterable[str]) -> Tuple[str, ...]:
+    kept: List[str] = []
+    for phrase in sorted(set(p.lower() for p in phrases), key=len):
+        if not any(shorter in phrase for shorter in kept):
+            kept.append(phrase)
+    # Keep the author's order so the most likely phrase is tried first.
+    order = {p.lower(): i for i, p in reversed(list(enumerate(phrases)))}
+    return tuple(sorted(kept, key=order.__getitem__))
+
+
+def check_bot_expect_enhanced(
+    bot_text: str,
+    expect: Dict[str, Any],
+    matcher: ExpectationMatcher | None = None,
+) -> bool:
+    """Enhanced rule-based evaluation with better matching.
+
+    Pass the step's precompiled ``matcher`` to skip compiling ``expect``.
+    """
+    if matcher is None:
+        matcher = compile_expectation(expect)
+    return matcher.matches(bot_text)
+
+
+def judge_batch(pairs: Iterable[Tuple[str, ExpectationMatcher]]) -> List[bool]:
+    """Judge many ``(bot_text, matcher)`` pairs, e.g. when re-judging archived runs.
+
+    Repeated pairs, common with template responses, are judged once.
+    """
+    verdicts: Dict[Tuple[str, ExpectationMatcher], bool] = {}
+    results = []
+    for pair in pairs:
+        verdict = verdicts.get(pair)
+        if verdict is None:
+            verdict = verdicts[pair] = pair[1].matches(pair[0])
+        results.append(verdict)
+    return results
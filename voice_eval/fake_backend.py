@@ -0,0 +1,441 @@
+# Offline deterministic stand-ins for TTS, ASR and the Claude Messages API
+import hashlib
+import json
+import math
+import random
+import re
+import struct
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from .audio.override import install_fake_audio
+from .bot_tools import generate_response_tool
+from .evaluator_rules import check_bot_expect_enhanced
+from .policies import POLICIES, PolicyRegistry
+
+
+LATENCY_KINDS = ("const", "uniform", "normal", "lognormal", "exp")
+
+_SAMPLE_RATE = 16_000
+# Ten milliseconds of silence per scripted word keeps the files tiny.
+_FRAMES_PER_WORD = _SAMPLE_RATE // 100
+_WORD_RE = re.compile(r"[a-z]+")
+_EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+_NUMBER_RE = re.compile(r"\d{4,}")
+_SLOTS_PROMPT_MARKER = "extracted information from the conversation:\n"
+_JUDGE_CASE_RE = re.compile(r"Bot reply:\n(.*?)\n\nExpectation:\n(\{.*?\n\})", re.DOTALL)
+_STREAM_CHUNK_CHARS = 16
+# Words too common in intent names and wording guidance to tell intents apart.
+_STOPWORDS = {"inclu", "eithe", "your", "with", "that", "have", "been"}
+
+
+class Latency:
+    """A latency distribution in seconds parsed from a command-line spec.
+
+    Specs are ``SECONDS`` (constant), ``uniform:LOW:HIGH``,
+    ``normal:MEAN:STDDEV``, ``lognormal:MEDIAN:SIGMA`` or ``exp:MEAN``.
+    Samples are never negative.
+    """
+
+    def __init__(self, kind: str = "const", *params: float) -> None:
+        if kind not in LATENCY_KINDS:
+            raise ValueError(f"Unknown latency distribution {kind!r}; use one of {', '.join(LATENCY_KINDS)}")
+        expected = 1 if kind in ("const", "exp") else 2
+        if len(params) != expected:
+            raise ValueError(f"Latency distribution {kind!r} takes {expected} parameter(s)")
+        if any(param < 0 for param in params):
+            raise ValueError("Latency parameters must not be negative")
+        self.kind = kind
+        self.params = params
+
+    @classmethod
+    def parse(cls, spec: str) -> "Latency":
+        kind, *params = spec.strip().split(":")
+        try:
+            if not params:
+                return cls("const", float(kind))
+            return cls(kind, *(float(param) for param in params))
+        except ValueError as exc:
+            raise ValueError(f"Invalid latency {spec!r}: {exc}") from None
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "const":
+            seconds = self.params[0]
+        elif self.kind == "uniform":
+            seconds = rng.uniform(*self.params)
+        elif self.kind == "normal":
+            seconds = rng.gauss(*self.params)
+        elif self.kind == "lognormal":
+            median, sigma = self.params
+            seconds = rng.lognormvariate(math.log(median), sigma) if median > 0 else 0.0
+        else:
+            seconds = rng.expovariate(1 / self.params[0]) if self.params[0] > 0 else 0.0
+        return max(0.0, seconds)
+
+    def __repr__(self) -> str:
+        return f"Latency({self.kind}:{':'.join(f'{param:g}' for param in self.params)})"
+
+
+class FakeAudio:
+    """Tiny silent WAV "speech" and ASR that reads the scripted text back.
+
+    ``synthesize`` writes 16 kHz mono PCM silence, ten milliseconds per
+    word, and stores the text in the file's RIFF ``INFO`` chunk so ASR in
+    any thread or process can recover it. ``transcribe`` returns that text
+    lowercased the way Whisper output is; ``noise`` is the chance each word
+    is dropped, repeated or misspelled, and ``latency`` is slept per call.
+    Noise and latency are seeded by ``seed`` and the text, so a rerun hears
+    exactly the same thing. Recordings without the chunk transcribe empty.
+    """
+
+    def __init__(self, noise: float = 0.0, latency: Latency | None = None, seed: int = 0) -> None:
+        if not 0.0 <= noise <= 1.0:
+            raise ValueError("ASR noise must be between 0 and 1")
+        self.noise = noise
+        self.latency = latency or Latency("const", 0.0)
+        self.seed = seed
+
+    def install(self) -> Any:
+        """Make TTS and ASR use this stand-in until the context exits."""
+        return install_fake_audio(self)
+
+    def synthesize(self, text: str, out_wav: str) -> None:
+        Path(out_wav).parent.mkdir(parents=True, exist_ok=True)
+        Path(out_wav).write_bytes(_wav_bytes(text))
+
+    def transcribe(self, wav_path: str) -> str:
+        text = _read_wav_text(Path(wav_path)) or ""
+        rng = random.Random(f"{self.seed}:asr:{text}")
+        time.sleep(self.latency.sample(rng))
+        words = []
+        for word in text.lower().split():
+            if rng.random() >= self.noise:
+                words.append(word)
+                continue
+            error = rng.randrange(3)
+            if error == 1:
+                words.extend((word, word))
+            elif error == 2 and len(word) > 1:
+                i = rng.randrange(len(word) - 1)
+                words.append(word[:i] + word[i + 1] + word[i] + word[i + 2:])
+        return " ".join(words)
+
+
+def _wav_bytes(text: str) -> bytes:
+    pcm = bytes(2 * _FRAMES_PER_WORD * max(1, len(text.split())))
+    comment = text.encode("utf-8") + b"\0"
+    if len(comment) % 2:
+        comment += b"\0"
+    info = b"INFO" + b"ICMT" + struct.pack("<I", len(comment)) + comment
+    chunks = (
+        b"fmt " + struct.pack("<IHHIIHH", 16, 1, 1, _SAMPLE_RATE, 2 * _SAMPLE_RATE, 2, 16)
+        + b"LIST" + struct.pack("<I", len(info)) + info
+        + b"data" + struct.pack("<I", len(pcm)) + pcm
+    )
+    return b"RIFF" + struct.pack("<I", 4 + len(chunks)) + b"WAVE" + chunks
+
+
+def _read_wav_text(path: Path) -> str | None:
+    data = path.read_bytes()
+    if data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        return None
+    pos = 12
+    while pos + 8 <= len(data):
+        chunk_id = data[pos:pos + 4]
+        (size,) = struct.unpack("<I", data[pos + 4:pos + 8])
+        body = data[pos + 8:pos + 8 + size]
+        if chunk_id == b"LIST" and body[:4] == b"INFO":
+            sub = 4
+            while sub + 8 <= len(body):
+                (sub_size,) = struct.unpack("<I", body[sub + 4:sub + 8])
+                if body[sub:sub + 4] == b"ICMT":
+                    return body[sub + 8:sub + 8 + sub_size].rstrip(b"\0").decode("utf-8")
+                sub += 8 + sub_size + sub_size % 2
+        pos += 8 + size + size % 2
+    return None
+
+
+class FakeClaudeServer:
+    """Local HTTP server speaking enough of the Messages API for a run.
+
+    Point an ``Anthropic`` client at ``url`` (``client()`` does). Requests
+    are answered from the structured-output schema they carry:
+
+    - intent detection picks the allowed intent whose name and wording
+      guidance share the most (rarer counts more) words with what the
+      customer said;
+    - a stage-2 response applies the intent's policy to the slots in the
+      system prompt (or an email or 4+ digit number in the latest message
+      for a missing required slot) and returns the template utterance for
+      the action;
+    - judge requests grade each case with the rule-based matcher.
+
+    Each request sleeps a ``latency`` sample and is rejected with a 429
+    (``retry-after-ms``) with probability ``rate_limit``. Draws are seeded
+    by ``seed``, the request body and how often that body was seen, so a
+    rerun sees the same latencies and rate limits regardless of thread
+    interleaving. Streamed requests get the same answer as server-sent
+    events. Token usage is estimated at four characters per token.
+    """
+
+    def __init__(
+        self,
+        latency: Latency | None = None,
+        rate_limit: float = 0.0,
+        retry_after: float = 0.02,
+        seed: int = 0,
+        policies: PolicyRegistry = POLICIES,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        if not 0.0 <= rate_limit <= 1.0:
+            raise ValueError("Rate-limit probability must be between 0 and 1")
+        self.latency = latency or Latency("const", 0.0)
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.seed = seed
+        self.policies = policies
+        self.requests = 0
+        self.rate_limited = 0
+        self._lock = threading.Lock()
+        self._attempts: Dict[str, int] = {}
+        self._server = _QuietServer((host, port), _handler_for(self))
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def client(self, **kwargs: Any) -> Any:
+        from anthropic import Anthropic
+
+        return Anthropic(base_url=self.url, api_key="fake-key", **kwargs)
+
+    def __enter__(self) -> "FakeClaudeServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="voice-eval-fake-claude", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def summary(self) -> Dict[str, int]:
+        with self._lock:
+            return {"requests": self.requests, "rate_limited": self.rate_limited}
+
+    def handle(self, body: bytes) -> Tuple[int, Dict[str, str], Dict[str, Any] | None, float]:
+        """Status, headers, message (None when rate limited) and delay for a request."""
+        digest = hashlib.sha256(body).hexdigest()
+        with self._lock:
+            attempt = self._attempts.get(digest, 0)
+            self._attempts[digest] = attempt + 1
+            self.requests += 1
+        rng = random.Random(f"{self.seed}:llm:{digest}:{attempt}")
+        delay = self.latency.sample(rng)
+        if rng.random() < self.rate_limit:
+            with self._lock:
+                self.rate_limited += 1
+            return 429, {"retry-after-ms": str(round(self.retry_after * 1000))}, None, delay
+        return 200, {}, self.respond(json.loads(body)), delay
+
+    def respond(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """The Messages API response for a request body."""
+        schema = ((request.get("output_config") or {}).get("format") or {}).get("schema") or {}
+        properties = schema.get("properties", {})
+        system = _text(request.get("system", ""))
+        user_text = "\n".join(
+            _text(message["content"]) for message in request.get("messages", []) if message.get("role") == "user"
+        )
+        messages = request.get("messages", [])
+        latest = _text(messages[-1]["content"]) if messages else ""
+        if "detected_intent" in properties:
+            payload: Any = {"detected_intent": self._detect_intent(user_text, properties["detected_intent"].get("enum"))}
+        elif "action" in properties:
+            payload = self._route(properties["action"].get("enum", []), system, latest)
+        elif "verdicts" in properties:
+            payload = {"verdicts": [
+                _verdict(case, bot_text, expect) for case, (bot_text, expect) in enumerate(_judge_cases(user_text))
+            ]}
+        elif "pass" in properties:
+            cases = _judge_cases(user_text)
+            payload = _verdict(0, *cases[0]) if cases else {"pass": True, "reason": "Nothing to grade."}
+            payload.pop("id")
+        else:
+            payload = None
+        text = json.dumps(payload) if payload is not None else "I can help with that."
+        prompt = system + "".join(_text(message["content"]) for message in request.get("messages", []))
+        with self._lock:
+            message_id = f"msg_fake_{self.requests:06d}"
+        return {
+            "id": message_id,
+            "type": "message",
+            "role": "assistant",
+            "model": request.get("model", ""),
+            "content": [{"type": "text", "text": text}],
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+            "usage": {
+                "input_tokens": _estimate_tokens(prompt),
+                "output_tokens": _estimate_tokens(text),
+                "cache_creation_input_tokens": 0,
+                "cache_read_input_tokens": 0,
+            },
+        }
+
+    def _detect_intent(self, user_text: str, allowed: List[str] | None) -> str:
+        intents = allowed or list(self.policies.intents)
+        vocabularies = {intent: _intent_words(self.policies.get(intent), intent) for intent in intents}
+        spread: Dict[str, int] = {}
+        for words in vocabularies.values():
+            for word in words:
+                spread[word] = spread.get(word, 0) + 1
+        said = set(_words(user_text))
+        scores = {
+            intent: sum(1 / spread[word] for word in words & said)
+            for intent, words in vocabularies.items()
+        }
+        # Ties go to the first allowed intent.
+        return max(intents, key=lambda intent: scores[intent])
+
+    def _route(self, allowed_actions: List[str], system: str, latest: str) -> Dict[str, str]:
+        policy = next((p for p in self.policies if p.allowed_actions == allowed_actions), None)
+        if policy is None:
+            return generate_response_tool("ASK_CLARIFY", {}).data
+        slots = _prompt_slots(system)
+        if policy.required_slot not in slots:
+            # Stand in for the model reading a value the slot rules missed.
+            match = (_EMAIL_RE if policy.required_slot == "email" else _NUMBER_RE).search(latest)
+            if match is not None:
+                slots[policy.required_slot] = match.group()
+        return generate_response_tool(policy.decide(slots), slots).data
+
+
+class _QuietServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request: Any, client_address: Any) -> None:
+        # Clients dropping keep-alive connections (retries, shutdown) are routine.
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+def _handler_for(server: FakeClaudeServer) -> type:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self) -> None:
+            body = self.rfile.read(int(self.headers.get("content-length", 0)))
+            if self.path.split("?")[0] != "/v1/messages":
+                self._send(404, {}, _error("not_found_error", f"No fake endpoint {self.path}"), "application/json")
+                return
+            status, headers, message, delay = server.handle(body)
+            time.sleep(delay)
+            if message is None:
+                self._send(status, headers, _error("rate_limit_error", "Fake rate limit"), "application/json")
+            elif json.loads(body).get("stream"):
+                self._send(status, headers, _sse(message), "text/event-stream")
+            else:
+                self._send(status, headers, json.dumps(message).encode("utf-8"), "application/json")
+
+        def _send(self, status: int, headers: Dict[str, str], payload: bytes, content_type: str) -> None:
+            self.send_response(status)
+            self.send_header("content-type", content_type)
+            self.send_header("content-length", str(len(payload)))
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    return Handler
+
+
+def _error(kind: str, message: str) -> bytes:
+    return json.dumps({"type": "error", "error": {"type": kind, "message": message}}).encode("utf-8")
+
+
+def _sse(message: Dict[str, Any]) -> bytes:
+    text = message["content"][0]["text"]
+    usage = message["usage"]
+    events = [
+        ("message_start", {"type": "message_start", "message": {
+            **message, "content": [], "stop_reason": None, "usage": {**usage, "output_tokens": 0},
+        }}),
+        ("content_block_start", {"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}}),
+    ]
+    for start in range(0, len(text), _STREAM_CHUNK_CHARS):
+        events.append(("content_block_delta", {
+            "type": "content_block_delta",
+            "index": 0,
+            "delta": {"type": "text_delta", "text": text[start:start + _STREAM_CHUNK_CHARS]},
+        }))
+    events += [
+        ("content_block_stop", {"type": "content_block_stop", "index": 0}),
+        ("message_delta", {
+            "type": "message_delta",
+            "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+            "usage": {"output_tokens": usage["output_tokens"]},
+        }),
+        ("message_stop", {"type": "message_stop"}),
+    ]
+    return "".join(f"event: {name}\ndata: {json.dumps(data)}\n\n" for name, data in events).encode("utf-8")
+
+
+def _text(content: Any) -> str:
+    if isinstance(content, str):
+        return content
+    return "".join(block.get("text", "") for block in content if isinstance(block, dict))
+
+
+def _words(text: str) -> List[str]:
+    # Five-letter prefixes fold "cancel"/"cancelled", "refund"/"refunds".
+    return [word[:5] for word in _WORD_RE.findall(text.lower()) if len(word) > 3]
+
+
+def _intent_words(policy: Any, intent: str) -> set:
+    text = intent if policy is None else f"{intent} {policy.label} {policy.final_response_guidance}"
+    return set(_words(text)) - _STOPWORDS
+
+
+def _prompt_slots(system: str) -> Dict[str, Any]:
+    start = system.find(_SLOTS_PROMPT_MARKER)
+    if start < 0 or system[start + len(_SLOTS_PROMPT_MARKER):].startswith("No information"):
+        return {}
+    try:
+        slots, _ = json.JSONDecoder().raw_decode(system, start + len(_SLOTS_PROMPT_MARKER))
+    except ValueError:
+        return {}
+    return slots if isinstance(slots, dict) else {}
+
+
+def _judge_cases(prompt: str) -> List[Tuple[str, Dict[str, Any]]]:
+    cases = []
+    for match in _JUDGE_CASE_RE.finditer(prompt):
+        try:
+            cases.append((match.group(1), json.loads(match.group(2))))
+        except ValueError:
+            cases.append((match.group(1), {}))
+    return cases
+
+
+def _verdict(case: int, bot_text: str, expect: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        passed = check_bot_expect_enhanced(bot_text, expect) if expect else True
+    except ValueError:
+        passed = False
+    reason = "The reply covers the expectation." if passed else "The reply misses the expected idea."
+    return {"id": case, "pass": passed, "reason": reason}
+
+
+def _estimate_tokens(text: str) -> int:
+    return (len(text) + 3) // 4
@@ -0,0 +1,284 @@
+# Request hedging for Claude calls made by the bot brain
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, Set
+
+from .metrics import latency_summary, percentile
+from .usage import TurnUsage, response_usage
+
+
+class HedgedClient:
+    """Anthropic client wrapper that hedges slow ``messages.create`` and ``messages.stream`` calls.
+
+    Once enough latencies have been observed, a call that is still running
+    after the configured percentile of past latencies gets a duplicate request
+    and whichever response arrives first wins. Extra requests are capped at
+    ``max_extra_ratio`` of all calls. Calls are bucketed by ``max_tokens`` so
+    stage-1 and stage-2 keep separate latency histories. Streams are hedged on
+    the time until the stream opens (response headers received) in their own
+    buckets; the losing stream is closed as soon as it opens. The token usage
+    of losing responses (for a stream, its ``message_start`` usage) is kept
+    as ``overhead`` in the summary, since no turn records it.
+
+    Once hedging is possible, each primary request runs on its own thread so
+    it never queues behind other calls; only duplicates share the pool of
+    ``max_workers`` threads. Latency histories and the before/after summary
+    keep the most recent ``history_size`` and ``summary_size`` calls, so
+    memory stays flat on long runs.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        percentile: float = 95.0,
+        max_extra_ratio: float = 0.1,
+        min_samples: int = 20,
+        history_size: int = 500,
+        max_workers: int = 32,
+        summary_size: int = 10_000,
+    ) -> None:
+        self.messages = _HedgedMessages(self, client.messages)
+        self.percentile = percentile
+        self.max_extra_ratio = max_extra_ratio
+        self.min_samples = min_samples
+        self._client = client
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._lock = threading.Lock()
+        self._history: Dict[Any, Deque[float]] = defaultdict(lambda: deque(maxlen=history_size))
+        self._calls = 0
+        self._hedges = 0
+        self._hedge_wins = 0
+        self._unhedged_latencies: Deque[float] = deque(maxlen=summary_size)
+        self._effective_latencies: Deque[float] = deque(maxlen=summary_size)
+        self._primaries: Set[Future] = set()
+        self._overhead = TurnUsage()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._client, name)
+
+    def with_options(self, **options: Any) -> "_HedgedView":
+        """A copy of the wrapped client with ``options`` whose calls are still hedged here."""
+        return _HedgedView(self, self._client.with_options(**options))
+
+    def summary(self) -> Dict[str, Any]:
+        """Return the hedge rate and latency percentiles before and after hedging."""
+        with self._lock:
+            calls = self._calls
+            return {
+                "calls": calls,
+                "hedged": self._hedges,
+                "hedge_wins": self._hedge_wins,
+                "hedge_rate": self._hedges / calls if calls else 0.0,
+                "before": latency_summary(self._unhedged_latencies),
+                "after": latency_summary(self._effective_latencies),
+                "overhead": {stage: dict(usage) for stage, usage in self._overhead.stages.items()},
+            }
+
+    def close(self) -> None:
+        """Wait for outstanding requests so their latencies are recorded."""
+        with self._lock:
+            primaries = list(self._primaries)
+        wait(primaries)
+        self._executor.shutdown(wait=True)
+
+    def _hedge_delay(self, bucket: Any) -> float | None:
+        with self._lock:
+            history = self._history[bucket]
+            if len(history) < self.min_samples or not self._within_budget():
+                return None
+            return percentile(history, self.percentile)
+
+    def _reserve_hedge(self) -> bool:
+        with self._lock:
+            if not self._within_budget():
+                return False
+            self._hedges += 1
+            return True
+
+    def _within_budget(self) -> bool:
+        return self._hedges + 1 <= self.max_extra_ratio * self._calls
+
+    def _record(self, bucket: Any, latency: float, primary: bool) -> None:
+        with self._lock:
+            self._history[bucket].append(latency)
+            if primary:
+                self._unhedged_latencies.append(latency)
+
+    def _create(
+        self,
+        create: Any,
+        kwargs: Dict[str, Any],
+        bucket: Any = None,
+        discard: Callable[[Any], None] | None = None,
+    ) -> Any:
+        if bucket is None:
+            bucket = kwargs.get("max_tokens")
+        started = time.monotonic()
+        with self._lock:
+            self._calls += 1
+        delay = self._hedge_delay(bucket)
+
+        if delay is None:
+            response = create(**kwargs)
+            self._record(bucket, time.monotonic() - started, primary=True)
+            self._record_effective(started)
+            return response
+
+        primary = self._submit(create, kwargs, bucket, primary=True)
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            self._record_effective(started)
+            return primary.result()
+
+        if not self._reserve_hedge():
+            response = primary.result()
+            self._record_effective(started)
+            return response
+
+        hedge_future = self._submit(create, kwargs, bucket, primary=False)
+        pending = {primary, hedge_future}
+        error: BaseException | None = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    error = future.exception()
+                    continue
+                if future is hedge_future:
+                    with self._lock:
+                        self._hedge_wins += 1
+                if discard is not None:
+                    for loser in (done | pending) - {future}:
+                        loser.add_done_callback(_discard_result(discard))
+                self._record_effective(started)
+                return future.result()
+
+        self._record_effective(started)
+        raise error
+
+    def _submit(self, create: Any, kwargs: Dict[str, Any], bucket: Any, primary: bool) -> Future:
+        def run() -> Any:
+            started = time.monotonic()
+            try:
+                return create(**kwargs)
+            finally:
+                self._record(bucket, time.monotonic() - started, primary=primary)
+
+        if not primary:
+            return self._executor.submit(run)
+        # A primary must not wait for a pool thread: queueing would add the very
+        # tail latency hedging removes and skew the latency history.
+        future: Future = Future()
+        future.set_running_or_notify_cancel()
+        with self._lock:
+            self._primaries.add(future)
+        future.add_done_callback(self._primary_done)
+
+        def target() -> None:
+            try:
+                future.set_result(run())
+            except BaseException as exc:
+                future.set_exception(exc)
+
+        threading.Thread(target=target, name="voice-eval-hedge-primary", daemon=True).start()
+        return future
+
+    def _record_overhead(self, model: str, response: Any) -> None:
+        usage = response_usage(response)
+        if usage is None:
+            return
+        with self._lock:
+            self._overhead.record("hedge_overhead", model, usage)
+
+    def _primary_done(self, future: Future) -> None:
+        with self._lock:
+            self._primaries.discard(future)
+
+    def _record_effective(self, started: float) -> None:
+        with self._lock:
+            self._effective_latencies.append(time.monotonic() - started)
+
+
+class _HedgedView:
+    """``with_options`` copy of a hedged client, sharing the hedger's histories and budget."""
+
+    def __init__(self, hedger: HedgedClient, client: Any) -> None:
+        self.messages = _HedgedMessages(hedger, client.messages)
+        self._client = client
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._client, name)
+
+
+class _HedgedMessages:
+    """Proxy for ``client.messages`` that routes ``create`` and ``stream`` through the hedger."""
+
+    def __init__(self, hedger: HedgedClient, messages: Any) -> None:
+        self._hedger = hedger
+        self._messages = messages
+
+    def create(self, **kwargs: Any) -> Any:
+        model = kwargs.get("model", "")
+        return self._hedger._create(
+            self._messages.create,
+            kwargs,
+            discard=lambda response: self._hedger._record_overhead(model, response),
+        )
+
+    def stream(self, **kwargs: Any) -> "_HedgedStream":
+        return _HedgedStream(self._hedger, self._messages, kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._messages, name)
+
+
+class _HedgedStream:
+    """Context manager that opens a ``messages.stream`` through the hedger."""
+
+    def __init__(self, hedger: HedgedClient, messages: Any, kwargs: Dict[str, Any]) -> None:
+        self._hedger = hedger
+        self._messages = messages
+        self._kwargs = kwargs
+        self._stream: Any = None
+
+    def __enter__(self) -> Any:
+        self._stream = self._hedger._create(
+            self._open,
+            self._kwargs,
+            bucket=("stream", self._kwargs.get("max_tokens")),
+            discard=self._discard,
+        )
+        return self._stream
+
+    def __exit__(self, *exc_info: Any) -> None:
+        if self._stream is not None:
+            _close_stream(self._stream)
+
+    def _open(self, **kwargs: Any) -> Any:
+        return self._messages.stream(**kwargs).__enter__()
+
+    def _discard(self, stream: Any) -> None:
+        # The first event, message_start, carries the input tokens already billed.
+        try:
+            for event in stream:
+                if getattr(event, "type", None) == "message_start":
+                    self._hedger._record_overhead(self._kwargs.get("model", ""), event.message)
+                break
+        finally:
+            _close_stream(stream)
+
+
+def _discard_result(discard: Callable[[Any], None]) -> Callable[[Future], None]:
+    def callback(future: Future) -> None:
+        if future.exception() is None:
+            discard(future.result())
+
+    return callback
+
+
+def _close_stream(stream: Any) -> None:
+    close = getattr(stream, "close", None)
+    if close is not None:
+        close()
@@ -0,0 +1,90 @@
+# Per-scenario checkpoint journal for resumable runs
+import json
+import threading
+from pathlib import Path
+from typing import Any, Dict
+
+# Key of the input fingerprint stored next to each journaled result.
+_FINGERPRINT = "input_fingerprint"
+
+class RunJournal:
+    """Append-only JSONL file with one finished scenario result per line.
+
+    Results are appended and flushed as each scenario finishes, so a run
+    that dies keeps everything completed before it. ``index()`` maps each
+    journaled scenario id to the offset of its line, so resuming a large
+    run does not hold every journaled result in memory; ``read()`` loads
+    one. A later line for the same id replaces an earlier one, and a
+    truncated last line is ignored.
+
+    Results appended with a ``fingerprint`` of their inputs can be checked
+    on resume: ``index(fingerprints)`` leaves out every scenario whose
+    journaled fingerprint differs from the expected one.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._tail_checked = False
+
+    def reset(self) -> None:
+        """Start an empty journal, discarding results of earlier runs."""
+        with self._lock:
+            self.path.unlink(missing_ok=True)
+            self._tail_checked = True
+
+    def index(self, fingerprints: Dict[str, str] | None = None) -> Dict[str, int]:
+        if not self.path.exists():
+            return {}
+        offsets: Dict[str, int] = {}
+        stored: Dict[str, str | None] = {}
+        with self._lock, self.path.open("rb") as f:
+            offset = 0
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    offsets[entry["scenario_id"]] = offset
+                    stored[entry["scenario_id"]] = entry.get(_FINGERPRINT)
+                except (ValueError, KeyError, TypeError):
+                    # A run killed mid-write can leave a truncated last line.
+                    pass
+                offset += len(line)
+        if fingerprints is not None:
+            offsets = {
+                scenario_id: offset
+                for scenario_id, offset in offsets.items()
+                if stored[scenario_id] is not None and stored[scenario_id] == fingerprints.get(scenario_id)
+            }
+        return offsets
+
+    def read(self, offset: int) -> Dict[str, Any]:
+        with self._lock, self.path.open("rb") as f:
+            f.seek(offset)
+            result = json.loads(f.readline())
+        result.pop(_FINGERPRINT, None)
+        return result
+
+    def completed(self) -> Dict[str, Dict[str, Any]]:
+        return {scenario_id: self.read(offset) for scenario_id, offset in self.index().items()}
+
+    def append(self, result: Dict[str, Any], fingerprint: str | None = None) -> None:
+        if fingerprint is not None:
+            result = dict(result, **{_FINGERPRINT: fingerprint})
+        line = json.dumps(result, default=str) + "\n"
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            if not self._tail_checked:
+                line = _line_break_after_partial_line(self.path) + line
+                self._tail_checked = True
+            with self.path.open("a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+
+
+def _line_break_after_partial_line(path: Path) -> str:
+    # Keep a truncated last line from swallowing the next appended line.
+    if not path.exists() or path.stat().st_size == 0:
+        return ""
+    with path.open("rb") as f:
+        f.seek(-1, 2)
+        return "" if f.read(1) == b"\n" else "\n"
@@ -0,0 +1,109 @@
+# Background Claude judging, off the conversation loop's critical path
+import queue
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Tuple
+
+from .evaluator_claude import ClaudeJudge
+from .memory import memory_stage
+from .profiling import profiled
+from .tracing import span
+from .usage import TurnUsage, add_usage, split_usage
+
+
+_STOP = object()
+
+
+class JudgePool:
+    """Worker threads that fill in turn verdicts asynchronously.
+
+    The conversation loop submits a turn record with its bot text and
+    expectation and moves on; the record's ``pass`` stays ``None`` until a
+    worker sets it. Each worker takes whatever turns are queued, up to
+    ``batch_size``, and grades them with one ``ClaudeJudge.judge_batch`` call.
+    A failed grading marks its turns as failed and records ``judge_error``.
+    A batch's token usage is split evenly over its turns' ``usage``.
+    Call ``drain()`` before aggregating results.
+    """
+
+    def __init__(self, judge: ClaudeJudge, workers: int = 4, batch_size: int | None = None) -> None:
+        self.judge = judge
+        self.batch_size = batch_size or judge.batch_size
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._graded = threading.Condition()
+        self._threads = [
+            threading.Thread(target=self._work, name=f"judge-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, entry: Dict[str, Any], bot_text: str, expect: Dict[str, Any]) -> None:
+        entry["pass"] = None
+        self._queue.put((entry, bot_text, expect))
+
+    def wait(self, entries: Iterable[Dict[str, Any]]) -> None:
+        """Block until the given turn records all have a verdict."""
+        entries = list(entries)
+        with self._graded:
+            self._graded.wait_for(lambda: all(entry["pass"] is not None for entry in entries))
+
+    def drain(self) -> None:
+        """Block until every submitted turn has a verdict."""
+        self._queue.join()
+
+    def close(self) -> None:
+        self.drain()
+        for _ in self._threads:
+            self._queue.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+
+    def _work(self) -> None:
+        while True:
+            job = self._queue.get()
+            if job is _STOP:
+                self._queue.task_done()
+                return
+            batch = [job]
+            while len(batch) < self.batch_size:
+                try:
+                    job = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if job is _STOP:
+                    # Leave the stop marker for this worker's next loop.
+                    self._queue.task_done()
+                    self._queue.put(_STOP)
+                    break
+                batch.append(job)
+            self._grade(batch)
+
+    def _grade(self, batch: List[Tuple[Dict[str, Any], str, Dict[str, Any]]]) -> None:
+        started = time.perf_counter()
+        batch_usage = TurnUsage()
+        try:
+            with (
+                span("judge.batch", turns=len(batch)),
+                profiled("judge.batch"),
+                memory_stage("judge.batch"),
+                batch_usage.active(),
+            ):
+                verdicts = self.judge.judge_batch([(bot_text, expect) for _, bot_text, expect in batch])
+            for stage, usage in batch_usage.stages.items():
+                for (entry, _, _), share in zip(batch, split_usage(usage, len(batch))):
+                    add_usage(entry.setdefault("usage", {}), {stage: share})
+            for (entry, _, _), verdict in zip(batch, verdicts):
+                # Every turn in the batch waited for the whole batch.
+                timings = entry.setdefault("timings", {})
+                timings["judge"] = timings.get("judge", 0.0) + time.perf_counter() - started
+                entry["pass"] = verdict
+        except Exception as exc:
+            for entry, _, _ in batch:
+                entry["pass"] = False
+                entry["judge_error"] = str(exc)
+        finally:
+            with self._graded:
+                self._graded.notify_all()
+            for _ in batch:
+                self._queue.task_done()
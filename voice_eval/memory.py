@@ -0,0 +1,239 @@
+# Memory instrumentation: tracemalloc per scenario and peak RSS per stage
+import os
+import sys
+import threading
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from typing import Any, Dict, Iterator, List, Tuple
+
+# Installed by ``MemoryTracker.install()``; the hooks are shared no-ops while None.
+_TRACKER: "MemoryTracker | None" = None
+_DISABLED = nullcontext()
+# Frames of the instrumentation itself, not worth reporting as allocation sites.
+_IGNORED_TRACES = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def current_rss() -> int | None:
+    """Resident set size of this process in bytes, or None if unavailable.
+
+    Reads ``/proc/self/statm`` where it exists; elsewhere falls back to the
+    peak RSS reported by ``resource``.
+    """
+    try:
+        with open("/proc/self/statm", encoding="ascii") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux kilobytes.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class MemoryTracker:
+    """Traces Python allocations and samples RSS while a run is installed.
+
+    ``scenario()`` measures one scenario: traced memory at its end and peak
+    while it ran, RSS at its end and peak, the peak RSS seen during each
+    stage, and the allocation sites that grew most since the previous
+    scenario's snapshot. Tracemalloc and RSS are process-wide, so scenarios
+    running concurrently share their numbers. ``top_sites()`` compares the
+    end of the run with its start.
+    """
+
+    def __init__(self, top: int = 10, frames: int = 1, interval: float = 0.05) -> None:
+        self.top = top
+        self.frames = frames
+        self.interval = interval
+        self.peak_rss = 0
+        self.stage_rss: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._active_stages: Dict[str, int] = {}
+        self._windows: List[Dict[str, Any]] = []
+        self._baseline: tracemalloc.Snapshot | None = None
+        self._previous: tracemalloc.Snapshot | None = None
+        self._final: tracemalloc.Snapshot | None = None
+        self._started_tracing = False
+        self._sampler: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    @contextmanager
+    def install(self) -> Iterator["MemoryTracker"]:
+        global _TRACKER
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started_tracing = True
+        self._baseline = self._previous = _snapshot()
+        self._sample()
+        self._stop.clear()
+        self._sampler = threading.Thread(target=self._run_sampler, name="voice-eval-memory", daemon=True)
+        self._sampler.start()
+        previous, _TRACKER = _TRACKER, self
+        try:
+            yield self
+        finally:
+            _TRACKER = previous
+            self._stop.set()
+            self._sampler.join()
+            self._sample()
+            self._final = _snapshot()
+            if self._started_tracing:
+                tracemalloc.stop()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        with self._lock:
+            self._active_stages[name] = self._active_stages.get(name, 0) + 1
+        self._sample()
+        try:
+            yield
+        finally:
+            # Sample before leaving so short stages still record their peak.
+            self._sample()
+            with self._lock:
+                self._active_stages[name] -= 1
+                if not self._active_stages[name]:
+                    del self._active_stages[name]
+
+    @contextmanager
+    def scenario(self) -> Iterator[Dict[str, Any]]:
+        """Measure one scenario; the yielded dict is filled in on exit."""
+        usage: Dict[str, Any] = {}
+        window: Dict[str, Any] = {"rss_peak": 0, "stages": {}}
+        tracemalloc.reset_peak()
+        with self._lock:
+            self._windows.append(window)
+        self._sample()
+        try:
+            yield usage
+        finally:
+            self._sample()
+            with self._lock:
+                self._windows.remove(window)
+            traced, traced_peak = tracemalloc.get_traced_memory()
+            snapshot = _snapshot()
+            with self._lock:
+                previous, self._previous = self._previous, snapshot
+            usage.update({
+                "traced_bytes": traced,
+                "traced_peak_bytes": traced_peak,
+                "rss_bytes": current_rss(),
+                "rss_peak_bytes": window["rss_peak"] or None,
+                "stage_rss_peak_bytes": dict(window["stages"]),
+                "top_allocations": _top_growth(snapshot, previous, 3),
+            })
+
+    def top_sites(self, count: int | None = None) -> List[Dict[str, Any]]:
+        """Allocation sites that grew most between install and the end of the run."""
+        if self._final is None or self._baseline is None:
+            return []
+        return _top_growth(self._final, self._baseline, count or self.top)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "peak_rss_bytes": self.peak_rss or None,
+            "stage_rss_peak_bytes": dict(self.stage_rss),
+            "top_allocations": self.top_sites(),
+        }
+
+    def _run_sampler(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def _sample(self) -> None:
+        rss = current_rss()
+        if rss is None:
+            return
+        with self._lock:
+            self.peak_rss = max(self.peak_rss, rss)
+            for stage in self._active_stages:
+                self.stage_rss[stage] = max(self.stage_rss.get(stage, 0), rss)
+            for window in self._windows:
+                window["rss_peak"] = max(window["rss_peak"], rss)
+                for stage in self._active_stages:
+                    window["stages"][stage] = max(window["stages"].get(stage, 0), rss)
+
+
+def memory_stage(name: str) -> Any:
+    """Sample RSS for a named stage when memory tracking is on; a no-op otherwise."""
+    tracker = _TRACKER
+    if tracker is None:
+        return _DISABLED
+    return tracker.stage(name)
+
+
+def memory_scenario() -> Any:
+    """Measure a scenario when memory tracking is on; yields None otherwise."""
+    tracker = _TRACKER
+    if tracker is None:
+        return _DISABLED
+    return tracker.scenario()
+
+
+class MemoryCollector:
+    """Per-scenario memory usage gathered across results for the report.
+
+    Keeps the RSS of each scenario in arrival order (to spot growth over a
+    long run), the largest peaks, per-stage peak RSS and allocation growth
+    summed per site.
+    """
+
+    def __init__(self) -> None:
+        self.rss: List[Tuple[str, int]] = []
+        self.peak_rss: Tuple[int, str] | None = None
+        self.peak_traced: Tuple[int, str] | None = None
+        self.stages: Dict[str, int] = {}
+        self.sites: Dict[str, Dict[str, int]] = {}
+
+    def add(self, result: Dict[str, Any]) -> None:
+        usage = result.get("memory")
+        if not usage:
+            return
+        scenario_id = result["scenario_id"]
+        if usage.get("rss_bytes") is not None:
+            self.rss.append((scenario_id, usage["rss_bytes"]))
+        if usage.get("rss_peak_bytes") and (self.peak_rss is None or usage["rss_peak_bytes"] > self.peak_rss[0]):
+            self.peak_rss = (usage["rss_peak_bytes"], scenario_id)
+        if self.peak_traced is None or usage["traced_peak_bytes"] > self.peak_traced[0]:
+            self.peak_traced = (usage["traced_peak_bytes"], scenario_id)
+        for stage, rss in usage.get("stage_rss_peak_bytes", {}).items():
+            self.stages[stage] = max(self.stages.get(stage, 0), rss)
+        for site in usage.get("top_allocations", []):
+            totals = self.sites.setdefault(site["site"], {"size_bytes": 0, "count": 0})
+            totals["size_bytes"] += site["size_bytes"]
+            totals["count"] += site["count"]
+
+    def top_sites(self, count: int = 10) -> List[Tuple[str, Dict[str, int]]]:
+        ranked = sorted(self.sites.items(), key=lambda item: item[1]["size_bytes"], reverse=True)
+        return [(site, totals) for site, totals in ranked[:count] if totals["size_bytes"] > 0]
+
+
+def format_bytes(size: int | None) -> str:
+    """Render a byte count as ``12.3 MB``."""
+    if size is None:
+        return "n/a"
+    return f"{size / 1_048_576:.1f} MB"
+
+
+def _snapshot() -> tracemalloc.Snapshot:
+    return tracemalloc.take_snapshot().filter_traces(_IGNORED_TRACES)
+
+
+def _top_growth(snapshot: tracemalloc.Snapshot, baseline: tracemalloc.Snapshot, count: int) -> List[Dict[str, Any]]:
+    growth = [diff for diff in snapshot.compare_to(baseline, "lineno") if diff.size_diff > 0]
+    return [
+        {
+            "site": f"{diff.traceback[0].filename}:{diff.traceback[0].lineno}",
+            "size_bytes": diff.size_diff,
+            "count": diff.count_diff,
+        }
+        for diff in growth[:count]
+    ]
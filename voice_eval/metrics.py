@@ -0,0 +1,93 @@
+# Small statistics helpers shared by run summaries and reports
+import bisect
+import heapq
+import math
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+
+def percentile(values: Iterable[float], pct: float) -> float | None:
+    """Return the linearly interpolated percentile of values, or None if empty."""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+
+    rank = (len(ordered) - 1) * pct / 100
+    lower = math.floor(rank)
+    upper = math.ceil(rank)
+    if lower == upper:
+        return ordered[lower]
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def latency_summary(values: Iterable[float]) -> Dict[str, float | None]:
+    """Summarize latencies as p50/p95/p99."""
+    values = list(values)
+    return {
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+    }
+
+
+def histogram(values: Iterable[float], bounds: Sequence[float]) -> Dict[str, int]:
+    """Count values into buckets with the given ascending upper bounds (in seconds)."""
+    labels = [f"<={_format_bound(bound)}" for bound in bounds] + [f">{_format_bound(bounds[-1])}"]
+    counts = [0] * len(labels)
+    for value in values:
+        counts[bisect.bisect_left(bounds, value)] += 1
+    return dict(zip(labels, counts))
+
+
+def _format_bound(seconds: float) -> str:
+    if seconds >= 1:
+        return f"{seconds:g}s"
+    if seconds >= 0.001:
+        return f"{seconds * 1000:g}ms"
+    return f"{seconds * 1_000_000:g}us"
+
+
+def format_latency_summary(summary: Dict[str, float | None]) -> str:
+    """Render a latency summary as ``p50 0.81s, p95 1.90s, p99 3.20s``."""
+    return ", ".join(
+        f"{name} {value:.2f}s" if value is not None else f"{name} n/a"
+        for name, value in summary.items()
+    )
+
+
+class LatencyCollector:
+    """Per-turn stage timings gathered across results for the report.
+
+    Keeps every stage duration (grouped by stage and by the turn's expected
+    intent) and the ``slowest`` turns by total time, but not the transcripts.
+    """
+
+    def __init__(self, slowest: int = 10) -> None:
+        self.stages: Dict[str, List[float]] = {}
+        self.intents: Dict[str, List[float]] = {}
+        self.totals: List[float] = []
+        self._slowest = slowest
+        self._heap: List[Tuple[float, str, int, Dict[str, float]]] = []
+
+    def add(self, result: Dict[str, Any]) -> None:
+        for entry in result.get("transcript", []):
+            timings = entry.get("timings")
+            if not timings:
+                continue
+            for stage, seconds in timings.items():
+                if stage != "total":
+                    self.stages.setdefault(stage, []).append(seconds)
+            total = timings.get("total")
+            if total is None:
+                continue
+            intent = entry.get("expected_intent") or "(unknown)"
+            self.intents.setdefault(intent, []).append(total)
+            self.totals.append(total)
+            item = (total, result["scenario_id"], entry["turn"], dict(timings))
+            if len(self._heap) < self._slowest:
+                heapq.heappush(self._heap, item)
+            elif total > self._heap[0][0]:
+                heapq.heapreplace(self._heap, item)
+
+    def slowest(self) -> List[Tuple[float, str, int, Dict[str, float]]]:
+        """The slowest turns as ``(total, scenario_id, turn, timings)``, slowest first."""
+        return sorted(self._heap, key=lambda item: item[0], reverse=True)
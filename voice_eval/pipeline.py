@@ -0,0 +1,350 @@
+# Staged producer/consumer execution for run_directory
+import os
+import threading
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    InvalidStateError,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from .audio.asr import remember_transcript, transcribe
+from .audio.tts import synthesize
+from .scenario import Scenario
+from .tracing import active_tracer, current_span
+
+
+def iter_completed(
+    submit: Callable[[Any], Future],
+    items: Iterable[Any],
+    limit: int,
+) -> Iterator[Any]:
+    """Yield the results of ``submit(item)`` as they complete.
+
+    At most ``limit`` items are in flight, so finished results never pile
+    up faster than the caller consumes them.
+    """
+    pending: set = set()
+    for item in items:
+        if len(pending) >= limit:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+        pending.add(submit(item))
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            yield future.result()
+
+
+def _timed(fn: Callable[..., Any], *args: Any) -> Tuple[Any, int, int, Tuple[int, int]]:
+    # Module-level so it can run in a worker process.
+    started = time.perf_counter_ns()
+    result = fn(*args)
+    return result, started, time.perf_counter_ns(), (os.getpid(), threading.get_ident())
+
+
+class _Stage:
+    """One pipeline stage: an executor plus depth and utilization counters.
+
+    Depth counts items submitted but not yet started, taken as the in-flight
+    items beyond the worker count (process workers cannot report when they
+    start an item). Utilization is busy time over ``workers * wall time``.
+    While tracing, each item becomes a ``pipeline.<stage>`` span under the
+    span current at submission.
+    """
+
+    def __init__(self, name: str, executor: Executor, workers: int) -> None:
+        self.name = name
+        self.workers = workers
+        self._executor = executor
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self._submitted = 0
+        self._completed = 0
+        self._busy = 0.0
+        self._max_depth = 0
+
+    @property
+    def queue_depth(self) -> int:
+        with self._lock:
+            return max(0, self._submitted - self._completed - self.workers)
+
+    def submit(self, fn: Callable[..., Any], *args: Any, attributes: Dict[str, Any] | None = None) -> Future:
+        """Run ``fn(*args)`` on the stage; the returned future holds its result.
+
+        ``attributes`` annotate the item's span when tracing.
+        """
+        with self._lock:
+            self._submitted += 1
+            self._max_depth = max(self._max_depth, self._submitted - self._completed - self.workers)
+        tracer = active_tracer()
+        parent = current_span()
+        outer: Future = Future()
+        inner = self._executor.submit(_timed, fn, *args)
+
+        def done(inner: Future) -> None:
+            try:
+                result, started, ended, worker = inner.result()
+            except BaseException as exc:
+                elapsed = 0.0
+                outer.set_exception(exc)
+            else:
+                elapsed = (ended - started) / 1e9
+                if tracer is not None:
+                    tracer.record(
+                        f"pipeline.{self.name}", started, ended, parent=parent, worker=worker, **(attributes or {})
+                    )
+                outer.elapsed = elapsed
+                outer.set_result(result)
+            finally:
+                with self._lock:
+                    self._completed += 1
+                    self._busy += elapsed
+
+        inner.add_done_callback(done)
+        return outer
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            wall = time.monotonic() - self._started
+            return {
+                "workers": self.workers,
+                "completed": self._completed,
+                "queue_depth": max(0, self._submitted - self._completed - self.workers),
+                "max_queue_depth": max(0, self._max_depth),
+                "busy_seconds": self._busy,
+                "utilization": self._busy / (self.workers * wall) if wall > 0 else 0.0,
+            }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
+
+
+class Pipeline:
+    """Runs a suite as stages connected by bounded buffers.
+
+    - ``user_audio`` synthesizes (or locates) caller audio, on threads.
+    - ``asr`` transcribes it, on a process pool unless ``asr_processes`` is off.
+    - ``conversation`` runs each scenario's turns in order; scenarios run in
+      parallel across ``conversation_workers`` threads.
+    - ``bot_audio`` synthesizes bot replies off the conversation's path.
+
+    Caller turns do not depend on the bot, so they are prefetched in suite
+    order up to ``buffer_turns`` ahead of the conversations; a conversation
+    that reaches a turn waits for that turn only. ``bot_audio`` accepts at
+    most ``buffer_turns`` pending replies before it applies back-pressure.
+    ``stats()`` reports per-stage queue depth and utilization.
+    """
+
+    def __init__(
+        self,
+        conversation_workers: int = 1,
+        asr_workers: int = 2,
+        tts_workers: int = 4,
+        buffer_turns: int = 32,
+        asr_processes: bool = True,
+    ) -> None:
+        asr_executor: Executor = (
+            ProcessPoolExecutor(max_workers=asr_workers)
+            if asr_processes
+            else ThreadPoolExecutor(max_workers=asr_workers, thread_name_prefix="asr")
+        )
+        self.stages = {
+            "user_audio": _Stage(
+                "user_audio",
+                ThreadPoolExecutor(max_workers=tts_workers, thread_name_prefix="user-audio"),
+                tts_workers,
+            ),
+            "asr": _Stage("asr", asr_executor, asr_workers),
+            "conversation": _Stage(
+                "conversation",
+                ThreadPoolExecutor(max_workers=conversation_workers, thread_name_prefix="conversation"),
+                conversation_workers,
+            ),
+            "bot_audio": _Stage(
+                "bot_audio",
+                ThreadPoolExecutor(max_workers=tts_workers, thread_name_prefix="bot-audio"),
+                tts_workers,
+            ),
+        }
+        self._turn_slots = threading.Semaphore(buffer_turns)
+        self._bot_slots = threading.Semaphore(buffer_turns)
+        self._turns: Dict[Tuple[str, int], Future] = {}
+        # Pending bot audio, keyed by the id() of its turn record.
+        self._bot_audio: Dict[int, Future] = {}
+        self._feeder: threading.Thread | None = None
+        self._closed = threading.Event()
+
+    def run(
+        self,
+        scenarios: Sequence[Scenario],
+        run_one: Callable[[Any], Dict[str, Any]],
+        items: Iterable[Any],
+        audio_dir: Path,
+        model_size: str,
+        find_real_audio: Callable[[str, int], str | None],
+    ) -> Iterator[Dict[str, Any]]:
+        """Prefetch caller turns for ``scenarios`` and yield ``run_one(item)`` results as they finish."""
+        turns = []
+        for scenario in scenarios:
+            for i, step in enumerate(scenario.steps, start=1):
+                handle: Future = Future()
+                self._turns[(scenario.id, i)] = handle
+                turns.append((scenario.id, i, step.user or "", handle))
+        self._feeder = threading.Thread(
+            target=self._feed,
+            args=(turns, audio_dir, model_size, find_real_audio),
+            name="pipeline-feeder",
+            daemon=True,
+        )
+        self._feeder.start()
+
+        conversation = self.stages["conversation"]
+        yield from iter_completed(
+            lambda item: conversation.submit(run_one, item),
+            items,
+            2 * conversation.workers,
+        )
+
+    def user_turn(self, scenario_id: str, turn: int) -> Tuple[str, str, Dict[str, float]]:
+        """Wait for a prefetched caller turn.
+
+        Returns ``(user_wav, transcript, timings)`` with the seconds spent in
+        ``user_tts`` (absent for recordings) and ``asr``.
+        """
+        future = self._turns.pop((scenario_id, turn))
+        try:
+            return future.result()
+        finally:
+            self._turn_slots.release()
+
+    def submit_bot_audio(self, entry: Dict[str, Any], bot_text: str, bot_wav: str, started: float) -> None:
+        """Synthesize a bot reply in the background and fill ``time_to_first_audio``."""
+        self._bot_slots.acquire()
+        entry["time_to_first_audio"] = None
+
+        def render() -> None:
+            rendering = time.perf_counter()
+            synthesize(bot_text, bot_wav)
+            entry["time_to_first_audio"] = time.monotonic() - started
+            entry.setdefault("timings", {})["bot_tts"] = time.perf_counter() - rendering
+
+        future = self.stages["bot_audio"].submit(render)
+        future.add_done_callback(lambda _: self._bot_slots.release())
+        self._bot_audio[id(entry)] = future
+
+    def wait_for(self, entries: Iterable[Dict[str, Any]]) -> None:
+        """Block until the bot audio of these turn records is written."""
+        for entry in entries:
+            future = self._bot_audio.pop(id(entry), None)
+            if future is not None:
+                future.result()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {name: stage.stats() for name, stage in self.stages.items()}
+
+    def close(self) -> None:
+        """Wait for outstanding bot audio and stop every stage.
+
+        Turns that were never prefetched (the run stopped early) fail, so no
+        conversation is left waiting for them.
+        """
+        self._closed.set()
+        if self._feeder is not None:
+            self._feeder.join()
+        for handle in list(self._turns.values()):
+            _settle(handle, exception=RuntimeError("Pipeline closed before the turn was prefetched"))
+        try:
+            for future in list(self._bot_audio.values()):
+                future.result()
+            self._bot_audio.clear()
+        finally:
+            for stage in self.stages.values():
+                stage.shutdown()
+
+    def _feed(
+        self,
+        turns: List[Tuple[str, int, str, Future]],
+        audio_dir: Path,
+        model_size: str,
+        find_real_audio: Callable[[str, int], str | None],
+    ) -> None:
+        for scenario_id, turn, user_text, handle in turns:
+            # Block while the buffer is full, unless the run is over.
+            while not self._turn_slots.acquire(timeout=0.1):
+                if self._closed.is_set():
+                    return
+            try:
+                self._prefetch(handle, scenario_id, turn, user_text, audio_dir, model_size, find_real_audio)
+            except Exception as exc:
+                _settle(handle, exception=exc)
+
+    def _prefetch(
+        self,
+        handle: Future,
+        scenario_id: str,
+        turn: int,
+        user_text: str,
+        audio_dir: Path,
+        model_size: str,
+        find_real_audio: Callable[[str, int], str | None],
+    ) -> None:
+        real_audio_file = find_real_audio(scenario_id, turn)
+        if real_audio_file:
+            audio = Future()
+            audio.elapsed = None
+            audio.set_result(real_audio_file)
+        else:
+            user_wav = f"{audio_dir}/{scenario_id}/user_{turn}.wav"
+            audio = self.stages["user_audio"].submit(
+                _synthesize_to, user_text, user_wav, attributes={"scenario_id": scenario_id, "turn": turn}
+            )
+
+        def transcribe_audio(audio: Future) -> None:
+            try:
+                user_wav = audio.result()
+            except BaseException as exc:
+                _settle(handle, exception=exc)
+                return
+            asr = self.stages["asr"].submit(
+                transcribe, user_wav, model_size, attributes={"scenario_id": scenario_id, "turn": turn}
+            )
+
+            def finish(asr: Future) -> None:
+                try:
+                    transcript = asr.result()
+                except BaseException as exc:
+                    _settle(handle, exception=exc)
+                    return
+                remember_transcript(user_wav, model_size, transcript)
+                timings = {"asr": asr.elapsed}
+                if audio.elapsed is not None:
+                    timings["user_tts"] = audio.elapsed
+                _settle(handle, result=(user_wav, transcript, timings))
+
+            asr.add_done_callback(finish)
+
+        audio.add_done_callback(transcribe_audio)
+
+
+def _settle(future: Future, result: Any = None, exception: BaseException | None = None) -> None:
+    # A turn can be failed by close() while its stages are still running.
+    try:
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
+    except InvalidStateError:
+        pass
+
+
+def _synthesize_to(text: str, out_wav: str) -> str:
+    synthesize(text, out_wav)
+    return out_wav
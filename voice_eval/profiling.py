@@ -0,0 +1,294 @@
+# CPU profiling of a whole run or of selected stages
+import cProfile
+import marshal
+import os
+import pstats
+import sys
+import threading
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+
+# Profile stages selectable on the command line and the timed regions they cover.
+PROFILE_STAGES: Dict[str, Tuple[str, ...]] = {
+    "asr": ("asr",),
+    "llm": ("stage_1", "stage_2"),
+    "judge": ("judge", "judge.batch"),
+    "report": ("report",),
+}
+PROFILE_MODES = ("deterministic", "sampling")
+
+# pstats function key: (filename, line number, function name).
+Func = Tuple[str, int, str]
+
+# Installed by ``Profiler.install()``; ``profiled()`` is a shared no-op while None.
+_PROFILER: "Profiler | None" = None
+_DISABLED = nullcontext()
+# Collapsed stacks from cProfile data are approximated by splitting time over
+# callers; paths contributing less than this many seconds are dropped.
+_MIN_PATH_SECONDS = 1e-6
+
+
+def parse_profile_targets(spec: str) -> Tuple[str, ...] | None:
+    """Parse ``--profile``: ``run`` for the whole run (None), else stage names."""
+    if spec.strip() == "run":
+        return None
+    stages = tuple(stage.strip() for stage in spec.split(",") if stage.strip())
+    unknown = [stage for stage in stages if stage not in PROFILE_STAGES]
+    if unknown or not stages:
+        raise ValueError(
+            f"Unknown profile stage(s): {', '.join(unknown) or spec!r}; "
+            f"use 'run' or any of {', '.join(PROFILE_STAGES)}"
+        )
+    return stages
+
+
+class Profiler:
+    """Deterministic (cProfile) or sampling profiler for a run.
+
+    With ``stages`` None the whole run is profiled on every thread started
+    while it is installed, plus the installing thread. Otherwise only code
+    inside the selected stages' ``profiled()`` regions counts. Work on the
+    ``--pipeline`` ASR process pool runs in other processes and is not
+    profiled.
+
+    The sampling profiler reads every thread's stack each ``interval``
+    seconds; its pstats output counts samples as calls and sampled time as
+    self/cumulative time.
+    """
+
+    def __init__(
+        self,
+        stages: Sequence[str] | None = None,
+        mode: str = "deterministic",
+        interval: float = 0.005,
+    ) -> None:
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profiler mode {mode!r}; use one of {', '.join(PROFILE_MODES)}")
+        self.stages = tuple(stages) if stages is not None else None
+        self.mode = mode
+        self.interval = interval
+        self._regions = (
+            {region for stage in self.stages for region in PROFILE_STAGES[stage]}
+            if self.stages is not None
+            else set()
+        )
+        self._lock = threading.Lock()
+        self._profiles: List[cProfile.Profile] = []
+        self._local = threading.local()
+        # Sampling state: threads inside a selected region and sample counts.
+        self._inside: Counter = Counter()
+        self._stacks: Counter = Counter()
+        self._sampler: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    @contextmanager
+    def install(self) -> Iterator["Profiler"]:
+        global _PROFILER
+        previous, _PROFILER = _PROFILER, self
+        self._start()
+        try:
+            yield self
+        finally:
+            self._finish()
+            _PROFILER = previous
+
+    @contextmanager
+    def region(self, name: str) -> Iterator[None]:
+        if name not in self._regions:
+            yield
+            return
+        if self.mode == "sampling":
+            ident = threading.get_ident()
+            with self._lock:
+                self._inside[ident] += 1
+            try:
+                yield
+            finally:
+                with self._lock:
+                    self._inside[ident] -= 1
+            return
+        depth = getattr(self._local, "depth", 0)
+        profile = self._thread_profile() if depth == 0 else None
+        if profile is not None and not _enable(profile):
+            profile = None
+        self._local.depth = depth + 1
+        try:
+            yield
+        finally:
+            self._local.depth = depth
+            if profile is not None:
+                profile.disable()
+
+    def stats(self) -> Dict[Func, Tuple[int, int, float, float, Dict[Func, Tuple[int, int, float, float]]]]:
+        """Raw pstats data: ``{func: (prim calls, calls, self, cumulative, callers)}``."""
+        if self.mode == "sampling":
+            return self._sampled_stats()
+        with self._lock:
+            profiles = list(self._profiles)
+        merged = None
+        for profile in profiles:
+            profile.create_stats()
+            if not profile.stats:
+                continue
+            if merged is None:
+                merged = pstats.Stats(profile)
+            else:
+                merged.add(profile)
+        return dict(merged.stats) if merged is not None else {}
+
+    def collapsed(self) -> Dict[str, int]:
+        """Collapsed stacks (``root;...;leaf`` -> weight) for flamegraph tools.
+
+        Sampling weights are sample counts. Deterministic weights are
+        microseconds of self time, split across call paths in proportion to
+        each caller's share of the callee's cumulative time.
+        """
+        if self.mode == "sampling":
+            with self._lock:
+                return {";".join(_label(func) for func in stack): count for stack, count in self._stacks.items()}
+        return {
+            ";".join(_label(func) for func in path): round(seconds * 1_000_000)
+            for path, seconds in _collapse_pstats(self.stats()).items()
+            if round(seconds * 1_000_000) > 0
+        }
+
+    def top(self, count: int = 20) -> List[Tuple[str, int, float, float]]:
+        """The ``count`` functions with the most self time: ``(label, calls, self, cumulative)``."""
+        ranked = sorted(self.stats().items(), key=lambda item: item[1][2], reverse=True)
+        return [(_label(func), calls, own, cumulative) for func, (_, calls, own, cumulative, _) in ranked[:count]]
+
+    def write(self, out_dir: str | Path) -> Tuple[Path, Path]:
+        """Write ``profile.pstats`` and ``profile.collapsed`` into ``out_dir``."""
+        out_dir = Path(out_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        stats_path = out_dir / "profile.pstats"
+        collapsed_path = out_dir / "profile.collapsed"
+        # The same marshal layout pstats.Stats.dump_stats writes.
+        with stats_path.open("wb") as f:
+            marshal.dump(self.stats(), f)
+        with collapsed_path.open("w", encoding="utf-8") as f:
+            for stack, weight in sorted(self.collapsed().items()):
+                f.write(f"{stack} {weight}\n")
+        return stats_path, collapsed_path
+
+    def _start(self) -> None:
+        if self.mode == "sampling":
+            self._stop.clear()
+            self._sampler = threading.Thread(target=self._sample, name="voice-eval-profiler", daemon=True)
+            self._sampler.start()
+        elif self.stages is None:
+            _enable(self._thread_profile())
+            threading.setprofile(self._profile_new_thread)
+
+    def _finish(self) -> None:
+        if self._sampler is not None:
+            self._stop.set()
+            self._sampler.join()
+            self._sampler = None
+        elif self.stages is None:
+            threading.setprofile(None)
+            self._thread_profile().disable()
+
+    def _thread_profile(self) -> cProfile.Profile:
+        profile = getattr(self._local, "profile", None)
+        if profile is None:
+            profile = self._local.profile = cProfile.Profile()
+            with self._lock:
+                self._profiles.append(profile)
+        return profile
+
+    def _profile_new_thread(self, frame: Any, event: str, arg: Any) -> None:
+        # Runs once in each new thread; enabling cProfile replaces this hook.
+        sys.setprofile(None)
+        _enable(self._thread_profile())
+
+    def _sample(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            with self._lock:
+                inside = {ident for ident, depth in self._inside.items() if depth > 0}
+            for ident, frame in frames.items():
+                if ident == own or (self.stages is not None and ident not in inside):
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+                    frame = frame.f_back
+                with self._lock:
+                    self._stacks[tuple(reversed(stack))] += 1
+
+    def _sampled_stats(self) -> Dict[Func, Tuple[int, int, float, float, Dict[Func, Tuple[int, int, float, float]]]]:
+        with self._lock:
+            stacks = dict(self._stacks)
+        own: Counter = Counter()
+        cumulative: Counter = Counter()
+        edges: Counter = Counter()
+        for stack, count in stacks.items():
+            own[stack[-1]] += count
+            for func in set(stack):
+                cumulative[func] += count
+            for caller, callee in set(zip(stack, stack[1:])):
+                edges[(caller, callee)] += count
+        callers: Dict[Func, Dict[Func, Tuple[int, int, float, float]]] = {}
+        for (caller, callee), count in edges.items():
+            seconds = count * self.interval
+            callers.setdefault(callee, {})[caller] = (count, count, 0.0, seconds)
+        return {
+            func: (count, count, own[func] * self.interval, count * self.interval, callers.get(func, {}))
+            for func, count in cumulative.items()
+        }
+
+
+def profiled(name: str) -> Any:
+    """Profile a named region when its stage is selected; a shared no-op otherwise."""
+    profiler = _PROFILER
+    if profiler is None:
+        return _DISABLED
+    return profiler.region(name)
+
+
+def _enable(profile: cProfile.Profile) -> bool:
+    try:
+        profile.enable()
+    except ValueError:
+        # Python 3.12+ allows one active cProfile per process.
+        return False
+    return True
+
+
+def _label(func: Func) -> str:
+    filename, line, name = func
+    if filename == "~":
+        label = name
+    else:
+        label = f"{name} ({os.path.basename(filename)}:{line})"
+    # ';' separates frames in collapsed stacks.
+    return label.replace(";", ",")
+
+
+def _collapse_pstats(stats: Dict[Func, Tuple[Any, ...]]) -> Dict[Tuple[Func, ...], float]:
+    callees: Dict[Func, Dict[Func, float]] = {}
+    for func, (_, _, _, _, callers) in stats.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, {})[func] = edge[3]
+    paths: Counter = Counter()
+    roots = [func for func, entry in stats.items() if not entry[4]]
+    pending: List[Tuple[Func, Tuple[Func, ...], float]] = [(root, (), 1.0) for root in roots]
+    while pending:
+        func, parents, share = pending.pop()
+        path = parents + (func,)
+        own, cumulative = stats[func][2], stats[func][3]
+        if own * share >= _MIN_PATH_SECONDS:
+            paths[path] += own * share
+        for callee, edge_cumulative in callees.get(func, {}).items():
+            callee_cumulative = stats[callee][3]
+            if callee in path or callee_cumulative <= 0:
+                continue
+            callee_share = share * edge_cumulative / callee_cumulative
+            if callee_cumulative * callee_share >= _MIN_PATH_SECONDS:
+                pending.append((callee, path, callee_share))
+    return dict(paths)
@@ -1,71 +1,349 @@
 # Markdown report generation for evaluation results
+import os
+import shutil
 from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple
 
+from ..memory import MemoryCollector, format_bytes
+from ..metrics import LatencyCollector, latency_summary
+from ..usage import PriceTable, UsageCollector, total_usage
 
-def write_markdown_report(results: list[dict], out_path: Path) -> None:
-    """Write markdown report for evaluation results."""
-    # Ensure parent directories exist
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-
-    with open(out_path, "w", encoding="utf-8") as f:
-        # H1: "Hybrid Voice Eval Report"
-        f.write("# Hybrid Voice Eval Report\n\n")
-
-        # Summary table: Scenario | Result | Steps Passed
-        f.write("## Summary\n\n")
-        total = len(results)
-        intent_correct = sum(1 for result in results if result["intent_detected"])
-        accuracy = (100 * intent_correct // total) if total else 0
-        f.write(f"**Intent Detection Accuracy:** {intent_correct}/{total} ({accuracy}%)\n\n")
-        f.write("| Scenario | Intent | Result | Steps Passed |\n")
-        f.write("|----------|--------|--------|--------------|\n")
 
+# Order of the pipeline stages in the latency tables; others follow by name.
+_STAGE_ORDER = ("user_tts", "asr", "slots", "stage_1", "stage_2", "bot_tts", "judge")
+# Per-scenario fields kept in memory for the summary; transcripts are not.
+_SUMMARY_FIELDS = (
+    "scenario_id",
+    "scenario_index",
+    "scenario_pass",
+    "intent_detected",
+    "first_correct_turn",
+    "steps_expected",
+    "steps_passed",
+    "judge",
+    "judged_turns",
+    "judge_escalations",
+    "input_tokens_saved",
+    "duration_seconds",
+    "from_cache",
+    "from_journal",
+    "usage",
+)
+_IN_PROGRESS = (
+    "_Run in progress: scenario sections are added as they finish; "
+    "the summary is written when the run ends._\n\n"
+)
+_INCOMPLETE = "_Run ended early: the summary was not written; the sections above are the scenarios that finished._\n"
+
+
+def is_reused(result: Dict[str, Any]) -> bool:
+    """Whether a result comes from the result cache or a resumed journal rather than this run."""
+    return bool(result.get("from_cache") or result.get("from_journal"))
+
+
+def summary_row(result: Dict[str, Any]) -> Dict[str, Any]:
+    """The fields of a result needed for summaries, without its transcript."""
+    return {key: result[key] for key in _SUMMARY_FIELDS if key in result}
+
+
+def write_markdown_report(results: Iterable[dict], out_path: Path, prices: PriceTable | None = None) -> None:
+    """Write markdown report for evaluation results."""
+    with MarkdownReportWriter(out_path, prices=prices) as writer:
         for result in results:
-            status = "✅ PASS" if result["scenario_pass"] else "❌ FAIL"
-            intent = "✅" if result["intent_detected"] else "❌"
-            first = (
-                f" (turn {result['first_correct_turn']})"
-                if result["first_correct_turn"] is not None
-                else ""
+            writer.add(result)
+
+
+class MarkdownReportWriter:
+    """Writes the report while results arrive.
+
+    Each scenario's section is appended to ``out_path`` as soon as it is
+    added, so the partial report can be opened during the run. Only the
+    summary fields, stage timings, token usage and memory usage of each
+    result are kept; they feed latency, token usage (priced with ``prices``)
+    and memory sections under the summary, which leave out results reused
+    from the result cache or a resumed journal. ``close()`` rewrites the file
+    with the summary on top and the sections in scenario order (by
+    ``scenario_index`` when results carry one), copying them from the
+    partial file. When the ``with`` block raises, the partial report is kept
+    and marked incomplete instead.
+    """
+
+    def __init__(self, out_path: Path, prices: PriceTable | None = None) -> None:
+        self.out_path = Path(out_path)
+        self.prices = prices or PriceTable()
+        self.rows: List[Dict[str, Any]] = []
+        self.latency = LatencyCollector()
+        self.usage = UsageCollector()
+        self.memory = MemoryCollector()
+        self._orders: List[Tuple[int, int]] = []
+        self._sections: List[Tuple[Tuple[int, int], int, int]] = []
+        self.out_path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.out_path, "wb")
+        self._write("# Hybrid Voice Eval Report\n\n" + _IN_PROGRESS)
+
+    def __enter__(self) -> "MarkdownReportWriter":
+        return self
+
+    def __exit__(self, exc_type: Any, *exc_info: Any) -> None:
+        if exc_type is None:
+            self.close()
+        elif not self._file.closed:
+            # Keep the partial report, marked incomplete, instead of a summary of part of the run.
+            self._write(_INCOMPLETE)
+            self._file.close()
+
+    def add(self, result: Dict[str, Any]) -> None:
+        arrival = len(self.rows)
+        order = (result.get("scenario_index", arrival), arrival)
+        self.rows.append(summary_row(result))
+        if not is_reused(result):
+            # Reused results carry the timings, token usage and memory of the run that produced them.
+            self.latency.add(result)
+            self.usage.add(result)
+            self.memory.add(result)
+        self._orders.append(order)
+        start = self._file.tell()
+        self._write(_format_scenario(result, self.prices))
+        self._file.flush()
+        self._sections.append((order, start, self._file.tell()))
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        self._file.close()
+        self.rows = [row for _, row in sorted(zip(self._orders, self.rows), key=lambda pair: pair[0])]
+        self._sections.sort()
+        final_path = self.out_path.with_name(self.out_path.name + ".tmp")
+        with open(final_path, "wb") as out, open(self.out_path, "rb") as partial:
+            header = "# Hybrid Voice Eval Report\n\n" + _format_summary(self.rows) + _format_latency(self.latency)
+            header += _format_usage(self.usage, self.prices) + _format_memory(self.memory)
+            out.write(header.encode("utf-8"))
+            for _, start, end in self._sections:
+                partial.seek(start)
+                _copy(partial, out, end - start)
+        os.replace(final_path, self.out_path)
+
+    def _write(self, text: str) -> None:
+        self._file.write(text.encode("utf-8"))
+
+
+def _copy(source: Any, target: Any, length: int) -> None:
+    while length > 0:
+        chunk = source.read(min(length, shutil.COPY_BUFSIZE))
+        if not chunk:
+            break
+        target.write(chunk)
+        length -= len(chunk)
+
+
+def _format_summary(results: List[Dict[str, Any]]) -> str:
+    # Summary table: Scenario | Result | Steps Passed
+    lines = ["## Summary\n\n"]
+    total = len(results)
+    intent_correct = sum(1 for result in results if result["intent_detected"])
+    accuracy = (100 * intent_correct // total) if total else 0
+    lines.append(f"**Intent Detection Accuracy:** {intent_correct}/{total} ({accuracy}%)\n\n")
+    tiered = [result for result in results if result.get("judge") == "tiered"]
+    if tiered:
+        judged = sum(result.get("judged_turns", 0) for result in tiered)
+        escalated = sum(result.get("judge_escalations", 0) for result in tiered)
+        rate = (100 * escalated // judged) if judged else 0
+        lines.append(f"**Judge Escalation Rate:** {escalated}/{judged} turns escalated to Claude ({rate}%)\n\n")
+    tokens_saved = sum(result.get("input_tokens_saved", 0) for result in results)
+    if tokens_saved:
+        lines.append(f"**Input Tokens Saved by History Compaction:** ~{tokens_saved}\n\n")
+    lines.append("| Scenario | Intent | Result | Steps Passed |\n")
+    lines.append("|----------|--------|--------|--------------|\n")
+
+    for result in results:
+        status = "✅ PASS" if result["scenario_pass"] else "❌ FAIL"
+        intent = "✅" if result["intent_detected"] else "❌"
+        first = (
+            f" (turn {result['first_correct_turn']})"
+            if result["first_correct_turn"] is not None
+            else ""
+        )
+        lines.append(
+            f"| {result['scenario_id']} | {intent}{first} | {status} | "
+            f"{result['steps_passed']}/{result['steps_expected']} |\n"
+        )
+
+    lines.append("\n")
+    return "".join(lines)
+
+
+def _format_latency(latency: LatencyCollector) -> str:
+    if not latency.stages and not latency.totals:
+        return ""
+    lines = ["## Latency\n\n"]
+    stages = sorted(
+        latency.stages,
+        key=lambda stage: (_STAGE_ORDER.index(stage) if stage in _STAGE_ORDER else len(_STAGE_ORDER), stage),
+    )
+    lines.append(_latency_table("Stage", [(stage, latency.stages[stage]) for stage in stages]))
+    if latency.totals:
+        groups = [(intent, latency.intents[intent]) for intent in sorted(latency.intents)]
+        lines.append(_latency_table("Intent", groups + [("**overall**", latency.totals)]))
+        lines.append("**Slowest Turns:**\n\n")
+        lines.append("| Scenario | Turn | Total | Slowest Stage |\n")
+        lines.append("|----------|------|-------|---------------|\n")
+        for total, scenario_id, turn, timings in latency.slowest():
+            stages_only = {stage: seconds for stage, seconds in timings.items() if stage != "total"}
+            slowest = max(stages_only, key=stages_only.get) if stages_only else None
+            cell = f"{slowest} ({stages_only[slowest]:.2f}s)" if slowest else "-"
+            lines.append(f"| {scenario_id} | {turn} | {total:.2f}s | {cell} |\n")
+        lines.append("\n")
+    return "".join(lines)
+
+
+def _format_usage(usage: UsageCollector, prices: PriceTable) -> str:
+    if not usage.stages:
+        return ""
+    lines = ["## Token Usage\n\n"]
+    overall = total_usage(usage.stages)
+    lines.append(
+        f"**Total:** {overall['input_tokens']} input, {overall['output_tokens']} output, "
+        f"{overall['cache_creation_input_tokens']} cache write, {overall['cache_read_input_tokens']} cache read "
+        f"tokens over {overall['calls']} calls; estimated cost {_format_cost(prices.total_cost(usage.stages))}\n\n"
+    )
+    lines.append("| Stage | Model | Calls | Input | Output | Cache Write | Cache Read | Cost |\n")
+    lines.append("|-------|-------|-------|-------|--------|-------------|------------|------|\n")
+    stages = sorted(
+        usage.stages,
+        key=lambda stage: (_STAGE_ORDER.index(stage) if stage in _STAGE_ORDER else len(_STAGE_ORDER), stage),
+    )
+    for stage in stages:
+        stage_usage = usage.stages[stage]
+        lines.append(
+            f"| {stage} | {stage_usage['model']} | {stage_usage['calls']} | {stage_usage['input_tokens']} | "
+            f"{stage_usage['output_tokens']} | {stage_usage['cache_creation_input_tokens']} | "
+            f"{stage_usage['cache_read_input_tokens']} | {_format_cost(prices.cost(stage_usage))} |\n"
+        )
+    lines.append("\n")
+    lines.append("| Intent | Turns | Calls | Input | Output | Cost | Cost per Turn |\n")
+    lines.append("|--------|-------|-------|-------|--------|------|---------------|\n")
+    groups = [(intent, usage.intents[intent], usage.turns[intent]) for intent in sorted(usage.intents)]
+    groups.append(("**overall**", usage.stages, sum(usage.turns.values())))
+    for name, stages_usage, turns in groups:
+        totals = total_usage(stages_usage)
+        cost = prices.total_cost(stages_usage)
+        lines.append(
+            f"| {name} | {turns} | {totals['calls']} | {totals['input_tokens']} | {totals['output_tokens']} | "
+            f"{_format_cost(cost)} | {_format_cost(cost / turns if cost is not None else None)} |\n"
+        )
+    lines.append("\n")
+    return "".join(lines)
+
+
+def _format_cost(cost: float | None) -> str:
+    return f"${cost:.4f}" if cost is not None else "n/a"
+
+
+def _format_memory(memory: MemoryCollector) -> str:
+    if memory.peak_traced is None:
+        return ""
+    lines = ["## Memory\n\n"]
+    if memory.peak_rss is not None:
+        lines.append(f"**Peak RSS:** {format_bytes(memory.peak_rss[0])} (during {memory.peak_rss[1]})\n\n")
+    lines.append(
+        f"**Peak Traced Python Memory:** {format_bytes(memory.peak_traced[0])} (during {memory.peak_traced[1]})\n\n"
+    )
+    if len(memory.rss) > 1:
+        (first_id, first), (last_id, last) = memory.rss[0], memory.rss[-1]
+        sign = "+" if last >= first else "-"
+        lines.append(
+            f"**RSS Over the Run:** {format_bytes(first)} after {first_id}, {format_bytes(last)} after {last_id} "
+            f"({sign}{format_bytes(abs(last - first))})\n\n"
+        )
+    if memory.stages:
+        stages = sorted(
+            memory.stages,
+            key=lambda stage: (_STAGE_ORDER.index(stage) if stage in _STAGE_ORDER else len(_STAGE_ORDER), stage),
+        )
+        lines.append("| Stage | Peak RSS |\n")
+        lines.append("|-------|----------|\n")
+        for stage in stages:
+            lines.append(f"| {stage} | {format_bytes(memory.stages[stage])} |\n")
+        lines.append("\n")
+    sites = memory.top_sites()
+    if sites:
+        lines.append("**Top Allocation Sites** (growth per scenario, summed):\n\n")
+        lines.append("| Site | Growth | Blocks |\n")
+        lines.append("|------|--------|--------|\n")
+        for site, totals in sites:
+            lines.append(f"| {site} | {format_bytes(totals['size_bytes'])} | {totals['count']} |\n")
+        lines.append("\n")
+    return "".join(lines)
+
+
+def _latency_table(label: str, groups: List[Tuple[str, List[float]]]) -> str:
+    lines = [f"| {label} | Turns | p50 | p95 | p99 |\n", "|" + "-" * (len(label) + 2) + "|-------|-----|-----|-----|\n"]
+    for name, values in groups:
+        summary = latency_summary(values)
+        lines.append(
+            f"| {name} | {len(values)} | {summary['p50']:.2f}s | {summary['p95']:.2f}s | {summary['p99']:.2f}s |\n"
+        )
+    lines.append("\n")
+    return "".join(lines)
+
+
+def _format_scenario(result: Dict[str, Any], prices: PriceTable) -> str:
+    # H2 with scenario_id and goal
+    lines = [f"## {result['scenario_id']}: {result['goal']}\n\n"]
+    usage = result.get("memory")
+    if usage:
+        lines.append(
+            f"**Memory:** peak traced {format_bytes(usage['traced_peak_bytes'])}, "
+            f"RSS {format_bytes(usage.get('rss_bytes'))} (peak {format_bytes(usage.get('rss_peak_bytes'))})\n\n"
+        )
+
+    # For each turn
+    for turn in result["transcript"]:
+        # Show ✅/❌, user_text, user_asr, bot_text
+        status_icon = "✅" if turn["pass"] else "❌"
+        lines.append(f"### Turn {turn['turn']} {status_icon}\n\n")
+
+        lines.append(f"**User Text:** {turn['user_text']}\n\n")
+        lines.append(f"**User ASR:** {turn['user_asr']}\n\n")
+        lines.append(f"**Bot Text:** {turn['bot_text']}\n\n")
+
+        detected_intent = turn.get("detected_intent") or "(missing)"
+        if turn["intent_correct"]:
+            lines.append(f"**Detected Intent:** {detected_intent} ✅\n\n")
+        else:
+            lines.append(
+                f"**Detected Intent:** {detected_intent} ❌ "
+                f"(expected: {turn['expected_intent']})\n\n"
             )
-            f.write(
-                f"| {result['scenario_id']} | {intent}{first} | {status} | "
-                f"{result['steps_passed']}/{result['steps_expected']} |\n"
+
+        if turn.get("judge_source"):
+            lines.append(f"**Verdict Source:** {turn['judge_source']}\n\n")
+
+        if turn.get("degraded"):
+            lines.append(f"**Degraded Stages:** {', '.join(turn['degraded'])}\n\n")
+
+        if turn.get("time_to_first_audio") is not None:
+            lines.append(f"**Time to First Audio:** {turn['time_to_first_audio']:.2f}s\n\n")
+
+        if turn.get("timings"):
+            stage_timings = ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in turn["timings"].items())
+            lines.append(f"**Stage Timings:** {stage_timings}\n\n")
+
+        if turn.get("usage"):
+            tokens = ", ".join(
+                f"{stage} {usage['input_tokens']} in / {usage['output_tokens']} out"
+                for stage, usage in turn["usage"].items()
             )
+            lines.append(f"**Tokens:** {tokens} ({_format_cost(prices.total_cost(turn['usage']))})\n\n")
 
-        f.write("\n")
+        # Show links (relative paths) to user_wav and bot_wav
+        lines.append("**Audio Files:**\n")
+        lines.append(f"- User: [{turn['user_wav']}]({turn['user_wav']})\n")
+        lines.append(f"- Bot: [{turn['bot_wav']}]({turn['bot_wav']})\n\n")
 
-        # For each scenario
-        for result in results:
-            # H2 with scenario_id and goal
-            f.write(f"## {result['scenario_id']}: {result['goal']}\n\n")
-
-            # For each turn
-            for turn in result["transcript"]:
-                # Show ✅/❌, user_text, user_asr, bot_text
-                status_icon = "✅" if turn["pass"] else "❌"
-                f.write(f"### Turn {turn['turn']} {status_icon}\n\n")
-
-                f.write(f"**User Text:** {turn['user_text']}\n\n")
-                f.write(f"**User ASR:** {turn['user_asr']}\n\n")
-                f.write(f"**Bot Text:** {turn['bot_text']}\n\n")
-
-                detected_intent = turn.get("detected_intent") or "(missing)"
-                if turn["intent_correct"]:
-                    f.write(f"**Detected Intent:** {detected_intent} ✅\n\n")
-                else:
-                    f.write(
-                        f"**Detected Intent:** {detected_intent} ❌ "
-                        f"(expected: {turn['expected_intent']})\n\n"
-                    )
-
-                # Show links (relative paths) to user_wav and bot_wav
-                f.write(f"**Audio Files:**\n")
-                f.write(f"- User: [{turn['user_wav']}]({turn['user_wav']})\n")
-                f.write(f"- Bot: [{turn['bot_wav']}]({turn['bot_wav']})\n\n")
-
-                # Show Expected (dict) if present
-                if turn["expectation"]:
-                    f.write(f"**Expected:** {turn['expectation']}\n\n")
-
-                f.write("---\n\n")
+        # Show Expected (dict) if present
+        if turn["expectation"]:
+            lines.append(f"**Expected:** {turn['expectation']}\n\n")
+
+        lines.append("---\n\n")
+    return "".join(lines)
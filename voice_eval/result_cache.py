@@ -0,0 +1,146 @@
+# Input-fingerprint cache of scenario results for incremental runs
+import dataclasses
+import hashlib
+import json
+import threading
+from pathlib import Path
+from typing import Any, Dict
+
+from . import bot_brain, bot_tools, evaluator_claude, evaluator_rules, policies
+from .evaluator_claude import JUDGE_PROMPT_VERSION, _JUDGE_MODEL
+from .journal import _line_break_after_partial_line
+from .policies import POLICIES
+from .scenario import Scenario
+
+
+# Bump when the fingerprint layout or stored result format changes.
+RESULT_CACHE_VERSION = "1"
+# Modules whose source holds the bot and judge prompts (policies.py has the
+# stage-2 templates), the rule-based tool logic and the rule judge's matcher.
+_PROMPT_MODULES = (bot_brain, bot_tools, policies, evaluator_rules, evaluator_claude)
+
+
+def run_fingerprint(
+    model_size: str,
+    judge: str,
+    judge_model: str | None = None,
+    stream: bool = False,
+    keep_turns: int | None = None,
+    turn_budget: float | None = None,
+) -> str:
+    """Digest of every run-wide input that can change a scenario result.
+
+    Covers the bot-brain, policy and judge prompts, the tool logic and the
+    rule matcher (by module source), the registered intent policies, the
+    bot and judge models, the ASR model size, the judge and the options
+    that change what the bot is sent.
+    """
+    prompts = hashlib.sha256()
+    for module in _PROMPT_MODULES:
+        prompts.update(Path(module.__file__).read_bytes())
+    return _digest({
+        "version": RESULT_CACHE_VERSION,
+        "prompts": prompts.hexdigest(),
+        "policies": [dataclasses.asdict(POLICIES[intent]) for intent in POLICIES.intents],
+        "bot_model": bot_brain._MODEL_NAME,
+        "asr": {"model_size": model_size},
+        "judge": judge,
+        "judge_model": (judge_model or _JUDGE_MODEL) if judge in ("claude", "tiered") else None,
+        "judge_prompt_version": JUDGE_PROMPT_VERSION,
+        "stream": stream,
+        "keep_turns": keep_turns,
+        "turn_budget": turn_budget,
+    })
+
+
+def scenario_fingerprint(
+    scenario: Scenario,
+    run_inputs: str,
+    recordings: Dict[int, str | None] | None = None,
+) -> str:
+    """Digest of a scenario definition, its recordings and ``run_inputs``.
+
+    ``recordings`` maps turn numbers to pre-recorded audio files; each file
+    is identified by its size and modification time.
+    """
+    audio = {}
+    for turn, path in (recordings or {}).items():
+        if path is not None:
+            stat = Path(path).stat()
+            audio[str(turn)] = [path, stat.st_size, stat.st_mtime_ns]
+    return _digest({
+        "run": run_inputs,
+        "id": scenario.id,
+        "goal": scenario.goal,
+        "steps": [[step.user, step.bot_expect] for step in scenario.steps],
+        "acceptance": scenario.acceptance,
+        "recordings": audio,
+    })
+
+
+def is_cacheable(result: Dict[str, Any]) -> bool:
+    """Whether a result reflects its inputs rather than a transient failure."""
+    return not any(
+        entry.get("error") or entry.get("judge_error") or entry.get("degraded")
+        for entry in result["transcript"]
+    )
+
+
+class ResultCache:
+    """Scenario results keyed by input fingerprint, persisted as JSONL.
+
+    Only each fingerprint's line offset is kept in memory; results are read
+    back from the file on a hit. With ``reuse`` off (forced reruns) ``get``
+    always misses but fresh results are still stored for the next run.
+    """
+
+    def __init__(self, path: str | Path, reuse: bool = True) -> None:
+        self.path = Path(path)
+        self.reuse = reuse
+        self.hits = 0
+        self._lock = threading.Lock()
+        self._offsets: Dict[str, int] = {}
+        self._tail_checked = False
+        if self.path.exists():
+            self._load()
+
+    def get(self, fingerprint: str) -> Dict[str, Any] | None:
+        if not self.reuse:
+            return None
+        with self._lock:
+            offset = self._offsets.get(fingerprint)
+            if offset is None:
+                return None
+            self.hits += 1
+            with self.path.open("rb") as f:
+                f.seek(offset)
+                return json.loads(f.readline())["result"]
+
+    def put(self, fingerprint: str, result: Dict[str, Any]) -> None:
+        line = json.dumps({"fingerprint": fingerprint, "result": result}, default=str) + "\n"
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            if not self._tail_checked:
+                line = _line_break_after_partial_line(self.path) + line
+                self._tail_checked = True
+            with self.path.open("ab") as f:
+                data = line.encode("utf-8")
+                # Skip a leading line break that terminated a partial line.
+                self._offsets[fingerprint] = f.tell() + (1 if data.startswith(b"\n") else 0)
+                f.write(data)
+
+    def _load(self) -> None:
+        with self.path.open("rb") as f:
+            offset = 0
+            for line in f:
+                try:
+                    self._offsets[json.loads(line)["fingerprint"]] = offset
+                except (ValueError, KeyError, TypeError):
+                    # A run killed mid-write can leave a truncated last line.
+                    pass
+                offset += len(line)
+
+
+def _digest(payload: Any) -> str:
+    text = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
@@ -1,14 +1,21 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
 import yaml
 
+from .evaluator_rules import ExpectationMatcher, compile_expectation
+
 
 @dataclass
 class Step:
     user: Optional[str] = None
     bot_expect: Optional[Dict[str, Any]] = None
+    # Compiled once from bot_expect so judging a turn does not re-read the dict.
+    matcher: ExpectationMatcher = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.matcher = compile_expectation(self.bot_expect)
 
 
 @dataclass
@@ -0,0 +1,200 @@
+# Splitting a scenario suite across processes or machines and merging results
+import hashlib
+import json
+import statistics
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+
+# Cost assumed for scenarios with no recorded duration when nothing is known.
+_DEFAULT_DURATION = 1.0
+
+
+def parse_shard(spec: str) -> Tuple[int, int]:
+    """Parse ``"i/N"`` (1-based) into ``(i, N)``."""
+    try:
+        index_text, count_text = spec.split("/")
+        index, count = int(index_text), int(count_text)
+    except ValueError:
+        raise ValueError(f"Shard must look like i/N, got {spec!r}") from None
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"Shard index must be between 1 and N, got {spec!r}")
+    return index, count
+
+
+def partition(
+    scenario_ids: Sequence[str],
+    count: int,
+    durations: Dict[str, float] | None = None,
+) -> List[List[int]]:
+    """Split scenarios into ``count`` shards of similar expected duration.
+
+    Returns the scenario positions in each shard, in suite order. Scenarios
+    are placed longest first onto the currently lightest shard; scenarios
+    without history are assumed to take the median known duration. The
+    result depends only on the ids and durations, so every machine computes
+    the same split from the same history file.
+    """
+    durations = durations or {}
+    known = [durations[scenario_id] for scenario_id in scenario_ids if scenario_id in durations]
+    fallback = statistics.median(known) if known else _DEFAULT_DURATION
+    costs = [durations.get(scenario_id, fallback) for scenario_id in scenario_ids]
+
+    shards: List[List[int]] = [[] for _ in range(count)]
+    loads = [0.0] * count
+    for position in sorted(range(len(scenario_ids)), key=lambda p: (-costs[p], scenario_ids[p], p)):
+        lightest = min(range(count), key=lambda shard: (loads[shard], shard))
+        shards[lightest].append(position)
+        loads[lightest] += costs[position]
+    return [sorted(shard) for shard in shards]
+
+
+def partition_key(
+    scenario_ids: Sequence[str],
+    count: int,
+    durations: Dict[str, float] | None = None,
+) -> str:
+    """Digest of everything ``partition`` splits on: ids, shard count and their durations.
+
+    Shards of one run must agree on it, or scenarios may run twice or not at all.
+    """
+    durations = durations or {}
+    payload = {
+        "ids": list(scenario_ids),
+        "shards": count,
+        "durations": {scenario_id: durations[scenario_id] for scenario_id in scenario_ids if scenario_id in durations},
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+def load_durations(path: Path) -> Dict[str, float]:
+    """Load per-scenario durations in seconds recorded by earlier runs."""
+    if not path.exists():
+        return {}
+    return {str(k): float(v) for k, v in json.loads(path.read_text(encoding="utf-8")).items()}
+
+
+def save_durations(path: Path, results: Iterable[Dict[str, Any]]) -> None:
+    """Record the duration of each finished scenario, keeping older entries."""
+    recorded = {
+        result["scenario_id"]: round(result["duration_seconds"], 3)
+        for result in results
+        if result.get("duration_seconds") is not None
+    }
+    if not recorded:
+        return
+    durations = load_durations(path)
+    durations.update(recorded)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(durations, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
+def shard_result_path(shard_dir: Path, index: int, count: int) -> Path:
+    return shard_dir / f"shard-{index}-of-{count}.json"
+
+
+def write_shard_results(
+    path: Path,
+    index: int,
+    count: int,
+    results: Iterable[Dict[str, Any]],
+    partition: str | None = None,
+    scenarios: int | None = None,
+) -> None:
+    with ShardResultWriter(path, index, count, partition=partition, scenarios=scenarios) as writer:
+        for result in results:
+            writer.add(result)
+
+
+class ShardResultWriter:
+    """Streams a shard's results to its result file as they finish.
+
+    The file only appears under ``path`` once the writer closes without an
+    error, so ``merge`` never picks up the results of a shard that died.
+    ``partition`` (from ``partition_key``) and the number of ``scenarios``
+    in the split suite let ``merge`` check that the shards fit together.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        index: int,
+        count: int,
+        partition: str | None = None,
+        scenarios: int | None = None,
+    ) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._partial = self.path.with_name(self.path.name + ".partial")
+        self._file = self._partial.open("w", encoding="utf-8")
+        header = {"shard": index, "shards": count, "partition": partition, "scenarios": scenarios}
+        self._file.write(json.dumps(header)[:-1] + ', "results": [')
+        self._count = 0
+
+    def __enter__(self) -> "ShardResultWriter":
+        return self
+
+    def __exit__(self, exc_type: Any, *exc_info: Any) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.close()
+
+    def add(self, result: Dict[str, Any]) -> None:
+        separator = ",\n" if self._count else "\n"
+        self._file.write(separator + json.dumps(result, default=str))
+        self._count += 1
+
+    def close(self) -> None:
+        self._file.write("\n]}\n")
+        self._file.close()
+        self._partial.replace(self.path)
+
+
+def merge_shard_results(paths: Iterable[Path]) -> List[Dict[str, Any]]:
+    """Combine shard result files into the results of a single full run.
+
+    Every shard of the split must be present exactly once, all shards must
+    come from the same partition (suite and duration history), and together
+    they must hold each ``scenario_index`` of the suite exactly once.
+    Results are put back in suite order using that index.
+    """
+    shards: Dict[int, List[Dict[str, Any]]] = {}
+    counts = set()
+    partitions = set()
+    sizes = set()
+    for path in paths:
+        payload = json.loads(Path(path).read_text(encoding="utf-8"))
+        counts.add(payload["shards"])
+        partitions.add(payload.get("partition"))
+        sizes.add(payload.get("scenarios"))
+        if payload["shard"] in shards:
+            raise ValueError(f"Shard {payload['shard']} given more than once")
+        shards[payload["shard"]] = payload["results"]
+
+    if not shards:
+        raise ValueError("No shard result files given")
+    if len(counts) != 1:
+        raise ValueError("Shard files come from splits with different shard counts")
+    count = counts.pop()
+    missing = sorted(set(range(1, count + 1)) - set(shards))
+    if missing:
+        raise ValueError(f"Missing shard results for: {', '.join(f'{i}/{count}' for i in missing)}")
+    if len(partitions) != 1 or len(sizes) != 1:
+        raise ValueError(
+            "Shard files were split from different scenario suites or duration histories; "
+            "rerun every shard from the same snapshot"
+        )
+
+    results = [result for shard_results in shards.values() for result in shard_results]
+    seen = Counter(result["scenario_index"] for result in results)
+    duplicated = sorted(index for index, times in seen.items() if times > 1)
+    if duplicated:
+        raise ValueError(f"Scenarios run by more than one shard: index {', '.join(map(str, duplicated))}")
+    size = sizes.pop()
+    expected = range(size if size is not None else max(seen, default=-1) + 1)
+    absent = [index for index in expected if index not in seen]
+    if absent:
+        raise ValueError(f"Scenarios run by no shard: index {', '.join(map(str, absent))}")
+    return sorted(results, key=lambda result: result["scenario_index"])
@@ -1,17 +1,30 @@
 # Voice interaction simulation engine
 import logging
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, Iterator, List, Any, Tuple
 
-from anthropic import Anthropic
+from anthropic import Anthropic, APITimeoutError
 
-from .audio.tts import synthesize
-from .audio.asr import transcribe
-from .bot_brain import HistoryEntry, generate_bot_response
+from .audio.tts import StreamingSynthesizer, synthesize
+from .audio.asr import cached_transcript, transcribe
+from .bot_brain import Conversation, generate_bot_response
+from .deadline import TurnDeadline
 from .tool_client import ToolClient
-from .evaluator_claude import check_bot_expect_claude
+from .evaluator_claude import ClaudeJudge, check_bot_expect_claude
 from .evaluator_rules import check_bot_expect_enhanced
+from .journal import RunJournal
+from .judging import JudgePool
+from .memory import memory_scenario
+from .pipeline import Pipeline, iter_completed
+from .result_cache import ResultCache, is_cacheable, run_fingerprint, scenario_fingerprint
 from .scenario import Scenario, load_scenarios
+from .sharding import partition
+from .timing import TurnTimings
+from .tracing import span
+from .usage import TurnUsage, add_usage
 
 
 logger = logging.getLogger(__name__)
@@ -40,97 +53,260 @@ def _find_real_audio(real_audio_dir: Path, scenario_id: str, turn: int) -> str |
     return None
 
 
+def select_scenarios(
+    dir_path: Path,
+    real_audio_dir: str | None = None,
+    real_audio_only: bool = False,
+) -> List[Scenario]:
+    """The suite a run covers, in order; ``scenario_index`` values index into it."""
+    scenarios = load_scenarios(dir_path)
+    if real_audio_only and real_audio_dir is not None:
+        real_audio_root = Path(real_audio_dir)
+        scenarios = [s for s in scenarios if _scenario_has_recordings(real_audio_root, s.id)]
+    return scenarios
+
+
 def run_scenario(
     s: Scenario,
     audio_dir: Path,
     model_size: str = "tiny",
     judge: str = "rules",
     real_audio_dir: str | Path | None = None,
+    stream: bool = False,
+    client: Anthropic | None = None,
+    keep_turns: int | None = None,
+    turn_budget: float | None = None,
+    tool_client: ToolClient | None = None,
+    claude_judge: ClaudeJudge | None = None,
+    judge_pool: JudgePool | None = None,
+    pipeline: Pipeline | None = None,
 ) -> Dict[str, Any]:
-    """Run a single scenario through the hybrid voice loop."""
-    client = Anthropic()
-    tool_client = ToolClient()
-    transcript = []
-    slots = {}
-    conversation_history: List[HistoryEntry] = []
-    real_audio_root = Path(real_audio_dir) if real_audio_dir is not None else None
-
-    for i, step in enumerate(s.steps, start=1):
-        user_text = step.user or ""
-        real_audio_file = None
-        if real_audio_root is not None:
-            real_audio_file = _find_real_audio(real_audio_root, s.id, i)
-
-        if real_audio_file:
-            user_wav = real_audio_file
-        else:
-            user_wav = f"{audio_dir}/{s.id}/user_{i}.wav"
-            synthesize(user_text, user_wav)
-        user_transcript = transcribe(user_wav, model_size=model_size)
+    """Run a single scenario through the hybrid voice loop.
 
-        slots_result = tool_client.call_tool("extract_slots", {
-            "user_input": user_transcript,
-            "current_slots": slots,
-        })
+    With ``stream`` enabled the routed response is streamed and each sentence
+    is synthesized as soon as it is complete, which shortens the time until
+    the first bot audio is available. A ``client`` can be passed in to share
+    one (possibly hedged) Claude client across scenarios. ``keep_turns``
+    compacts the history sent to the bot brain to the last K turns.
 
-        if slots_result.success:
-            slots = slots_result.data
-        else:
-            logger.warning("Slot extraction failed: %s", slots_result.error)
+    ``turn_budget`` gives every turn a latency budget in seconds, starting
+    once the caller's audio is ready. Stages that no longer fit fall back to a
+    cheaper path (cached transcript, template response, rules judge) and are
+    listed under ``degraded`` in the turn record. Without a cached transcript
+    the turn is empty and the bot asks the caller to clarify without calling
+    Claude. An inline
+    Claude judge call is bounded by the remaining budget and falls back to the
+    rules judge when it times out.
+
+    ``judge`` is ``rules``, ``claude`` or ``tiered``. The tiered judge
+    accepts rule passes as-is and escalates only rule failures to Claude;
+    each turn records its ``judge_source``.
+
+    Passing a ``tool_client`` shares its result cache and call statistics
+    across scenarios; a ``claude_judge`` likewise shares its client and
+    verdict cache. With a ``judge_pool``, turns that need Claude are graded in
+    the background: their ``pass`` is ``None`` on return, and the result must
+    go through ``summarize_verdicts`` after the pool drains.
+
+    With a ``pipeline``, caller audio and transcripts come from its prefetch
+    stages and non-streamed bot audio is synthesized on its ``bot_audio``
+    stage; ``time_to_first_audio`` is filled in once that audio is written.
+
+    Each turn records ``timings``: monotonic seconds per stage (``user_tts``,
+    ``asr``, ``slots``, ``stage_1``, ``stage_2``, ``bot_tts``, ``judge``)
+    and the turn's ``total``. Stages that did not run are absent. While
+    tracing, the scenario, each turn and each stage are nested spans.
+
+    Each turn also records the token ``usage`` of its Claude calls per stage
+    (``stage_1``, ``stage_2``, ``judge``), and the result sums it per stage.
+    """
+    if client is None:
+        client = Anthropic()
+    if tool_client is None:
+        tool_client = ToolClient()
+    if claude_judge is None and judge in ("claude", "tiered"):
+        claude_judge = ClaudeJudge()
+    with span("scenario", scenario_id=s.id, goal=s.goal):
+        transcript = []
+        slots = {}
+        conversation_history = Conversation(keep_turns=keep_turns)
+        real_audio_root = Path(real_audio_dir) if real_audio_dir is not None else None
+
+        for i, step in enumerate(s.steps, start=1):
+            turn_usage = TurnUsage()
+            with span("turn", scenario_id=s.id, turn=i), turn_usage.active():
+                turn_started = time.perf_counter()
+                timings = TurnTimings()
+                user_text = step.user or ""
+                prefetched = None
+                if pipeline is not None:
+                    prefetched = pipeline.user_turn(s.id, i)
+                    user_wav = prefetched[0]
+                    for stage, seconds in prefetched[2].items():
+                        timings.record(stage, seconds)
+                else:
+                    real_audio_file = None
+                    if real_audio_root is not None:
+                        real_audio_file = _find_real_audio(real_audio_root, s.id, i)
+
+                    if real_audio_file:
+                        user_wav = real_audio_file
+                    else:
+                        user_wav = f"{audio_dir}/{s.id}/user_{i}.wav"
+                        with timings.stage("user_tts"):
+                            synthesize(user_text, user_wav)
+                deadline = TurnDeadline(turn_budget) if turn_budget is not None else None
+                if prefetched is not None:
+                    user_transcript = prefetched[1]
+                elif deadline is not None and not deadline.allows("asr"):
+                    deadline.degrade("asr")
+                    # Without a cached transcript the bot hears nothing, never the script.
+                    user_transcript = cached_transcript(user_wav, model_size) or ""
+                else:
+                    with timings.stage("asr"):
+                        user_transcript = transcribe(user_wav, model_size=model_size)
+
+                # Rule-based slot extraction takes microseconds, so it always runs.
+                with timings.stage("slots"):
+                    slots_result = tool_client.call_tool("extract_slots", {
+                        "user_input": user_transcript,
+                        "current_slots": slots,
+                    })
+
+                if slots_result.success:
+                    slots = slots_result.data
+                else:
+                    logger.warning("Slot extraction failed: %s", slots_result.error)
+
+                error = None
+                tokens_saved_before = conversation_history.input_tokens_saved
+                bot_wav = f"{audio_dir}/{s.id}/bot_{i}.wav"
+                bot_start = time.monotonic()
+                synthesizer = StreamingSynthesizer(bot_wav) if stream else None
+                bot_kwargs: Dict[str, Any] = {}
+                if synthesizer is not None:
+                    bot_kwargs["on_sentence"] = synthesizer.feed
+                if deadline is not None:
+                    bot_kwargs["deadline"] = deadline
+                try:
+                    # Stage 1 and stage 2 are timed inside the bot brain.
+                    with timings.active():
+                        bot_response = generate_bot_response(
+                            client=client,
+                            user_input=user_transcript,
+                            slots=slots,
+                            conversation_history=conversation_history,
+                            **bot_kwargs,
+                        )
+                except Exception as exc:
+                    error = str(exc)
+                    logger.warning("Bot response generation failed: %s", exc)
+                    bot_response = {
+                        "action": "ASK_CLARIFY",
+                        "utterance": "I'm sorry, I encountered an error. Could you please try again?",
+                        "detected_intent": "",
+                    }
+
+                bot_text = bot_response["utterance"]
+                action = bot_response["action"]
+                detected_intent = bot_response.get("detected_intent", "")
+                intent_correct = detected_intent == s.goal
+                conversation_history.append(
+                    {"user": user_transcript, "bot": bot_text},
+                    detected_intent=detected_intent,
+                    action=action,
+                )
+
+                use_claude_judge = judge in ("claude", "tiered")
+                # A background judge is off the turn's critical path, so only inline
+                # Claude judging competes for the turn budget. The
+                # decision is made before bot audio so it does not depend on TTS speed.
+                if (
+                    use_claude_judge
+                    and judge_pool is None
+                    and deadline is not None
+                    and not deadline.allows("judge")
+                ):
+                    deadline.degrade("judge")
+                    use_claude_judge = False
+
+                if synthesizer is not None:
+                    with timings.stage("bot_tts"):
+                        time_to_first_audio = synthesizer.close()
+                        # A failed or fallback response never streamed the final utterance.
+                        if synthesizer.text.split() != bot_text.split():
+                            synthesize(bot_text, bot_wav)
+                            time_to_first_audio = time.monotonic() - bot_start
+                elif pipeline is not None:
+                    # Filled in, with the bot_tts timing, by the bot_audio stage.
+                    time_to_first_audio = None
+                else:
+                    with timings.stage("bot_tts"):
+                        synthesize(bot_text, bot_wav)
+                    time_to_first_audio = time.monotonic() - bot_start
+
+                # Background verdicts add their own judge time when they are graded.
+                with timings.stage("judge"):
+                    ok = None
+                    escalate = False
+                    if error is not None:
+                        ok = False
+                        judge_source = "error"
+                    elif use_claude_judge and judge == "tiered":
+                        # Exact rule matches are trusted; only rule failures go to Claude.
+                        ok = check_bot_expect_enhanced(bot_text, step.bot_expect, matcher=step.matcher)
+                        judge_source = "rules"
+                        escalate = not ok
+                    elif use_claude_judge:
+                        escalate = True
+                    else:
+                        ok = check_bot_expect_enhanced(bot_text, step.bot_expect, matcher=step.matcher)
+                        judge_source = "rules"
+
+                    background = escalate and judge_pool is not None and bool(step.bot_expect)
+                    if escalate:
+                        judge_source = "claude"
+                        if not background:
+                            try:
+                                ok = check_bot_expect_claude(
+                                    bot_text, step.bot_expect, judge=claude_judge, deadline=deadline
+                                )
+                            except APITimeoutError:
+                                if deadline is None:
+                                    raise
+                                deadline.degrade("judge")
+                                ok = check_bot_expect_enhanced(bot_text, step.bot_expect, matcher=step.matcher)
+                                judge_source = "rules"
+                timings.record("total", time.perf_counter() - turn_started)
+
+                entry = {
+                    "turn": i,
+                    "user_text": user_text,
+                    "user_asr": user_transcript,
+                    "bot_text": bot_text,
+                    "action": action,
+                    "slots": dict(slots),
+                    "detected_intent": detected_intent,
+                    "expected_intent": s.goal,
+                    "intent_correct": intent_correct,
+                    "pass": ok,
+                    "judge_source": judge_source,
+                    "error": error,
+                    "expectation": step.bot_expect or {},
+                    "user_wav": user_wav,
+                    "bot_wav": bot_wav,
+                    "time_to_first_audio": time_to_first_audio,
+                    "input_tokens_saved": conversation_history.input_tokens_saved - tokens_saved_before,
+                    "degraded": list(deadline.degraded) if deadline is not None else [],
+                    "timings": timings.stages,
+                    "usage": turn_usage.stages,
+                }
+                transcript.append(entry)
+                if pipeline is not None and synthesizer is None:
+                    pipeline.submit_bot_audio(entry, bot_text, bot_wav, bot_start)
+                if background:
+                    judge_pool.submit(entry, bot_text, step.bot_expect)
 
-        error = None
-        try:
-            bot_response = generate_bot_response(
-                client=client,
-                user_input=user_transcript,
-                slots=slots,
-                conversation_history=conversation_history,
-            )
-        except Exception as exc:
-            error = str(exc)
-            logger.warning("Bot response generation failed: %s", exc)
-            bot_response = {
-                "action": "ASK_CLARIFY",
-                "utterance": "I'm sorry, I encountered an error. Could you please try again?",
-                "detected_intent": "",
-            }
-
-        bot_text = bot_response["utterance"]
-        action = bot_response["action"]
-        detected_intent = bot_response.get("detected_intent", "")
-        intent_correct = detected_intent == s.goal
-        conversation_history.append({"user": user_transcript, "bot": bot_text})
-
-        bot_wav = f"{audio_dir}/{s.id}/bot_{i}.wav"
-        synthesize(bot_text, bot_wav)
-
-        if error is not None:
-            ok = False
-        elif judge == "claude":
-            ok = check_bot_expect_claude(bot_text, step.bot_expect)
-        else:
-            ok = check_bot_expect_enhanced(bot_text, step.bot_expect)
-
-        transcript.append({
-            "turn": i,
-            "user_text": user_text,
-            "user_asr": user_transcript,
-            "bot_text": bot_text,
-            "action": action,
-            "slots": dict(slots),
-            "detected_intent": detected_intent,
-            "expected_intent": s.goal,
-            "intent_correct": intent_correct,
-            "pass": ok,
-            "error": error,
-            "expectation": step.bot_expect or {},
-            "user_wav": user_wav,
-            "bot_wav": bot_wav,
-        })
-
-    steps_expected = sum(1 for step in s.steps if step.bot_expect)
-    steps_passed = sum(1 for entry in transcript if entry["pass"] and entry["expectation"])
-    scenario_pass = (steps_passed == steps_expected)
     intent_results = [entry["intent_correct"] for entry in transcript]
     intent_detected = intent_results[-1] if intent_results else False
     first_correct_turn = None
@@ -139,16 +315,39 @@ def run_scenario(
             first_correct_turn = entry["turn"]
             break
 
-    return {
+    return summarize_verdicts({
         "scenario_id": s.id,
         "goal": s.goal,
-        "scenario_pass": scenario_pass,
         "intent_detected": intent_detected,
         "first_correct_turn": first_correct_turn,
+        "input_tokens_saved": conversation_history.input_tokens_saved,
+        "judge": judge,
+        "transcript": transcript,
+    })
+
+
+def summarize_verdicts(result: Dict[str, Any]) -> Dict[str, Any]:
+    """(Re)compute a scenario result's pass counts from its turn verdicts.
+
+    Results produced with a judge pool must be summarized again once the
+    pool has drained; background judge usage arrives with the verdicts.
+    """
+    transcript = result["transcript"]
+    steps_expected = sum(1 for entry in transcript if entry["expectation"])
+    steps_passed = sum(1 for entry in transcript if entry["pass"] and entry["expectation"])
+    judged = [entry for entry in transcript if entry["expectation"] and entry["judge_source"] != "error"]
+    usage: Dict[str, Dict[str, Any]] = {}
+    for entry in transcript:
+        add_usage(usage, entry.get("usage") or {})
+    result.update({
+        "scenario_pass": steps_passed == steps_expected,
         "steps_expected": steps_expected,
         "steps_passed": steps_passed,
-        "transcript": transcript,
-    }
+        "judged_turns": len(judged),
+        "judge_escalations": sum(1 for entry in judged if entry["judge_source"] == "claude"),
+        "usage": usage,
+    })
+    return result
 
 
 def run_directory(
@@ -158,24 +357,256 @@ def run_directory(
     judge: str = "rules",
     real_audio_dir: str | Path | None = None,
     real_audio_only: bool = False,
+    stream: bool = False,
+    client: Anthropic | None = None,
+    keep_turns: int | None = None,
+    turn_budget: float | None = None,
+    tool_client: ToolClient | None = None,
+    claude_judge: ClaudeJudge | None = None,
+    judge_workers: int = 0,
+    workers: int = 1,
+    shard: Tuple[int, int] | None = None,
+    durations: Dict[str, float] | None = None,
+    pipeline: Pipeline | None = None,
+    journal: RunJournal | None = None,
+    result_cache: ResultCache | None = None,
 ) -> List[Dict[str, Any]]:
-    """Load scenarios and run all of them."""
-    scenarios = load_scenarios(dir_path)
+    """Load scenarios and run all of them.
 
-    if real_audio_only and real_audio_dir is not None:
-        real_audio_root = Path(real_audio_dir)
-        scenarios = [s for s in scenarios if _scenario_has_recordings(real_audio_root, s.id)]
+    Returns every result in scenario order; see ``iter_directory`` for the
+    options and for consuming results as they finish instead.
+    """
+    results = iter_directory(
+        dir_path,
+        audio_dir,
+        model_size=model_size,
+        judge=judge,
+        real_audio_dir=real_audio_dir,
+        real_audio_only=real_audio_only,
+        stream=stream,
+        client=client,
+        keep_turns=keep_turns,
+        turn_budget=turn_budget,
+        tool_client=tool_client,
+        claude_judge=claude_judge,
+        judge_workers=judge_workers,
+        workers=workers,
+        shard=shard,
+        durations=durations,
+        pipeline=pipeline,
+        journal=journal,
+        result_cache=result_cache,
+    )
+    return sorted(results, key=lambda result: result["scenario_index"])
+
+
+def iter_directory(
+    dir_path: Path,
+    audio_dir: Path,
+    model_size: str = "tiny",
+    judge: str = "rules",
+    real_audio_dir: str | Path | None = None,
+    real_audio_only: bool = False,
+    stream: bool = False,
+    client: Anthropic | None = None,
+    keep_turns: int | None = None,
+    turn_budget: float | None = None,
+    tool_client: ToolClient | None = None,
+    claude_judge: ClaudeJudge | None = None,
+    judge_workers: int = 0,
+    workers: int = 1,
+    shard: Tuple[int, int] | None = None,
+    durations: Dict[str, float] | None = None,
+    pipeline: Pipeline | None = None,
+    journal: RunJournal | None = None,
+    result_cache: ResultCache | None = None,
+) -> Iterator[Dict[str, Any]]:
+    """Load scenarios, run them, and yield each result as soon as it is final.
+
+    Results arrive in completion order, each with its ``scenario_index`` in
+    the full suite and its ``duration_seconds``. Only a couple of scenarios
+    per worker are in flight at once, so memory stays flat on large suites
+    as long as the caller does not keep every result.
+
+    While a ``MemoryTracker`` is installed, each freshly run result carries
+    its ``memory`` usage.
+
+    With ``workers`` above 1, scenarios run concurrently on a thread pool.
+    They share one Claude client, tool client, judge and (through the ASR
+    module) one loaded Whisper model per size, and write audio under their
+    own ``audio_dir/<scenario id>`` directory.
+
+    With ``judge_workers`` set and a Claude-backed judge, Claude verdicts are
+    graded by a background pool while later turns and scenarios run; a
+    result is yielded once its own verdicts are in.
+
+    ``shard=(i, N)`` runs only the i-th of N shards (1-based), balanced by the
+    per-scenario ``durations`` of earlier runs.
 
-    results = []
+    With a ``pipeline``, the run goes through its stages instead: caller
+    audio and ASR are prefetched ahead of the conversations, which run on the
+    pipeline's conversation workers (``workers`` is then ignored). The
+    pipeline is closed when the run ends.
 
-    for scenario in scenarios:
-        result = run_scenario(
-            scenario,
-            audio_dir,
+    With a ``journal``, every finished scenario result is appended to it
+    with its input fingerprint, and scenarios already in the journal with the
+    same fingerprint are not run again: their journaled results are yielded
+    first, in their place, marked ``from_journal``. Journaled scenarios whose
+    inputs changed since are run again.
+
+    With a ``result_cache``, scenarios whose input fingerprint (definition,
+    recordings, prompts, policies, models, ASR and judge settings) matches a
+    stored result reuse it, marked ``from_cache``; clean new results are
+    stored for later runs.
+    """
+    scenarios = select_scenarios(dir_path, real_audio_dir, real_audio_only)
+
+    positions = list(range(len(scenarios)))
+    if shard is not None:
+        index, count = shard
+        positions = partition([s.id for s in scenarios], count, durations)[index - 1]
+    indexed = [(position, scenarios[position]) for position in positions]
+
+    if workers > 1 or pipeline is not None or journal is not None or result_cache is not None:
+        ids = Counter(scenario.id for _, scenario in indexed)
+        duplicates = sorted(scenario_id for scenario_id, count in ids.items() if count > 1)
+        if duplicates:
+            raise ValueError(
+                f"Scenario ids must be unique to run with workers, a journal or a result cache: "
+                f"{', '.join(duplicates)}"
+            )
+
+    fingerprints: Dict[str, str] = {}
+    if journal is not None or result_cache is not None:
+        real_audio_root = Path(real_audio_dir) if real_audio_dir is not None else None
+        run_inputs = run_fingerprint(
             model_size,
             judge,
-            real_audio_dir=real_audio_dir,
+            judge_model=claude_judge.model if claude_judge is not None else None,
+            stream=stream,
+            keep_turns=keep_turns,
+            turn_budget=turn_budget,
         )
-        results.append(result)
+        for _, scenario in indexed:
+            recordings = (
+                {i: _find_real_audio(real_audio_root, scenario.id, i) for i in range(1, len(scenario.steps) + 1)}
+                if real_audio_root is not None
+                else None
+            )
+            fingerprints[scenario.id] = scenario_fingerprint(scenario, run_inputs, recordings)
+    # Journaled results from runs with other inputs are run again.
+    journaled = journal.index(fingerprints) if journal is not None else {}
+
+    pending = []
+    for position, scenario in indexed:
+        # Resumed and cached results are loaded one at a time as they are yielded.
+        if scenario.id in journaled:
+            result = journal.read(journaled[scenario.id])
+            result["from_journal"] = True
+        else:
+            result = result_cache.get(fingerprints[scenario.id]) if result_cache is not None else None
+            if result is None:
+                pending.append((position, scenario))
+                continue
+            result["from_cache"] = True
+        result["scenario_index"] = position
+        yield result
+    indexed = pending
+    scenarios = [scenario for _, scenario in indexed]
+
+    if workers > 1 or pipeline is not None:
+        if client is None:
+            client = Anthropic()
+        if tool_client is None:
+            tool_client = ToolClient()
+        if claude_judge is None and judge in ("claude", "tiered"):
+            claude_judge = ClaudeJudge()
+
+    judge_pool = None
+    if judge_workers > 0 and judge in ("claude", "tiered"):
+        if claude_judge is None:
+            claude_judge = ClaudeJudge()
+        judge_pool = JudgePool(claude_judge, workers=judge_workers)
+
+    def run_one(item: Tuple[int, Scenario]) -> Dict[str, Any]:
+        position, scenario = item
+        started = time.monotonic()
+        with memory_scenario() as memory:
+            result = run_scenario(
+                scenario,
+                audio_dir,
+                model_size,
+                judge,
+                real_audio_dir=real_audio_dir,
+                stream=stream,
+                client=client,
+                keep_turns=keep_turns,
+                turn_budget=turn_budget,
+                tool_client=tool_client,
+                claude_judge=claude_judge,
+                judge_pool=judge_pool,
+                pipeline=pipeline,
+            )
+        if memory is not None:
+            result["memory"] = memory
+        result["scenario_index"] = position
+        result["duration_seconds"] = time.monotonic() - started
+        return result
+
+    def settle(results: Iterator[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        # Hold finished results until their background verdicts are in, so
+        # neither the workers nor the next scenario wait on the judge pool.
+        waiting: deque = deque()
+        window = 2 * max(workers, judge_workers, 1)
+        for result in results:
+            waiting.append(result)
+            while waiting and (len(waiting) > window or judge_pool is None or _verdicts_ready(waiting[0])):
+                yield finish(waiting.popleft())
+        while waiting:
+            yield finish(waiting.popleft())
+
+    def finish(result: Dict[str, Any]) -> Dict[str, Any]:
+        if judge_pool is not None:
+            judge_pool.wait(result["transcript"])
+            summarize_verdicts(result)
+        if pipeline is not None:
+            pipeline.wait_for(result["transcript"])
+        if journal is not None:
+            journal.append(result, fingerprint=fingerprints[result["scenario_id"]])
+        if result_cache is not None and is_cacheable(result):
+            result_cache.put(fingerprints[result["scenario_id"]], result)
+        return result
+
+    try:
+        if pipeline is not None:
+            real_audio_root = Path(real_audio_dir) if real_audio_dir is not None else None
+            try:
+                results = pipeline.run(
+                    scenarios,
+                    run_one,
+                    indexed,
+                    audio_dir,
+                    model_size,
+                    lambda scenario_id, turn: (
+                        _find_real_audio(real_audio_root, scenario_id, turn)
+                        if real_audio_root is not None
+                        else None
+                    ),
+                )
+                yield from settle(results)
+            finally:
+                pipeline.close()
+        elif workers > 1:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scenario") as executor:
+                yield from settle(
+                    iter_completed(lambda item: executor.submit(run_one, item), indexed, 2 * workers)
+                )
+        else:
+            yield from settle(run_one(item) for item in indexed)
+    finally:
+        if judge_pool is not None:
+            judge_pool.close()
+
 
-    return results
+def _verdicts_ready(result: Dict[str, Any]) -> bool:
+    return all(entry["pass"] is not None for entry in result["transcript"])
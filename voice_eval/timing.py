@@ -0,0 +1,58 @@
+# Per-stage turn timings recorded into transcript records
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator
+
+from .memory import memory_stage
+from .profiling import profiled
+from .tracing import span
+
+
+_ACTIVE: ContextVar["TurnTimings | None"] = ContextVar("voice_eval_turn_timings", default=None)
+
+
+class TurnTimings:
+    """Monotonic durations in seconds of each stage of one turn.
+
+    A stage timed more than once in a turn (e.g. a retried call) accumulates.
+    Code that cannot be handed the turn's timings, such as the bot brain,
+    records into whichever ``TurnTimings`` is ``active()`` via
+    ``timed_stage``. Each timed stage is also a span when tracing, a
+    profiled region when profiling and an RSS-sampled stage when tracking
+    memory.
+    """
+
+    def __init__(self) -> None:
+        self.stages: Dict[str, float] = {}
+
+    def record(self, stage: str, seconds: float) -> None:
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            with span(name), profiled(name), memory_stage(name):
+                yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    @contextmanager
+    def active(self) -> Iterator["TurnTimings"]:
+        token = _ACTIVE.set(self)
+        try:
+            yield self
+        finally:
+            _ACTIVE.reset(token)
+
+
+@contextmanager
+def timed_stage(name: str) -> Iterator[None]:
+    """Time a stage into the active turn's timings; a no-op outside a turn."""
+    timings = _ACTIVE.get()
+    if timings is None:
+        yield
+        return
+    with timings.stage(name):
+        yield
@@ -1,23 +1,227 @@
 # Tool client for voice evaluation
-from typing import Dict, Any
+import asyncio
+import copy
+import inspect
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
 from .bot_tools import (
     ToolResult,
     extract_slots_tool,
 )
+from .metrics import histogram, latency_summary
+
+
+# Upper bounds, in seconds, of the tool latency histogram buckets.
+LATENCY_BUCKETS = (0.0001, 0.001, 0.01, 0.1, 1.0)
+
+
+@dataclass
+class _ToolSpec:
+    fn: Callable[..., Any]
+    timeout: Optional[float] = None
+    pure: bool = False
+    is_async: bool = False
+
+
+@dataclass
+class _ToolStats:
+    calls: int = 0
+    cache_hits: int = 0
+    errors: int = 0
+    timeouts: int = 0
+    latencies: List[float] = field(default_factory=list)
 
 
 class ToolClient:
-    def __init__(self):
-        self.tools = {
-            "extract_slots": extract_slots_tool,
-        }
+    """Dispatches tool calls with per-tool timeouts, memoization and stats.
+
+    Tools may be plain functions or coroutine functions returning a
+    ``ToolResult``. ``call_tool`` runs either kind from synchronous code and
+    ``acall_tool`` awaits them from an event loop. A tool with a timeout runs
+    off the calling thread and fails with a ``ToolResult`` error once the
+    timeout passes; a synchronous tool cannot be interrupted, so its thread
+    finishes in the background. Successful results of pure tools are cached
+    on their arguments. ``summary()`` reports call counts, cache hits and a
+    latency histogram of the calls that actually ran.
+    """
+
+    def __init__(self, cache_size: int = 4096):
+        self.tools: Dict[str, _ToolSpec] = {}
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Hashable, ToolResult]" = OrderedDict()
+        self._stats: Dict[str, _ToolStats] = {}
+        self._lock = threading.Lock()
+        self._executor: ThreadPoolExecutor | None = None
+        self.register("extract_slots", extract_slots_tool, pure=True)
+
+    def register(
+        self,
+        name: str,
+        fn: Callable[..., Any],
+        timeout: Optional[float] = None,
+        pure: bool = False,
+    ) -> None:
+        """Register a tool; ``pure`` tools are memoized on their arguments."""
+        self.tools[name] = _ToolSpec(
+            fn=fn,
+            timeout=timeout,
+            pure=pure,
+            is_async=inspect.iscoroutinefunction(fn),
+        )
+        with self._lock:
+            self._stats.setdefault(name, _ToolStats())
 
     def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> ToolResult:
         """Call a specific tool with arguments."""
         if tool_name not in self.tools:
             return ToolResult(success=False, data=None, error=f"Tool {tool_name} not found")
 
+        spec = self.tools[tool_name]
+        key, cached = self._lookup(tool_name, spec, arguments)
+        if cached is not None:
+            return cached
+
+        started = time.perf_counter()
         try:
-            return self.tools[tool_name](**arguments)
+            if spec.is_async:
+                result = asyncio.run(self._await(spec, arguments))
+            elif spec.timeout is None:
+                result = spec.fn(**arguments)
+            else:
+                future = self._thread_pool().submit(spec.fn, **arguments)
+                result = future.result(timeout=spec.timeout)
+        except TimeoutError:
+            result = self._timed_out(tool_name, spec)
         except Exception as e:
-            return ToolResult(success=False, data=None, error=str(e))
+            result = ToolResult(success=False, data=None, error=str(e))
+        return self._finish(tool_name, key, result, started)
+
+    async def acall_tool(self, tool_name: str, arguments: Dict[str, Any]) -> ToolResult:
+        """Call a tool from an event loop; sync tools with a timeout run in a thread."""
+        if tool_name not in self.tools:
+            return ToolResult(success=False, data=None, error=f"Tool {tool_name} not found")
+
+        spec = self.tools[tool_name]
+        key, cached = self._lookup(tool_name, spec, arguments)
+        if cached is not None:
+            return cached
+
+        started = time.perf_counter()
+        try:
+            if spec.is_async:
+                result = await self._await(spec, arguments)
+            elif spec.timeout is None:
+                result = spec.fn(**arguments)
+            else:
+                result = await asyncio.wait_for(
+                    asyncio.to_thread(spec.fn, **arguments),
+                    timeout=spec.timeout,
+                )
+        except TimeoutError:
+            result = self._timed_out(tool_name, spec)
+        except Exception as e:
+            result = ToolResult(success=False, data=None, error=str(e))
+        return self._finish(tool_name, key, result, started)
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Return per-tool call counts, cache hits, failures and latency stats."""
+        with self._lock:
+            return {
+                name: {
+                    "calls": stats.calls,
+                    "cache_hits": stats.cache_hits,
+                    "errors": stats.errors,
+                    "timeouts": stats.timeouts,
+                    "latency": latency_summary(stats.latencies),
+                    "histogram": histogram(stats.latencies, LATENCY_BUCKETS),
+                }
+                for name, stats in self._stats.items()
+                if stats.calls
+            }
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    async def _await(self, spec: _ToolSpec, arguments: Dict[str, Any]) -> ToolResult:
+        return await asyncio.wait_for(spec.fn(**arguments), timeout=spec.timeout)
+
+    def _thread_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(thread_name_prefix="tool")
+            return self._executor
+
+    def _lookup(
+        self,
+        tool_name: str,
+        spec: _ToolSpec,
+        arguments: Dict[str, Any],
+    ) -> Tuple[Hashable | None, ToolResult | None]:
+        key = _cache_key(tool_name, arguments) if spec.pure else None
+        with self._lock:
+            stats = self._stats[tool_name]
+            stats.calls += 1
+            if key is None or key not in self._cache:
+                return key, None
+            self._cache.move_to_end(key)
+            stats.cache_hits += 1
+            cached = self._cache[key]
+        return key, _copy_result(cached)
+
+    def _finish(
+        self,
+        tool_name: str,
+        key: Hashable | None,
+        result: ToolResult,
+        started: float,
+    ) -> ToolResult:
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            stats = self._stats[tool_name]
+            stats.latencies.append(elapsed)
+            if not result.success:
+                stats.errors += 1
+            elif key is not None and self.cache_size > 0:
+                self._cache[key] = _copy_result(result)
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return result
+
+    def _timed_out(self, tool_name: str, spec: _ToolSpec) -> ToolResult:
+        with self._lock:
+            self._stats[tool_name].timeouts += 1
+        return ToolResult(
+            success=False,
+            data=None,
+            error=f"Tool {tool_name} timed out after {spec.timeout}s",
+        )
+
+
+def _copy_result(result: ToolResult) -> ToolResult:
+    # Callers own the data they get back (e.g. the slots dict), so the cache
+    # never shares it with them.
+    return ToolResult(success=result.success, data=copy.copy(result.data), error=result.error)
+
+
+def _cache_key(tool_name: str, arguments: Dict[str, Any]) -> Hashable | None:
+    try:
+        key = (tool_name, _freeze(arguments))
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
@@ -0,0 +1,199 @@
+# Nested span tracing exported as Chrome trace events and OTLP JSON
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+
+
+_CURRENT: ContextVar["Span | None"] = ContextVar("voice_eval_span", default=None)
+# Installed by ``Tracer.install()``; ``span()`` is a shared no-op while None.
+_TRACER: "Tracer | None" = None
+_DISABLED = nullcontext()
+
+
+class Span:
+    """One timed operation; children opened while it is current nest under it."""
+
+    __slots__ = (
+        "name", "trace_id", "span_id", "parent_id", "start_ns", "end_ns", "process_id", "thread_id", "attributes",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        span_id: str,
+        parent_id: str | None,
+        start_ns: int,
+        attributes: Dict[str, Any],
+    ) -> None:
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.start_ns = start_ns
+        self.end_ns = start_ns
+        self.process_id = os.getpid()
+        self.thread_id = threading.get_ident()
+        self.attributes = attributes
+
+
+class Tracer:
+    """Collects finished spans and writes them out at the end of a run.
+
+    Span times come from ``time.perf_counter_ns`` (shared by worker
+    processes on Linux) and are shifted onto the wall clock on export. A
+    span opened with no current span starts a new trace; scenarios are
+    opened that way, so each scenario is one trace.
+    """
+
+    def __init__(self) -> None:
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+        self._ids = 0
+        self._epoch_offset_ns = time.time_ns() - time.perf_counter_ns()
+        self._thread_names: Dict[int, str] = {}
+
+    @contextmanager
+    def install(self) -> Iterator["Tracer"]:
+        global _TRACER
+        previous, _TRACER = _TRACER, self
+        try:
+            yield self
+        finally:
+            _TRACER = previous
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Span]:
+        parent = _CURRENT.get()
+        current = self._open(name, parent, time.perf_counter_ns(), attributes)
+        token = _CURRENT.set(current)
+        try:
+            yield current
+        except BaseException as exc:
+            current.attributes["error"] = repr(exc)
+            raise
+        finally:
+            _CURRENT.reset(token)
+            self._close(current, time.perf_counter_ns())
+
+    def record(
+        self,
+        name: str,
+        start_ns: int,
+        end_ns: int,
+        parent: Span | None = None,
+        worker: Tuple[int, int] | None = None,
+        **attributes: Any,
+    ) -> None:
+        """Add a span timed elsewhere under ``parent``.
+
+        ``worker`` is the ``(pid, thread id)`` that ran it, e.g. in a
+        worker process; by default the recording thread.
+        """
+        recorded = self._open(name, parent, start_ns, attributes)
+        if worker is not None:
+            recorded.process_id, recorded.thread_id = worker
+        self._close(recorded, end_ns)
+
+    def write_chrome_trace(self, path: str | Path) -> None:
+        """Write trace-event JSON for chrome://tracing and Perfetto."""
+        pid = os.getpid()
+        # Names are known for this process's threads only.
+        events: List[Dict[str, Any]] = [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+            for tid, name in self._thread_names.items()
+        ]
+        for span in self._finished():
+            events.append({
+                "name": span.name,
+                "cat": span.name.split(".")[0],
+                "ph": "X",
+                "ts": (span.start_ns + self._epoch_offset_ns) / 1000,
+                "dur": (span.end_ns - span.start_ns) / 1000,
+                "pid": span.process_id,
+                "tid": span.thread_id,
+                "args": {**span.attributes, "trace_id": span.trace_id, "span_id": span.span_id},
+            })
+        _write_json(path, {"traceEvents": events, "displayTimeUnit": "ms"})
+
+    def write_otlp(self, path: str | Path, service_name: str = "voice-eval") -> None:
+        """Write the spans as an OTLP/JSON ``ExportTraceServiceRequest``."""
+        spans = []
+        for span in self._finished():
+            otlp = {
+                "traceId": span.trace_id,
+                "spanId": span.span_id,
+                "name": span.name,
+                "kind": 1,
+                "startTimeUnixNano": str(span.start_ns + self._epoch_offset_ns),
+                "endTimeUnixNano": str(span.end_ns + self._epoch_offset_ns),
+                "attributes": [_otlp_attribute(key, value) for key, value in span.attributes.items()],
+            }
+            if span.parent_id is not None:
+                otlp["parentSpanId"] = span.parent_id
+            if "error" in span.attributes:
+                otlp["status"] = {"code": 2, "message": str(span.attributes["error"])}
+            spans.append(otlp)
+        _write_json(path, {
+            "resourceSpans": [{
+                "resource": {"attributes": [_otlp_attribute("service.name", service_name)]},
+                "scopeSpans": [{"scope": {"name": "voice_eval"}, "spans": spans}],
+            }]
+        })
+
+    def _open(self, name: str, parent: Span | None, start_ns: int, attributes: Dict[str, Any]) -> Span:
+        with self._lock:
+            self._ids += 1
+            span_id = f"{self._ids:016x}"
+            thread = threading.current_thread()
+            self._thread_names.setdefault(thread.ident, thread.name)
+        trace_id = parent.trace_id if parent is not None else f"{os.getpid():08x}{self._ids:024x}"
+        return Span(name, trace_id, span_id, parent.span_id if parent else None, start_ns, attributes)
+
+    def _close(self, span: Span, end_ns: int) -> None:
+        span.end_ns = end_ns
+        with self._lock:
+            self.spans.append(span)
+
+    def _finished(self) -> List[Span]:
+        with self._lock:
+            return sorted(self.spans, key=lambda span: span.start_ns)
+
+
+def span(name: str, **attributes: Any) -> Any:
+    """Open a span in the installed tracer; a shared no-op when tracing is off."""
+    tracer = _TRACER
+    if tracer is None:
+        return _DISABLED
+    return tracer.span(name, **attributes)
+
+
+def active_tracer() -> Tracer | None:
+    return _TRACER
+
+
+def current_span() -> Span | None:
+    return _CURRENT.get()
+
+
+def _otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        typed: Tuple[str, Any] = ("boolValue", value)
+    elif isinstance(value, int):
+        typed = ("intValue", str(value))
+    elif isinstance(value, float):
+        typed = ("doubleValue", value)
+    else:
+        typed = ("stringValue", str(value))
+    return {"key": key, "value": {typed[0]: typed[1]}}
+
+
+def _write_json(path: str | Path, payload: Dict[str, Any]) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(payload, default=str), encoding="utf-8")
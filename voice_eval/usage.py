@@ -0,0 +1,186 @@
+# Token usage capture and cost accounting for Claude calls
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+import yaml
+
+
+# Token counters reported in ``response.usage`` of the Messages API.
+USAGE_FIELDS = (
+    "input_tokens",
+    "output_tokens",
+    "cache_creation_input_tokens",
+    "cache_read_input_tokens",
+)
+
+_ACTIVE: ContextVar["TurnUsage | None"] = ContextVar("voice_eval_turn_usage", default=None)
+
+
+class TurnUsage:
+    """Token usage of the Claude calls made during one turn, per stage.
+
+    Each stage (``stage_1``, ``stage_2``, ``judge``) holds its model, the
+    number of calls and the summed ``USAGE_FIELDS``. Code that makes the
+    calls records into whichever ``TurnUsage`` is ``active()`` via
+    ``record_usage``.
+    """
+
+    def __init__(self) -> None:
+        self.stages: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, stage: str, model: str, usage: Dict[str, int]) -> None:
+        totals = self.stages.setdefault(stage, _empty(model))
+        totals["model"] = model
+        totals["calls"] += 1
+        for field in USAGE_FIELDS:
+            totals[field] += usage.get(field, 0)
+
+    @contextmanager
+    def active(self) -> Iterator["TurnUsage"]:
+        token = _ACTIVE.set(self)
+        try:
+            yield self
+        finally:
+            _ACTIVE.reset(token)
+
+
+def record_usage(stage: str, model: str, response: Any) -> None:
+    """Record a response's token usage into the active turn; a no-op outside one."""
+    turn_usage = _ACTIVE.get()
+    if turn_usage is None:
+        return
+    usage = response_usage(response)
+    if usage is not None:
+        turn_usage.record(stage, model, usage)
+
+
+def response_usage(response: Any) -> Dict[str, int] | None:
+    """The ``USAGE_FIELDS`` of a Messages API response, or None without usage."""
+    usage = getattr(response, "usage", None)
+    if not isinstance(getattr(usage, "input_tokens", None), int):
+        return None
+    counts = {field: getattr(usage, field, None) for field in USAGE_FIELDS}
+    # Cache counters are None when prompt caching was not involved.
+    return {field: value if isinstance(value, int) else 0 for field, value in counts.items()}
+
+
+def split_usage(stage_usage: Dict[str, Any], parts: int) -> List[Dict[str, Any]]:
+    """Split one stage's usage evenly into ``parts`` (e.g. the turns of a judge batch).
+
+    Token remainders go to the first parts, so the parts sum to the whole.
+    """
+    shares = []
+    for index in range(parts):
+        share = _empty(stage_usage["model"])
+        for field in ("calls",) + USAGE_FIELDS:
+            whole, remainder = divmod(stage_usage[field], parts)
+            share[field] = whole + (1 if index < remainder else 0)
+        shares.append(share)
+    return shares
+
+
+def add_usage(totals: Dict[str, Dict[str, Any]], stages: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Add per-stage usage into ``totals`` in place and return it."""
+    for stage, usage in stages.items():
+        total = totals.setdefault(stage, _empty(usage["model"]))
+        for field in ("calls",) + USAGE_FIELDS:
+            total[field] += usage.get(field, 0)
+    return totals
+
+
+@dataclass(frozen=True)
+class ModelPrice:
+    """USD per million tokens of each kind for one model."""
+    input: float
+    output: float
+    cache_write: float
+    cache_read: float
+
+
+# List prices; override or extend with ``--prices``.
+DEFAULT_PRICES = {
+    "claude-haiku-4-5": ModelPrice(input=1.00, output=5.00, cache_write=1.25, cache_read=0.10),
+}
+
+
+class PriceTable:
+    """Model prices used to turn token usage into cost."""
+
+    def __init__(self, prices: Dict[str, ModelPrice] | None = None) -> None:
+        self.prices = dict(DEFAULT_PRICES if prices is None else prices)
+
+    @classmethod
+    def load_yaml(cls, path: Path) -> "PriceTable":
+        """Default prices updated from a YAML mapping of model to prices.
+
+        Each model maps ``input``, ``output``, ``cache_write`` and
+        ``cache_read`` to USD per million tokens; cache prices default to
+        the input price.
+        """
+        data = yaml.safe_load(Path(path).read_text(encoding="utf-8"))
+        if not isinstance(data, dict):
+            raise ValueError(f"Price file {path} must map model names to prices")
+        table = cls()
+        for model, item in data.items():
+            if not isinstance(item, dict) or "input" not in item or "output" not in item:
+                raise ValueError(f"Price for {model} in {path} needs input and output prices")
+            table.prices[model] = ModelPrice(
+                input=float(item["input"]),
+                output=float(item["output"]),
+                cache_write=float(item.get("cache_write", item["input"])),
+                cache_read=float(item.get("cache_read", item["input"])),
+            )
+        return table
+
+    def cost(self, usage: Dict[str, Any]) -> float | None:
+        """USD cost of one stage's usage, or None if its model has no price."""
+        price = self.prices.get(usage.get("model"))
+        if price is None:
+            return None
+        return (
+            usage["input_tokens"] * price.input
+            + usage["output_tokens"] * price.output
+            + usage["cache_creation_input_tokens"] * price.cache_write
+            + usage["cache_read_input_tokens"] * price.cache_read
+        ) / 1_000_000
+
+    def total_cost(self, stages: Dict[str, Dict[str, Any]]) -> float | None:
+        """Summed cost of per-stage usage; None if no stage could be priced."""
+        costs = [self.cost(usage) for usage in stages.values()]
+        priced = [cost for cost in costs if cost is not None]
+        return sum(priced) if priced else None
+
+
+class UsageCollector:
+    """Token usage gathered across results: per stage, per intent and overall."""
+
+    def __init__(self) -> None:
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self.intents: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.turns: Dict[str, int] = {}
+
+    def add(self, result: Dict[str, Any]) -> None:
+        for entry in result.get("transcript", []):
+            usage = entry.get("usage")
+            if not usage:
+                continue
+            intent = entry.get("expected_intent") or "(unknown)"
+            add_usage(self.stages, usage)
+            add_usage(self.intents.setdefault(intent, {}), usage)
+            self.turns[intent] = self.turns.get(intent, 0) + 1
+
+
+def total_usage(stages: Dict[str, Dict[str, Any]]) -> Dict[str, int]:
+    """Calls and tokens summed over stages."""
+    summed = {field: 0 for field in ("calls",) + USAGE_FIELDS}
+    for usage in stages.values():
+        for field in summed:
+            summed[field] += usage.get(field, 0)
+    return summed
+
+
+def _empty(model: str) -> Dict[str, Any]:
+    return {"model": model, "calls": 0, **{field: 0 for field in USAGE_FIELDS}}